@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fragen-Auswertung
+Wertet das Antwort-Log pro Frage aus (klassische Item-Analyse):
+
+- Schwierigkeit (p-Wert): Anteil richtiger Antworten
+- Trennschärfe: punktbiseriale Korrelation zwischen "Frage richtig" und dem
+  Restscore der Person (Anteil richtiger Antworten ohne diese Antwort)
+- Distraktoren: wie oft jede Option gewählt wurde und wie gut die Personen
+  im Schnitt sind, die sie wählen
+
+Das Log wird spaltenweise geladen (ein Array pro Feld, Fragen und Personen
+als Indizes). Mit NumPy laufen alle Summen als bincount über die Spalten,
+10 Mio. Antworten sind damit in wenigen Sekunden ausgewertet. Ohne NumPy
+wird dasselbe in reinem Python gerechnet (für kleine Logs ausreichend).
+
+Aufruf:
+    python analytics.py
+    python analytics.py --log ~/.lern_quiz/answers.qcol --min-answers 20 --json auswertung.json
+    python analytics.py --synthetic 10000000
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from array import array
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ist optional
+    np = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from column_log import DEFAULT_COLUMN_LOG_PATH, chunk_latency, is_column_log, iter_chunks, selection_mask
+from event_log import read_events
+from quiz_engine import AnswerEvent, Question, _index_to_letters, question_key, sanitize_prompt
+
+
+MAX_OPTIONS = 26                         # Optionen A-Z als Bits der Auswahl-Maske
+
+# Schwellen für Hinweise im Bericht
+EASY_P = 0.95
+HARD_P = 0.2
+LOW_DISCRIMINATION = 0.1
+UNUSED_DISTRACTOR = 0.05
+
+
+@dataclass
+class AnswerColumns:
+    """Antwort-Log in Spalten (ein Eintrag pro Antwort)"""
+    keys: List[str] = field(default_factory=list)     # Fragenschlüssel, Index = Wert in `question`
+    users: List[str] = field(default_factory=list)    # Personen, Index = Wert in `user`
+    question: Sequence[int] = field(default_factory=lambda: array("I"))
+    user: Sequence[int] = field(default_factory=lambda: array("I"))
+    selected: Sequence[int] = field(default_factory=lambda: array("I"))   # Bitmaske der Originaloptionen (A = Bit 0)
+    correct: Sequence[int] = field(default_factory=lambda: array("B"))
+    timestamp: Sequence[float] = field(default_factory=lambda: array("d"))
+    latency_ms: Sequence[float] = field(default_factory=lambda: array("f"))  # 0 = nicht gemessen
+
+    def __len__(self) -> int:
+        return len(self.question)
+
+
+@dataclass
+class QuestionStats:
+    """Kennzahlen einer Frage"""
+    key: str
+    topic: str                           # Themenmodul
+    prompt: str
+    answers: int
+    p_value: float                       # Anteil richtig
+    discrimination: Optional[float]      # Punktbiserial, None bei zu wenig Streuung
+    correct: List[str]
+    option_rates: Dict[str, float]       # Option -> Anteil der Antworten, die sie gewählt haben
+    option_scores: Dict[str, Optional[float]]  # Option -> Ø Restscore der Wählenden
+    mean_score: Optional[float]          # Ø Restscore aller Antwortenden
+    notes: List[str] = field(default_factory=list)
+
+
+def columns_from_events(events: Iterable[AnswerEvent]) -> AnswerColumns:
+    """Baut die Spalten aus AnswerEvents (ein Durchlauf)"""
+    columns = AnswerColumns()
+    key_index: Dict[str, int] = {}
+    user_index: Dict[str, int] = {}
+    masks: Dict[str, int] = {}
+
+    for event in events:
+        q = key_index.get(event.question_key)
+        if q is None:
+            q = key_index[event.question_key] = len(columns.keys)
+            columns.keys.append(event.question_key)
+        u = user_index.get(event.user)
+        if u is None:
+            u = user_index[event.user] = len(columns.users)
+            columns.users.append(event.user)
+        columns.question.append(q)
+        columns.user.append(u)
+        columns.selected.append(selection_mask(event.selected, masks))
+        columns.correct.append(1 if event.correct else 0)
+        columns.timestamp.append(event.timestamp)
+        columns.latency_ms.append(event.latency_ms)
+    return columns
+
+
+def columns_from_chunks(chunks: Iterable[dict], latency: bool = False) -> AnswerColumns:
+    """
+    Fügt die Chunks eines Spalten-Logs zusammen. Die Wörterbücher pro Chunk
+    werden auf gemeinsame Indizes abgebildet, die Spalten selbst nur kopiert.
+    Mit `latency` bekommen Chunks ohne Zeitmessung Nullen als Antwortzeit.
+    """
+    columns = AnswerColumns()
+    key_index: Dict[str, int] = {}
+    user_index: Dict[str, int] = {}
+    # Spalte im Log -> Feld in AnswerColumns
+    fields = {"question": "question", "user": "user", "selected": "selected", "correct": "correct",
+              "timestamp": "timestamp", "latency": "latency_ms"}
+    parts: Dict[str, list] = {name: [] for name in fields}
+
+    for chunk in chunks:
+        remap = {}
+        for field_name, dictionary, index, names in (
+            ("question", chunk["keys"], key_index, columns.keys),
+            ("user", chunk["users"], user_index, columns.users),
+        ):
+            mapping = array("I")
+            for name in dictionary:
+                position = index.get(name)
+                if position is None:
+                    position = index[name] = len(names)
+                    names.append(name)
+                mapping.append(position)
+            remap[field_name] = mapping
+
+        for name, values in parts.items():
+            if name == "latency":
+                local = chunk_latency(chunk) if latency else None
+            else:
+                local = chunk.get(name)
+            if local is None:
+                continue
+            if name in remap:
+                mapping = remap[name]
+                if np is not None:
+                    values.append(np.asarray(mapping)[np.asarray(local)])
+                else:
+                    values.append(array("I", [mapping[i] for i in local]))
+            else:
+                values.append(np.asarray(local) if np is not None else local)
+
+    for name, values in parts.items():
+        if not values:
+            continue
+        if np is not None:
+            setattr(columns, fields[name], np.concatenate(values))
+        else:
+            column = getattr(columns, fields[name])
+            for part in values:
+                column.extend(part)
+    return columns
+
+
+def load_columns(path: str = DEFAULT_COLUMN_LOG_PATH, latency: bool = False) -> AnswerColumns:
+    """
+    Lädt das Antwort-Log spaltenweise (Spalten-Log oder Zeilen-Log aus event_log.py).
+    Aus dem Spalten-Log werden nur die Spalten gelesen, die analyze() braucht,
+    mit `latency` zusätzlich die Antwortzeiten.
+    """
+    if is_column_log(path):
+        wanted = ("keys", "users", "question", "user", "selected", "correct") + (("latency",) if latency else ())
+        return columns_from_chunks(iter_chunks(path, wanted), latency)
+    return columns_from_events(read_events(path))
+
+
+# ----------------------------------------------------------------------
+# Summen pro Frage
+# ----------------------------------------------------------------------
+
+@dataclass
+class _Sums:
+    """Summen pro Frage (Listen oder Arrays, Index = Frage)"""
+    n: Sequence[float]                   # Antworten
+    correct: Sequence[float]             # Richtige Antworten
+    rest_n: Sequence[float]              # Antworten mit Restscore (Person hat mehr als eine Antwort)
+    rest_correct: Sequence[float]        # Sum x (nur mit Restscore)
+    rest_y: Sequence[float]              # Sum y
+    rest_xy: Sequence[float]             # Sum x*y
+    rest_yy: Sequence[float]             # Sum y*y
+    option_n: Sequence[Sequence[float]]  # [Frage][Bit] Anzahl Wahlen
+    option_y: Sequence[Sequence[float]]  # [Frage][Bit] Sum y der Wählenden (mit Restscore)
+    option_rest_n: Sequence[Sequence[float]]
+
+
+def _sums_numpy(columns: AnswerColumns) -> _Sums:
+    size = len(columns.keys)
+    q = np.asarray(columns.question, dtype=np.intp)
+    u = np.asarray(columns.user, dtype=np.intp)
+    x = np.asarray(columns.correct, dtype=np.float64)
+    selected = np.asarray(columns.selected, dtype=np.uint32)
+
+    # Restscore y: Anteil richtiger Antworten der Person ohne die aktuelle Antwort
+    user_n = np.bincount(u, minlength=len(columns.users))
+    user_correct = np.bincount(u, weights=x, minlength=len(columns.users))
+    rest_n = (user_n[u] - 1).astype(np.float64)
+    has_rest = rest_n > 0
+    y = np.zeros_like(x)
+    np.divide(user_correct[u] - x, rest_n, out=y, where=has_rest)
+
+    # y ist ohne Restscore 0, die Summen brauchen daher nur für Anzahl und x ein Gewicht
+    rest = has_rest.astype(np.float64)
+    width = int(selected.max()).bit_length() if len(selected) else 0
+    mask_count = 1 << width
+    if size * mask_count <= 1 << 24:
+        # Wenige Optionen: erst pro (Frage, Auswahl) zählen, dann auf die Bits verteilen
+        cell = q * mask_count + selected
+        cells = size * mask_count
+        bits = ((np.arange(mask_count)[:, None] >> np.arange(width)) & 1).astype(np.float64)
+        option_n = np.bincount(cell, minlength=cells).reshape(size, mask_count) @ bits
+        option_rest_n = np.bincount(cell, weights=rest, minlength=cells).reshape(size, mask_count) @ bits
+        option_y = np.bincount(cell, weights=y, minlength=cells).reshape(size, mask_count) @ bits
+    else:
+        option_n = np.zeros((size, width))
+        option_rest_n = np.zeros((size, width))
+        option_y = np.zeros((size, width))
+        for bit in range(width):
+            chosen = (selected >> bit) & 1 == 1
+            qc = q[chosen]
+            option_n[:, bit] = np.bincount(qc, minlength=size)
+            option_rest_n[:, bit] = np.bincount(qc, weights=rest[chosen], minlength=size)
+            option_y[:, bit] = np.bincount(qc, weights=y[chosen], minlength=size)
+
+    return _Sums(
+        n=np.bincount(q, minlength=size),
+        correct=np.bincount(q, weights=x, minlength=size),
+        rest_n=np.bincount(q, weights=rest, minlength=size),
+        rest_correct=np.bincount(q, weights=x * rest, minlength=size),
+        rest_y=np.bincount(q, weights=y, minlength=size),
+        rest_xy=np.bincount(q, weights=x * y, minlength=size),
+        rest_yy=np.bincount(q, weights=y * y, minlength=size),
+        option_n=option_n,
+        option_y=option_y,
+        option_rest_n=option_rest_n,
+    )
+
+
+def _sums_python(columns: AnswerColumns) -> _Sums:
+    size = len(columns.keys)
+    # tolist(): Python-Ints auch für NumPy-Spalten (kein Überlauf bei uint8)
+    question, user, correct, selected = (
+        column.tolist() for column in (columns.question, columns.user, columns.correct, columns.selected)
+    )
+    user_n = [0] * len(columns.users)
+    user_correct = [0] * len(columns.users)
+    for u, x in zip(user, correct):
+        user_n[u] += 1
+        user_correct[u] += x
+
+    width = max(selected, default=0).bit_length()
+    sums = _Sums(
+        n=[0] * size, correct=[0] * size,
+        rest_n=[0] * size, rest_correct=[0] * size, rest_y=[0.0] * size,
+        rest_xy=[0.0] * size, rest_yy=[0.0] * size,
+        option_n=[[0] * width for _ in range(size)],
+        option_y=[[0.0] * width for _ in range(size)],
+        option_rest_n=[[0] * width for _ in range(size)],
+    )
+    for q, u, x, mask in zip(question, user, correct, selected):
+        sums.n[q] += 1
+        sums.correct[q] += x
+        rest_n = user_n[u] - 1
+        if rest_n > 0:
+            y = (user_correct[u] - x) / rest_n
+            sums.rest_n[q] += 1
+            sums.rest_correct[q] += x
+            sums.rest_y[q] += y
+            sums.rest_xy[q] += x * y
+            sums.rest_yy[q] += y * y
+        bit = 0
+        while mask:
+            if mask & 1:
+                sums.option_n[q][bit] += 1
+                if rest_n > 0:
+                    sums.option_rest_n[q][bit] += 1
+                    sums.option_y[q][bit] += y
+            mask >>= 1
+            bit += 1
+    return sums
+
+
+def _point_biserial(n: float, sx: float, sy: float, sxy: float, syy: float) -> Optional[float]:
+    """Pearson-Korrelation aus Summen (x binär, also Sum x*x = Sum x)"""
+    if n < 2:
+        return None
+    var_x = n * sx - sx * sx
+    var_y = n * syy - sy * sy
+    if var_x <= 0 or var_y <= 1e-12:
+        return None
+    return (n * sxy - sx * sy) / math.sqrt(var_x * var_y)
+
+
+# ----------------------------------------------------------------------
+# Auswertung
+# ----------------------------------------------------------------------
+
+def analyze(
+    columns: AnswerColumns,
+    banks: Mapping[str, Sequence[Question]],
+    min_answers: int = 1,
+    use_numpy: Optional[bool] = None,
+) -> Dict[str, List[QuestionStats]]:
+    """
+    Berechnet die Kennzahlen aller Fragen mit Antworten.
+
+    Args:
+        columns: Antwort-Log in Spalten
+        banks: Themenmodul -> Fragen (zur Zuordnung von Schlüssel, Thema und Lösung)
+        min_answers: Fragen mit weniger Antworten werden übergangen
+        use_numpy: None = NumPy, falls installiert
+
+    Returns:
+        Themenmodul -> Kennzahlen pro Frage (Schlüssel ohne Frage in den Banken unter "Unbekannt")
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise RuntimeError("NumPy ist nicht installiert")
+
+    by_key: Dict[str, Tuple[str, Question]] = {}
+    for topic, questions in banks.items():
+        for q in questions:
+            by_key.setdefault(question_key(q), (topic, q))
+
+    result: Dict[str, List[QuestionStats]] = {}
+    if not len(columns):
+        return result
+    sums = _sums_numpy(columns) if use_numpy else _sums_python(columns)
+
+    for index, key in enumerate(columns.keys):
+        n = int(sums.n[index])
+        if n < min_answers:
+            continue
+        topic, question = by_key.get(key, ("Unbekannt", None))
+        width = len(sums.option_n[index])
+
+        if question is not None:
+            letters = sorted(question.options)
+        else:
+            letters = [_index_to_letters(bit) for bit in range(width) if sums.option_n[index][bit]]
+        rates: Dict[str, float] = {}
+        scores: Dict[str, Optional[float]] = {}
+        for letter in letters:
+            bit = ord(letter) - ord("A") if len(letter) == 1 else MAX_OPTIONS
+            chosen = sums.option_n[index][bit] if bit < width else 0
+            chosen_rest = sums.option_rest_n[index][bit] if bit < width else 0
+            rates[letter] = float(chosen) / n
+            scores[letter] = float(sums.option_y[index][bit]) / float(chosen_rest) if chosen_rest else None
+
+        stats = QuestionStats(
+            key=key,
+            topic=topic,
+            prompt=sanitize_prompt(question.prompt) if question is not None else "",
+            answers=n,
+            p_value=float(sums.correct[index]) / n,
+            discrimination=_point_biserial(
+                float(sums.rest_n[index]), float(sums.rest_correct[index]), float(sums.rest_y[index]),
+                float(sums.rest_xy[index]), float(sums.rest_yy[index]),
+            ),
+            correct=sorted(question.correct) if question is not None else [],
+            option_rates=rates,
+            option_scores=scores,
+            mean_score=float(sums.rest_y[index]) / float(sums.rest_n[index]) if sums.rest_n[index] else None,
+        )
+        stats.notes = _notes(stats)
+        result.setdefault(topic, []).append(stats)
+
+    return result
+
+
+def _notes(stats: QuestionStats) -> List[str]:
+    notes = []
+    if stats.p_value >= EASY_P:
+        notes.append("sehr leicht")
+    elif stats.p_value <= HARD_P:
+        notes.append("sehr schwer")
+    if stats.discrimination is not None and stats.discrimination < LOW_DISCRIMINATION:
+        notes.append("trennt kaum" if stats.discrimination >= 0 else "trennt negativ")
+    for letter, rate in stats.option_rates.items():
+        if letter in stats.correct or not stats.correct:
+            continue
+        if rate < UNUSED_DISTRACTOR:
+            notes.append(f"Distraktor {letter} kaum gewählt")
+        score = stats.option_scores.get(letter)
+        if score is not None and stats.mean_score is not None and score > stats.mean_score:
+            # Wer den Distraktor wählt, ist im Schnitt stärker als alle anderen: Formulierung prüfen
+            notes.append(f"Distraktor {letter} lockt Starke")
+    return notes
+
+
+# ----------------------------------------------------------------------
+# Testdaten und Bericht
+# ----------------------------------------------------------------------
+
+def synthetic_columns(
+    questions: Sequence[Question],
+    events: int,
+    users: int = 1000,
+    seed: int = 0,
+) -> AnswerColumns:
+    """
+    Erzeugt ein künstliches Log (Rasch-Modell: Fähigkeit pro Person,
+    Schwierigkeit pro Frage; falsche Antworten wählen einen Distraktor).
+    Die Antwortzeit wächst mit der Textlänge der Frage (log-normal gestreut).
+    """
+    keys = [question_key(q) for q in questions]
+    correct_masks = [sum(1 << (ord(k) - ord("A")) for k in q.correct) for q in questions]
+    distractors = [[1 << (ord(k) - ord("A")) for k in sorted(q.options) if k not in q.correct] or [0]
+                   for q in questions]
+    reading_ms = [1500.0 + 40.0 * (len(q.prompt) + sum(len(text) for text in q.options.values()))
+                  for q in questions]
+    columns = AnswerColumns(keys=keys, users=[f"user{u}" for u in range(users)])
+
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        ability = rng.normal(0.0, 1.0, users)
+        difficulty = rng.normal(-0.5, 1.0, len(questions))
+        q = rng.integers(0, len(questions), events, dtype=np.uint32)
+        u = rng.integers(0, users, events, dtype=np.uint32)
+        p = 1.0 / (1.0 + np.exp(difficulty[q] - ability[u]))
+        x = rng.random(events) < p
+        # Distraktor: zufällig, aber gleich verteilt je Frage (Tabelle + Index)
+        width = max(len(d) for d in distractors)
+        table = np.array([d * (width // len(d)) + d[:width % len(d)] for d in distractors], dtype=np.uint32)
+        wrong = table[q, rng.integers(0, width, events)]
+        columns.question = q
+        columns.user = u
+        columns.correct = x.astype(np.uint8)
+        columns.selected = np.where(x, np.asarray(correct_masks, dtype=np.uint32)[q], wrong)
+        columns.timestamp = np.arange(events, dtype=np.float64)
+        columns.latency_ms = (np.asarray(reading_ms)[q] * rng.lognormal(0.0, 0.5, events)).astype(np.float32)
+        return columns
+
+    rng = random.Random(seed)
+    ability = [rng.gauss(0.0, 1.0) for _ in range(users)]
+    difficulty = [rng.gauss(-0.5, 1.0) for _ in questions]
+    for i in range(events):
+        q = rng.randrange(len(questions))
+        u = rng.randrange(users)
+        x = rng.random() < 1.0 / (1.0 + math.exp(difficulty[q] - ability[u]))
+        columns.question.append(q)
+        columns.user.append(u)
+        columns.correct.append(1 if x else 0)
+        columns.selected.append(correct_masks[q] if x else rng.choice(distractors[q]))
+        columns.timestamp.append(float(i))
+        columns.latency_ms.append(reading_ms[q] * rng.lognormvariate(0.0, 0.5))
+    return columns
+
+
+def print_report(result: Dict[str, List[QuestionStats]], max_rows: int = 15) -> None:
+    """Gibt den Bericht pro Themenmodul aus (auffälligste Fragen zuerst)"""
+    for topic, stats in result.items():
+        answers = sum(s.answers for s in stats)
+        mean_p = sum(s.p_value * s.answers for s in stats) / answers
+        rated = [s.discrimination for s in stats if s.discrimination is not None]
+        mean_r = sum(rated) / len(rated) if rated else float("nan")
+        flagged = [s for s in stats if s.notes]
+        print(f"\n  {topic}: {len(stats)} Fragen, {answers} Antworten, "
+              f"Ø p = {mean_p:.2f}, Ø Trennschärfe = {mean_r:.2f}, {len(flagged)} auffällig")
+
+        flagged.sort(key=lambda s: (s.discrimination if s.discrimination is not None else 1.0, -s.answers))
+        for s in flagged[:max_rows]:
+            r = f"{s.discrimination:+.2f}" if s.discrimination is not None else "  -  "
+            options = " ".join(
+                f"{k}{'*' if k in s.correct else ''}={rate:.0%}" for k, rate in s.option_rates.items()
+            )
+            print(f"    p={s.p_value:.2f} r={r} n={s.answers:<6} {options}")
+            print(f"        {s.prompt[:80]}")
+            print(f"        -> {', '.join(s.notes)}")
+        if len(flagged) > max_rows:
+            print(f"    ... und {len(flagged) - max_rows} weitere")
+
+
+def main():
+    """Hauptfunktion"""
+    from questions import TOPICS, load_topic_module
+
+    parser = argparse.ArgumentParser(description="Schwierigkeit, Trennschärfe und Distraktoren pro Frage")
+    parser.add_argument("--log", default=DEFAULT_COLUMN_LOG_PATH, help="Antwort-Log (Spalten- oder Zeilen-Log)")
+    parser.add_argument("--module", action="append", default=[],
+                        help="Zusätzliches Themenmodul (.py), mehrfach möglich")
+    parser.add_argument("--min-answers", type=int, default=10, help="Fragen mit weniger Antworten übergehen")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N",
+                        help="Künstliches Log mit N Antworten statt --log auswerten")
+    parser.add_argument("--no-numpy", action="store_true", help="Reines Python (zum Vergleich)")
+    parser.add_argument("--json", metavar="DATEI", help="Kennzahlen als JSON speichern")
+    args = parser.parse_args()
+
+    banks: Dict[str, Sequence[Question]] = {name: loader() for name, loader in TOPICS.items()}
+    for path in args.module:
+        banks[path] = load_topic_module(path)
+
+    start = time.perf_counter()
+    if args.synthetic:
+        columns = synthetic_columns([q for questions in banks.values() for q in questions], args.synthetic)
+    else:
+        columns = load_columns(args.log)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = analyze(columns, banks, args.min_answers, use_numpy=False if args.no_numpy else None)
+    analyze_seconds = time.perf_counter() - start
+
+    print_report(result)
+    backend = "NumPy" if np is not None and not args.no_numpy else "Python"
+    print(f"\n{len(columns)} Antworten: laden {load_seconds:.2f} s, auswerten {analyze_seconds:.2f} s ({backend})")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({topic: [asdict(s) for s in stats] for topic, stats in result.items()},
+                      f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fragen-Generator
+Erzeugt künstliche Fragenbanken beliebiger Größe für Last- und Skalierungstests.
+
+Die Fragen haben das Question-Format der echten Banken (inkl. Umlauten,
+'(Mehrfachauswahl)'-Hinweisen und Themen der Form 'Bereich - Unterthema')
+und können als Themenmodul im Stil von questions/*.py gespeichert werden.
+
+Aufruf:
+    python bank_generator.py --size 10000 --output questions/synthetisch.py
+"""
+
+import argparse
+import os
+import random
+import sys
+from typing import List, Optional, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from quiz_engine import Question, _index_to_letters
+
+
+DEFAULT_TOPICS = (
+    "Signalverarbeitung - Fourier",
+    "Signalverarbeitung - Abtastung",
+    "Signalverarbeitung - Quantisierung",
+    "Signalverarbeitung - Filter",
+    "Computergrafik - Mathematik",
+    "Computergrafik - Pipeline",
+    "Computergrafik - Beleuchtung",
+    "Computergrafik - Texturen",
+)
+
+_TERMS = (
+    "Nyquist-Frequenz", "Abtasttheorem", "Fourier-Transformation", "Faltung", "Impulsantwort",
+    "Übertragungsfunktion", "Quantisierungsrauschen", "Dynamikumfang", "Tiefpassfilter", "Aliasing",
+    "Skalarprodukt", "Kreuzprodukt", "Homogene Koordinaten", "Rasterisierung", "Z-Buffer",
+    "Phong-Beleuchtung", "Normalenvektor", "Mipmapping", "Texturkoordinaten", "Gammakorrektur",
+)
+
+_WORDS = (
+    "Signal", "Frequenz", "Spektrum", "Amplitude", "Phase", "Abtastung", "Rauschen", "Größe",
+    "Vektor", "Matrix", "Fläche", "Licht", "Farbe", "Schatten", "Oberfläche", "Pixel",
+    "wird", "berechnet", "über", "durch", "mit", "für", "häufig", "verwendet", "bestimmt",
+    "entsteht", "zwischen", "höher", "niedriger", "gleichmäßig", "ändert", "beschreibt",
+)
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(_WORDS) for _ in range(max(1, words)))
+    return text[0].upper() + text[1:] + "."
+
+
+def generate_bank(
+    size: int,
+    seed: int = 0,
+    option_counts: Sequence[int] = (3, 4, 4, 4, 5, 6),
+    multi_ratio: float = 0.2,
+    explanation_words: Sequence[int] = (15, 60),
+    topics: Sequence[str] = DEFAULT_TOPICS,
+    hint_ratio: float = 0.5,
+) -> List[Question]:
+    """
+    Erzeugt eine künstliche Fragenbank.
+
+    Args:
+        size: Anzahl der Fragen
+        seed: Startwert für reproduzierbare Banken
+        option_counts: Mögliche Anzahl an Antwortoptionen (zufällig gewählt)
+        multi_ratio: Anteil der Fragen mit mehreren richtigen Antworten
+        explanation_words: Minimale/maximale Wortzahl der Erklärungen
+        topics: Themen, die reihum vergeben werden
+        hint_ratio: Anteil der Mehrfachauswahl-Fragen mit '(Mehrfachauswahl)'-Hinweis
+
+    Returns:
+        Liste von Fragen
+    """
+    rng = random.Random(seed)
+    min_words, max_words = explanation_words
+    bank: List[Question] = []
+
+    for i in range(size):
+        n_options = max(2, rng.choice(option_counts))
+        keys = [_index_to_letters(k) for k in range(n_options)]
+        term = rng.choice(_TERMS)
+
+        if rng.random() < multi_ratio:
+            correct = set(rng.sample(keys, rng.randint(2, n_options - 1) if n_options > 2 else 1))
+        else:
+            correct = {rng.choice(keys)}
+
+        prompt = f"Frage {i}: Was gilt für {term}?"
+        if len(correct) > 1 and rng.random() < hint_ratio:
+            prompt += " (Mehrfachauswahl)"
+
+        options = {key: f"{_sentence(rng, rng.randint(4, 10))[:-1]} ({term}, {key}{i})" for key in keys}
+        explain_wrong = {
+            key: _sentence(rng, rng.randint(min_words // 3 + 1, max_words // 3 + 1))
+            for key in keys
+            if key not in correct
+        }
+
+        bank.append(Question(
+            prompt=prompt,
+            options=options,
+            correct=correct,
+            explain_correct=_sentence(rng, rng.randint(min_words, max_words)),
+            explain_wrong=explain_wrong,
+            topic=topics[i % len(topics)] if topics else "",
+        ))
+
+    return bank
+
+
+def write_topic_module(questions: List[Question], path: str, title: Optional[str] = None) -> None:
+    """
+    Speichert Fragen als Themenmodul im Format von questions/*.py
+    (Modul mit get_questions() -> List[Question]).
+    """
+    title = title or "Künstlich erzeugte Fragen"
+    lines = [
+        "#!/usr/bin/env python3",
+        "# -*- coding: utf-8 -*-",
+        "",
+        '"""',
+        f"Fragen zum Thema: {title}",
+        "Automatisch erzeugt mit bank_generator.py",
+        '"""',
+        "",
+        "import sys",
+        "import os",
+        "sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))",
+        "",
+        "from quiz_engine import Question",
+        "from typing import List",
+        "",
+        "",
+        "def get_questions() -> List[Question]:",
+        f'    """Gibt alle Fragen zum Thema {title} zurück"""',
+        "    return [",
+    ]
+
+    for q in questions:
+        lines.append("        Question(")
+        lines.append(f"            prompt={q.prompt!r},")
+        lines.append("            options={")
+        for key in sorted(q.options):
+            lines.append(f"                {key!r}: {q.options[key]!r},")
+        lines.append("            },")
+        lines.append("            correct={" + ", ".join(repr(k) for k in sorted(q.correct)) + "},")
+        lines.append(f"            explain_correct={q.explain_correct!r},")
+        lines.append("            explain_wrong={")
+        for key in sorted(q.explain_wrong):
+            lines.append(f"                {key!r}: {q.explain_wrong[key]!r},")
+        lines.append("            },")
+        lines.append(f"            topic={q.topic!r}")
+        lines.append("        ),")
+
+    lines.append("    ]")
+    lines.append("")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Erzeugt künstliche Fragenbanken")
+    parser.add_argument("--size", type=int, default=1000, help="Anzahl der Fragen")
+    parser.add_argument("--seed", type=int, default=0, help="Startwert des Zufallsgenerators")
+    parser.add_argument("--options", type=int, nargs="+", default=[3, 4, 4, 4, 5, 6],
+                        help="Mögliche Optionsanzahlen")
+    parser.add_argument("--multi-ratio", type=float, default=0.2, help="Anteil Mehrfachauswahl")
+    parser.add_argument("--explanation-words", type=int, nargs=2, default=[15, 60],
+                        metavar=("MIN", "MAX"), help="Wortzahl der Erklärungen")
+    parser.add_argument("--topics", nargs="+", default=list(DEFAULT_TOPICS), help="Themen")
+    parser.add_argument("--output", required=True, help="Zieldatei (Themenmodul .py)")
+    args = parser.parse_args()
+
+    questions = generate_bank(
+        args.size,
+        seed=args.seed,
+        option_counts=args.options,
+        multi_ratio=args.multi_ratio,
+        explanation_words=args.explanation_words,
+        topics=args.topics,
+    )
+    write_topic_module(questions, args.output)
+    print(f"{len(questions)} Fragen nach {args.output} geschrieben.")
+
+
+if __name__ == "__main__":
+    main()
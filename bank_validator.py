@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bank-Prüfung
+Prüft alle Fragen auf Integritätsfehler (fehlende Optionen, fehlende
+Erklärungen, übrig gebliebene '(Mehrfachauswahl)'-Hinweise, ...).
+
+Die Regeln werden einmal zu einer Prüffunktion zusammengesetzt: pro Frage
+werden die gemeinsam benötigten Werte (Schlüsselmengen, bereinigter Prompt)
+nur einmal berechnet und alle Regeln in einem Durchlauf ausgewertet. Die
+Themenmodule werden parallel in einem Prozess-Pool geprüft.
+
+Aufruf:
+    python bank_validator.py
+    python bank_validator.py --module questions/synthetisch.py --json bericht.json --strict
+
+Exit-Code 1, wenn Fehler gefunden wurden (mit --strict auch bei Warnungen).
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from quiz_engine import Question, _index_to_letters, question_key, sanitize_prompt
+
+
+ERROR = "error"
+WARNING = "warning"
+
+# Hinweis irgendwo im Prompt (sanitize_prompt entfernt ihn nur am Ende)
+_HINT_RE = re.compile(r"\(\s*Mehrfachauswahl[^)]*\)", re.IGNORECASE)
+
+
+@dataclass
+class Issue:
+    """Ein gefundenes Problem"""
+    source: str                          # Themenmodul
+    index: int                           # Position der Frage im Modul
+    rule: str                            # Regel-Code, z.B. 'correct-unknown'
+    severity: str                        # 'error' oder 'warning'
+    message: str
+    prompt: str
+
+
+class Facts(NamedTuple):
+    """Einmal pro Frage berechnete Werte, die sich alle Regeln teilen"""
+    question: Question
+    keys: frozenset
+    correct: frozenset
+    wrong: frozenset
+    prompt: str                          # bereinigter Prompt
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Integritätsregel: check() gibt None oder eine Fehlermeldung zurück"""
+    code: str
+    severity: str
+    check: Callable[[Facts], Optional[str]]
+
+
+@lru_cache(maxsize=None)
+def _expected_keys(count: int) -> frozenset:
+    return frozenset(_index_to_letters(i) for i in range(count))
+
+
+def _sorted(keys) -> str:
+    return ", ".join(sorted(keys))
+
+
+def _empty_options(f: Facts) -> Optional[str]:
+    empty = [key for key, text in f.question.options.items() if not text.strip()]
+    return f"Leere Option(en): {_sorted(empty)}" if empty else None
+
+
+def _missing_wrong_explanations(f: Facts) -> Optional[str]:
+    missing = f.wrong - f.question.explain_wrong.keys()
+    return f"Keine Erklärung für falsche Option(en): {_sorted(missing)}" if missing else None
+
+
+def _extra_wrong_explanations(f: Facts) -> Optional[str]:
+    extra = f.question.explain_wrong.keys() - f.wrong
+    return f"Erklärung für richtige/unbekannte Option(en): {_sorted(extra)}" if extra else None
+
+
+RULES: Tuple[Rule, ...] = (
+    Rule("prompt-empty", ERROR,
+         lambda f: "Prompt ist leer" if not f.prompt else None),
+    Rule("options-too-few", ERROR,
+         lambda f: f"Nur {len(f.keys)} Antwortoption(en)" if len(f.keys) < 2 else None),
+    Rule("option-empty", ERROR, _empty_options),
+    Rule("correct-empty", ERROR,
+         lambda f: "Keine richtige Antwort angegeben" if not f.correct else None),
+    Rule("correct-unknown", ERROR,
+         lambda f: (f"Richtige Antwort(en) ohne Option: {_sorted(f.correct - f.keys)}"
+                    if not f.correct <= f.keys else None)),
+    Rule("correct-all", WARNING,
+         lambda f: "Alle Optionen sind richtig" if f.keys and f.correct >= f.keys else None),
+    Rule("explain-wrong-missing", ERROR, _missing_wrong_explanations),
+    Rule("explain-wrong-extra", WARNING, _extra_wrong_explanations),
+    Rule("explain-correct-empty", WARNING,
+         lambda f: "Erklärung der Lösung fehlt" if not f.question.explain_correct.strip() else None),
+    Rule("option-keys-gap", WARNING,
+         lambda f: (f"Optionsschlüssel nicht fortlaufend: {_sorted(f.keys)}"
+                    if f.keys != _expected_keys(len(f.keys)) else None)),
+    Rule("option-duplicate", WARNING,
+         lambda f: ("Doppelte Optionstexte"
+                    if len(set(t.strip().lower() for t in f.question.options.values())) < len(f.keys)
+                    else None)),
+    Rule("hint-stray", WARNING,
+         lambda f: "'(Mehrfachauswahl)' mitten im Prompt" if _HINT_RE.search(f.prompt) else None),
+    Rule("hint-single", WARNING,
+         lambda f: ("'(Mehrfachauswahl)'-Hinweis bei nur einer richtigen Antwort"
+                    if len(f.correct) == 1 and f.prompt != f.question.prompt.strip() else None)),
+    Rule("topic-empty", WARNING,
+         lambda f: "Kein Thema angegeben" if not f.question.topic.strip() else None),
+)
+
+
+def compile_rules(rules: Sequence[Rule] = RULES) -> Callable[[Question], List[Tuple[Rule, str]]]:
+    """
+    Setzt die Regeln zu einer Prüffunktion zusammen.
+
+    Returns:
+        Funktion Frage -> Liste (Regel, Meldung) der verletzten Regeln
+    """
+    checks = tuple((rule, rule.check) for rule in rules)
+
+    def validate(question: Question) -> List[Tuple[Rule, str]]:
+        keys = frozenset(question.options)
+        correct = frozenset(question.correct)
+        facts = Facts(question, keys, correct, keys - correct, sanitize_prompt(question.prompt))
+        found = []
+        for rule, check in checks:
+            message = check(facts)
+            if message is not None:
+                found.append((rule, message))
+        return found
+
+    return validate
+
+
+def validate_questions(questions: Sequence[Question], source: str = "",
+                       rules: Sequence[Rule] = RULES) -> List[Issue]:
+    """Prüft eine Fragenliste (Einzelregeln plus doppelte Fragenschlüssel)"""
+    validate = compile_rules(rules)
+    issues: List[Issue] = []
+    seen: Dict[str, int] = {}
+
+    for index, question in enumerate(questions):
+        for rule, message in validate(question):
+            issues.append(Issue(source, index, rule.code, rule.severity, message, question.prompt))
+
+        # Lernstand und Antwort-Log verwenden die Fragen-ID (Inhalt), gleiche IDs vermischen Statistiken
+        key = question_key(question)
+        first = seen.setdefault(key, index)
+        if first != index:
+            issues.append(Issue(source, index, "key-duplicate", ERROR,
+                                f"Gleicher Inhalt wie Frage {first} (gleiche Fragen-ID)", question.prompt))
+    return issues
+
+
+def _validate_source(job: Tuple[str, Callable[[], List[Question]]]) -> dict:
+    """Prüft ein Themenmodul (läuft im Worker-Prozess)"""
+    source, loader = job
+    started = time.perf_counter()
+    questions = loader()
+    loaded = time.perf_counter()
+    issues = validate_questions(questions, source)
+    return {
+        "source": source,
+        "questions": len(questions),
+        "load_seconds": loaded - started,
+        "validate_seconds": time.perf_counter() - loaded,
+        "issues": [asdict(issue) for issue in issues],
+    }
+
+
+class _ModuleLoader:
+    """Picklebarer Loader für Themenmodule als Datei"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self) -> List[Question]:
+        from questions import load_topic_module
+        return load_topic_module(self.path)
+
+
+def validate_banks(sources: Sequence[Tuple[str, Callable[[], List[Question]]]],
+                   processes: Optional[int] = None) -> dict:
+    """
+    Prüft mehrere Themenmodule parallel.
+
+    Args:
+        sources: (Name, Loader) pro Modul; Loader müssen picklebar sein
+        processes: Größe des Prozess-Pools (None = Anzahl CPUs, höchstens Anzahl Module)
+
+    Returns:
+        Bericht mit Zusammenfassung und allen Problemen
+    """
+    processes = max(1, min(processes or os.cpu_count() or 1, len(sources)))
+    started = time.perf_counter()
+    if processes == 1:
+        modules = [_validate_source(job) for job in sources]
+    else:
+        with multiprocessing.Pool(processes=processes) as pool:
+            modules = pool.map(_validate_source, sources)
+
+    issues = [issue for module in modules for issue in module["issues"]]
+    by_rule: Dict[str, int] = {}
+    for issue in issues:
+        by_rule[issue["rule"]] = by_rule.get(issue["rule"], 0) + 1
+
+    return {
+        "questions": sum(module["questions"] for module in modules),
+        "errors": sum(1 for issue in issues if issue["severity"] == ERROR),
+        "warnings": sum(1 for issue in issues if issue["severity"] == WARNING),
+        "by_rule": dict(sorted(by_rule.items())),
+        "wall_seconds": time.perf_counter() - started,
+        "modules": [{k: v for k, v in module.items() if k != "issues"} for module in modules],
+        "issues": issues,
+    }
+
+
+def print_report(report: dict, max_issues: int = 50) -> None:
+    """Gibt den Bericht auf der Konsole aus"""
+    for module in report["modules"]:
+        print(f"  {module['source']}: {module['questions']} Fragen "
+              f"(laden {module['load_seconds']:.2f} s, prüfen {module['validate_seconds']:.2f} s)")
+    print()
+
+    for issue in report["issues"][:max_issues]:
+        marker = "FEHLER " if issue["severity"] == ERROR else "WARNUNG"
+        print(f"  {marker} {issue['source']}#{issue['index']} [{issue['rule']}] {issue['message']}")
+        print(f"          {sanitize_prompt(issue['prompt'])[:80]}")
+    if len(report["issues"]) > max_issues:
+        print(f"  ... und {len(report['issues']) - max_issues} weitere")
+
+    print()
+    print(f"{report['questions']} Fragen geprüft: {report['errors']} Fehler, "
+          f"{report['warnings']} Warnungen ({report['wall_seconds']:.2f} s)")
+    for rule, count in report["by_rule"].items():
+        print(f"    {rule:<24}{count:>8}")
+
+
+def main():
+    """Hauptfunktion"""
+    from questions import TOPICS
+
+    parser = argparse.ArgumentParser(description="Prüft Fragenbanken auf Integritätsfehler")
+    parser.add_argument("--module", action="append", default=[],
+                        help="Zusätzliches Themenmodul (.py), mehrfach möglich")
+    parser.add_argument("--only-modules", action="store_true", help="Nur die angegebenen Module prüfen")
+    parser.add_argument("--processes", type=int, default=None, help="Größe des Prozess-Pools")
+    parser.add_argument("--strict", action="store_true", help="Auch Warnungen als Fehler werten")
+    parser.add_argument("--json", metavar="DATEI", help="Bericht als JSON speichern")
+    args = parser.parse_args()
+
+    sources: List[Tuple[str, Callable[[], List[Question]]]] = []
+    if not args.only_modules:
+        sources.extend(TOPICS.items())
+    sources.extend((path, _ModuleLoader(path)) for path in args.module)
+    if not sources:
+        parser.error("Keine Themenmodule angegeben")
+
+    report = validate_banks(sources, args.processes)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    failed = report["errors"] or (args.strict and report["warnings"])
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
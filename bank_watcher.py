@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Banken neu laden
+Hält die geladenen Fragenbanken samt Such- und Themen-Index und lädt ein
+Themenmodul neu, sobald sich seine Quelldatei ändert (z.B. während jemand
+an questions/*.py schreibt, ohne die GUI neu zu starten).
+
+Neu geladen wird nur das geänderte Modul, und zwar im Hintergrund. Die neue
+Fragenliste wird über die Identität der Fragen (Fragenschlüssel, bei
+gleichem Schlüssel zusätzlich die laufende Nummer) mit der geladenen Bank
+verglichen; nur hinzugekommene, entfernte und inhaltlich geänderte Fragen
+ändern die Indizes. Wer eine Frage in einer Bank mit 10 000 Fragen
+korrigiert, bezahlt also das erneute Ausführen des Moduls, aber keinen
+Neuaufbau der Indizes.
+
+Die Dateien werden per os.stat abgefragt (Änderungszeit und Größe), das
+braucht keine Zusatzbibliothek und kostet pro Sekunde nur ein paar
+Systemaufrufe.
+"""
+
+import hashlib
+import inspect
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from quiz_engine import Question, question_key
+from search_index import SearchIndex
+from topic_index import TopicIndex
+
+
+Identity = Tuple[str, int]               # (Fragenschlüssel, laufende Nummer bei gleichem Schlüssel)
+
+POLL_INTERVAL = 1.0
+SETTLE_SECONDS = 0.3                     # Editoren schreiben in mehreren Schritten: kurz abwarten
+
+
+def question_fingerprint(question: Question) -> str:
+    """Prüfsumme über den ganzen Inhalt einer Frage (ändert sich bei jeder Korrektur)"""
+    parts = [question.topic, question.prompt, question.explain_correct, ",".join(sorted(question.correct))]
+    parts.extend(f"{key}\x1f{text}" for key, text in sorted(question.options.items()))
+    parts.extend(f"{key}\x1f{text}" for key, text in sorted(question.explain_wrong.items()))
+    return hashlib.sha1("\x1e".join(parts).encode("utf-8")).hexdigest()
+
+
+def identities(questions: Iterable[Question]) -> List[Identity]:
+    """Identität jeder Frage; doppelte Schlüssel werden durchnummeriert"""
+    seen: Dict[str, int] = {}
+    result = []
+    for question in questions:
+        key = question_key(question)
+        number = seen.get(key, 0)
+        seen[key] = number + 1
+        result.append((key, number))
+    return result
+
+
+def source_path(loader: Callable[[], List[Question]]) -> Optional[str]:
+    """Quelldatei eines Loaders (auch durch @traced ummantelt), None falls unbekannt"""
+    module = sys.modules.get(getattr(inspect.unwrap(loader), "__module__", ""))
+    path = getattr(module, "__file__", None)
+    return os.path.abspath(path) if path else None
+
+
+@dataclass
+class BankDiff:
+    """Ergebnis eines (Neu-)Ladens"""
+    topic: str
+    added: int = 0
+    removed: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    seconds: float = 0.0                 # Laden und Abgleich zusammen
+    error: str = ""                      # Fehlermeldung, falls das Modul nicht geladen werden konnte
+
+    def __str__(self) -> str:
+        if self.error:
+            return f"{self.topic}: nicht neu geladen ({self.error})"
+        return (f"{self.topic}: +{self.added} -{self.removed} ~{self.changed} "
+                f"({self.unchanged} unverändert, {self.seconds * 1000:.0f} ms)")
+
+
+class TopicBank:
+    """
+    Fragenbank eines Themenmoduls mit Such- und Themen-Index, die sich
+    inkrementell aktualisieren lassen. Dokument-IDs wachsen monoton (entfernte
+    Fragen bleiben als Lücke), beide Indizes vergeben dieselben IDs.
+
+    Alle Zugriffe laufen unter `lock`, das Neuladen im Hintergrund und das
+    Lesen aus der GUI (Worker-Thread) kommen sich so nicht in die Quere.
+    """
+
+    # Neuaufbau, sobald mehr Lücken als lebende Fragen in den Indizes stehen
+    COMPACT_MIN_DELETED = 1000
+
+    def __init__(self, name: str, questions: Sequence[Question] = ()):
+        self.name = name
+        self.lock = threading.RLock()
+        self._reset()
+        self.apply(questions)
+
+    def _reset(self) -> None:
+        self.search_index = SearchIndex()
+        self.topic_index = TopicIndex()
+        self._entries: Dict[Identity, Tuple[int, str]] = {}   # Identität -> (Dokument-ID, Prüfsumme)
+        self._order: List[int] = []                           # Dokument-IDs in der Reihenfolge der Quelle
+        self._position: Dict[int, int] = {}
+        self._deleted = 0
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def _add(self, question: Question) -> int:
+        doc_id = self.search_index.add(question)
+        if self.topic_index.add(question) != doc_id:
+            raise RuntimeError("Such- und Themen-Index sind auseinandergelaufen")
+        return doc_id
+
+    def _remove(self, doc_id: int) -> None:
+        self.search_index.remove(doc_id)
+        self.topic_index.remove(doc_id)
+        self._deleted += 1
+
+    def apply(self, questions: Sequence[Question], fingerprints: Optional[Sequence[str]] = None) -> BankDiff:
+        """
+        Gleicht die Bank mit einer neuen Fragenliste ab und aktualisiert die Indizes.
+
+        Args:
+            questions: Neue Fragenliste des Moduls (Reihenfolge wie in der Quelle)
+            fingerprints: Vorab berechnete question_fingerprint() (z.B. im Hintergrund-Thread)
+        """
+        start = time.perf_counter()
+        new_ids = identities(questions)
+        if fingerprints is None:
+            fingerprints = [question_fingerprint(q) for q in questions]
+
+        with self.lock:
+            diff = BankDiff(self.name)
+            entries: Dict[Identity, Tuple[int, str]] = {}
+            order: List[int] = []
+            for identity, question, fingerprint in zip(new_ids, questions, fingerprints):
+                old = self._entries.pop(identity, None)
+                if old is not None and old[1] == fingerprint:
+                    doc_id = old[0]
+                    diff.unchanged += 1
+                else:
+                    if old is not None:
+                        self._remove(old[0])
+                        diff.changed += 1
+                    else:
+                        diff.added += 1
+                    doc_id = self._add(question)
+                entries[identity] = (doc_id, fingerprint)
+                order.append(doc_id)
+
+            # Was übrig bleibt, gibt es in der Quelle nicht mehr
+            for doc_id, _ in self._entries.values():
+                self._remove(doc_id)
+                diff.removed += 1
+
+            self._entries = entries
+            self._order = order
+            self._position = {doc_id: position for position, doc_id in enumerate(order)}
+
+            if self._deleted >= max(self.COMPACT_MIN_DELETED, len(order)):
+                self._compact(questions, fingerprints)
+
+        diff.seconds = time.perf_counter() - start
+        return diff
+
+    def _compact(self, questions: Sequence[Question], fingerprints: Sequence[str]) -> None:
+        """Baut die Indizes ohne Lücken neu auf"""
+        self._reset()
+        for identity, question, fingerprint in zip(identities(questions), questions, fingerprints):
+            doc_id = self._add(question)
+            self._entries[identity] = (doc_id, fingerprint)
+            self._order.append(doc_id)
+        self._position = {doc_id: doc_id for doc_id in self._order}
+
+    def questions(self) -> List[Question]:
+        """Alle Fragen in der Reihenfolge der Quelle (neue Liste)"""
+        with self.lock:
+            docs = self.search_index.questions
+            return [docs[doc_id] for doc_id in self._order]
+
+    def select(self, search: str = "", subtopics: Sequence[str] = ()) -> List[Question]:
+        """
+        Fragen nach Volltextsuche und/oder Unterthemen (Reihenfolge der Quelle).
+
+        Args:
+            search: Suchbegriffe (siehe SearchIndex.search)
+            subtopics: Unterthemen (siehe TopicIndex.ids_matching)
+        """
+        with self.lock:
+            if not search and not subtopics:
+                return self.questions()
+            ids = set(self.search_index.search(search)) if search else None
+            if subtopics:
+                matching = self.topic_index.ids_matching(subtopics)
+                ids = matching if ids is None else ids & matching
+            docs = self.search_index.questions
+            position = self._position
+            return [docs[doc_id] for doc_id in sorted(ids, key=position.__getitem__)]
+
+
+class BankWatcher:
+    """
+    Lädt Themenmodule bei Bedarf und hält sie aktuell.
+
+    Ohne start() werden die Banken nur einmal geladen (und zwischengespeichert);
+    mit start() prüft ein Hintergrund-Thread die Quelldateien und lädt
+    geänderte Module neu. `on_change` wird im Hintergrund-Thread aufgerufen.
+    """
+
+    def __init__(
+        self,
+        loaders: Dict[str, Callable[[], List[Question]]],
+        on_change: Optional[Callable[[BankDiff], None]] = None,
+        interval: float = POLL_INTERVAL,
+    ):
+        """
+        Args:
+            loaders: Anzeigename -> Loader (z.B. questions.TOPICS)
+            on_change: Empfänger für jedes Neuladen (auch fehlgeschlagene)
+            interval: Abstand der Dateiprüfungen in Sekunden
+        """
+        self.loaders = dict(loaders)
+        self.paths = {name: source_path(loader) for name, loader in self.loaders.items()}
+        self.on_change = on_change
+        self.interval = interval
+        self.banks: Dict[str, TopicBank] = {}
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_module(self, name: str, path: str) -> None:
+        """Registriert eine Themenmodul-Datei (z.B. aus bank_generator.py)"""
+        from questions import load_topic_module
+
+        path = os.path.abspath(path)
+        self.loaders[name] = lambda: load_topic_module(path)
+        self.paths[name] = path
+
+    def _stamp(self, name: str) -> Optional[Tuple[int, int]]:
+        path = self.paths.get(name)
+        if path is None:
+            return None
+        try:
+            info = os.stat(path)
+        except OSError:
+            return None
+        return info.st_mtime_ns, info.st_size
+
+    def bank(self, name: str) -> TopicBank:
+        """Bank eines Themenmoduls (wird beim ersten Zugriff geladen)"""
+        with self._lock:
+            bank = self.banks.get(name)
+            if bank is None:
+                stamp = self._stamp(name)
+                bank = self.banks[name] = TopicBank(name, self.loaders[name]())
+                self._stamps[name] = stamp
+            return bank
+
+    def loader(self, name: str) -> Callable[[], List[Question]]:
+        """Loader, der immer den aktuellen Stand der Bank liefert"""
+        return lambda: self.bank(name).questions()
+
+    def _load_source(self, name: str) -> List[Question]:
+        """Führt die Quelldatei neu aus (das importierte Modul bleibt unverändert)"""
+        from questions import load_topic_module
+
+        path = self.paths[name]
+        if path is None:
+            return self.loaders[name]()
+        return load_topic_module(path)
+
+    def reload(self, name: str) -> BankDiff:
+        """Lädt ein Themenmodul neu und gleicht die Bank ab"""
+        start = time.perf_counter()
+        try:
+            questions = self._load_source(name)
+        except Exception as exc:  # Syntaxfehler o.ä. beim Bearbeiten: alte Bank behalten
+            return BankDiff(name, error=f"{type(exc).__name__}: {exc}", seconds=time.perf_counter() - start)
+        # Prüfsummen außerhalb der Sperre: Lesende warten nur auf den Abgleich
+        fingerprints = [question_fingerprint(q) for q in questions]
+        diff = self.bank(name).apply(questions, fingerprints)
+        diff.seconds = time.perf_counter() - start
+        return diff
+
+    def check(self) -> List[BankDiff]:
+        """Prüft alle geladenen Banken einmal und lädt geänderte neu"""
+        diffs = []
+        for name in list(self.banks):
+            stamp = self._stamp(name)
+            if stamp is None or stamp == self._stamps.get(name):
+                continue
+            time.sleep(SETTLE_SECONDS)
+            stamp = self._stamp(name)
+            self._stamps[name] = stamp
+            diff = self.reload(name)
+            diffs.append(diff)
+            if self.on_change is not None:
+                self.on_change(diff)
+        return diffs
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> None:
+        """Startet die Überwachung im Hintergrund"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="bank-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + SETTLE_SECONDS + 1.0)
+            self._thread = None
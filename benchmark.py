@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark
+Simuliert Lernende ohne Oberfläche und misst die Hot Paths der Quiz-Engine
+(Auswahl mit Cooldown, prepare_question, normalize_answer, evaluate).
+
+Jede simulierte Person läuft in einem eigenen Prozess eines multiprocessing-Pools.
+
+Mit --threads läuft stattdessen ein Stresstest: viele Sitzungen (je eine
+QuizEngine) teilen sich eine Fragenliste und laufen gleichzeitig in einem
+Thread-Pool. Jede Sitzung wird vorher einzeln als Referenz gespielt; weicht
+ein Verlauf im Thread-Pool davon ab (Fragen, Mischung, Zähler, Events), gibt
+es Übersprechen zwischen Sitzungen.
+
+Aufruf:
+    python benchmark.py --sizes 100 1000 10000 100000 --learners 8 --answers 2000
+    python benchmark.py --threads 32 --sessions 500 --answers 200 --sizes 1000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from quiz_engine import AnswerEvent, Question, QuizEngine, prepare_question
+from bank_generator import generate_bank
+
+
+OPERATIONS = ("select", "available", "prepare", "normalize", "evaluate")
+
+# get_available_questions ist O(N) und wird daher nur stichprobenartig gemessen
+AVAILABLE_SAMPLES = 200
+
+
+def _peak_rss_mb() -> float:
+    """Maximaler Speicher des Prozesses (ru_maxrss ist KB unter Linux, Bytes unter macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_learner(args: tuple) -> dict:
+    """
+    Simuliert eine lernende Person (läuft im Worker-Prozess).
+
+    Returns:
+        Messwerte pro Operation (Sekunden), Antwortzahl, Laufzeit und Speicher
+    """
+    bank_size, answers, seed, accuracy = args
+    rng = random.Random(seed)
+
+    started = time.perf_counter()
+    bank = generate_bank(bank_size, seed=bank_size)
+    build_seconds = time.perf_counter() - started
+
+    engine = QuizEngine(bank, cooldown=min(10, bank_size - 1))
+    timings: Dict[str, List[float]] = {op: [] for op in OPERATIONS}
+    clock = time.perf_counter
+    correct = 0
+
+    loop_started = clock()
+    for i in range(answers):
+        if i < AVAILABLE_SAMPLES:
+            t0 = clock()
+            engine.get_available_questions()
+            timings["available"].append(clock() - t0)
+
+        t0 = clock()
+        index = engine.scheduler.next_index()
+        t1 = clock()
+        prepared = prepare_question(bank[index], rng=rng)
+        t2 = clock()
+
+        # Lernende tippen die richtige Antwort mit Wahrscheinlichkeit `accuracy`
+        if rng.random() < accuracy:
+            keys = sorted(prepared.correct)
+        else:
+            keys = [rng.choice(sorted(prepared.options))]
+        raw = " ".join(k.lower() for k in keys)
+
+        t3 = clock()
+        user_set = engine.normalize_answer(raw)
+        t4 = clock()
+        is_correct, _ = engine.evaluate(prepared, user_set)
+        t5 = clock()
+
+        engine.scheduler.record(index, is_correct)
+        correct += is_correct
+
+        timings["select"].append(t1 - t0)
+        timings["prepare"].append(t2 - t1)
+        timings["normalize"].append(t4 - t3)
+        timings["evaluate"].append(t5 - t4)
+
+    return {
+        "timings": timings,
+        "answers": answers,
+        "correct": correct,
+        # Stichproben von get_available_questions nicht in den Durchsatz einrechnen
+        "loop_seconds": clock() - loop_started - sum(timings["available"]),
+        "build_seconds": build_seconds,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_benchmark(bank_size: int, learners: int, answers: int, processes: int, accuracy: float = 0.7) -> dict:
+    """Führt den Benchmark für eine Bankgröße aus und fasst die Ergebnisse zusammen"""
+    jobs = [(bank_size, answers, seed, accuracy) for seed in range(learners)]
+
+    started = time.perf_counter()
+    with multiprocessing.Pool(processes=processes) as pool:
+        results = pool.map(run_learner, jobs)
+    wall_seconds = time.perf_counter() - started
+
+    total_answers = sum(r["answers"] for r in results)
+    operations = {}
+    for op in OPERATIONS:
+        values = sorted(v for r in results for v in r["timings"][op])
+        operations[op] = {
+            "count": len(values),
+            "p50_us": _percentile(values, 0.50) * 1e6,
+            "p99_us": _percentile(values, 0.99) * 1e6,
+        }
+
+    return {
+        "bank_size": bank_size,
+        "learners": learners,
+        "processes": processes,
+        "answers": total_answers,
+        # Durchsatz aller Prozesse zusammen (nur Antwortschleife, ohne Bankaufbau)
+        "answers_per_second": sum(r["answers"] / r["loop_seconds"] for r in results if r["loop_seconds"] > 0),
+        "wall_seconds": wall_seconds,
+        "bank_build_seconds": max(r["build_seconds"] for r in results),
+        "peak_rss_mb": max(r["peak_rss_mb"] for r in results),
+        "operations": operations,
+    }
+
+
+def play_session(bank: Sequence[Question], seed: int, answers: int, accuracy: float) -> Tuple[list, tuple]:
+    """
+    Spielt eine Sitzung ohne Oberfläche.
+
+    Returns:
+        (Verlauf [(Index, Optionsreihenfolge, richtig?)], (richtig, beantwortet, Events ok?))
+    """
+    engine = QuizEngine(bank, cooldown=min(10, len(bank) - 1), user=f"sitzung{seed}", rng=random.Random(seed))
+    events: List[AnswerEvent] = []
+    engine.add_answer_listener(events.append)
+    learner = random.Random(-seed - 1)
+
+    trace = []
+    for _ in range(answers):
+        index, prepared = engine.next_question()
+        if learner.random() < accuracy:
+            user_set = set(prepared.correct)
+        else:
+            user_set = {learner.choice(sorted(prepared.options))}
+        is_correct, _ = engine.submit_answer(prepared, user_set, index)
+        trace.append((index, tuple(prepared.options.values()), is_correct))
+
+    events_ok = len(events) == answers and all(event.user == engine.user for event in events)
+    return trace, (engine.correct_count, engine.total_answered, events_ok)
+
+
+def run_thread_stress(bank_size: int, sessions: int, answers: int, threads: int, accuracy: float = 0.7) -> dict:
+    """Stresstest: viele Sitzungen gleichzeitig im Thread-Pool, verglichen mit Einzelläufen"""
+    bank = generate_bank(bank_size, seed=bank_size)
+
+    started = time.perf_counter()
+    reference = [play_session(bank, seed, answers, accuracy) for seed in range(sessions)]
+    sequential_seconds = time.perf_counter() - started
+
+    # Kurzes Umschaltintervall, damit sich die Threads möglichst oft abwechseln
+    previous_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            futures = [pool.submit(play_session, bank, seed, answers, accuracy) for seed in range(sessions)]
+            results = [future.result() for future in futures]
+        threaded_seconds = time.perf_counter() - started
+    finally:
+        sys.setswitchinterval(previous_interval)
+
+    mismatched = [seed for seed in range(sessions) if results[seed] != reference[seed]]
+    counters_ok = all(
+        correct == sum(step[2] for step in trace) and total == len(trace) and events_ok
+        for trace, (correct, total, events_ok) in results
+    )
+    total_answers = sessions * answers
+    return {
+        "bank_size": bank_size,
+        "sessions": sessions,
+        "threads": threads,
+        "answers": total_answers,
+        "cross_talk_sessions": len(mismatched),
+        "counters_ok": counters_ok,
+        "sequential_answers_per_second": total_answers / sequential_seconds,
+        "threaded_answers_per_second": total_answers / threaded_seconds,
+    }
+
+
+def print_stress_report(report: dict) -> None:
+    """Gibt das Ergebnis des Thread-Stresstests aus"""
+    print("=" * 70)
+    print(f"  Thread-Stresstest: {report['sessions']} Sitzungen, {report['threads']} Threads, "
+          f"Bank {report['bank_size']} Fragen")
+    print("-" * 70)
+    print(f"  Antworten gesamt:          {report['answers']}")
+    print(f"  Sitzungen mit Übersprechen: {report['cross_talk_sessions']}")
+    print(f"  Zähler und Events korrekt:  {'ja' if report['counters_ok'] else 'NEIN'}")
+    print(f"  Antworten/s einzeln:        {report['sequential_answers_per_second']:.0f}")
+    print(f"  Antworten/s Thread-Pool:    {report['threaded_answers_per_second']:.0f}")
+    print()
+
+
+def print_report(report: dict) -> None:
+    """Gibt einen Bericht als Tabelle aus"""
+    print("=" * 70)
+    print(f"  Bank: {report['bank_size']} Fragen, {report['learners']} Lernende, "
+          f"{report['processes']} Prozesse")
+    print(f"  Antworten/s: {report['answers_per_second']:.0f}   "
+          f"Bankaufbau: {report['bank_build_seconds']:.2f} s   "
+          f"Peak RSS: {report['peak_rss_mb']:.1f} MB")
+    print("-" * 70)
+    print(f"  {'Operation':<12}{'Anzahl':>10}{'p50 (us)':>14}{'p99 (us)':>14}")
+    for op, stats in report["operations"].items():
+        print(f"  {op:<12}{stats['count']:>10}{stats['p50_us']:>14.1f}{stats['p99_us']:>14.1f}")
+    print()
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Benchmark der Quiz-Engine mit simulierten Lernenden")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000],
+                        help="Bankgrößen (z.B. 100 1000 1000000)")
+    parser.add_argument("--learners", type=int, default=4, help="Simulierte Lernende pro Bankgröße")
+    parser.add_argument("--answers", type=int, default=2000, help="Antworten pro lernender Person")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Größe des Prozess-Pools")
+    parser.add_argument("--accuracy", type=float, default=0.7, help="Anteil richtiger Antworten")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="Thread-Stresstest mit dieser Pool-Größe statt Prozess-Benchmark")
+    parser.add_argument("--sessions", type=int, default=200, help="Sitzungen im Thread-Stresstest")
+    parser.add_argument("--json", metavar="DATEI", help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    reports = []
+    failed = False
+    for size in args.sizes:
+        if args.threads > 0:
+            report = run_thread_stress(size, args.sessions, args.answers, args.threads, args.accuracy)
+            print_stress_report(report)
+            failed |= report["cross_talk_sessions"] > 0 or not report["counters_ok"]
+        else:
+            report = run_benchmark(size, args.learners, args.answers, args.processes, args.accuracy)
+            print_report(report)
+        reports.append(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Live-Modus für Vorlesungen
+Die Lehrperson schickt eine Frage gleichzeitig an alle Teilnehmenden, die
+Antworten laufen zurück und werden live ausgezählt (Stimmen pro Option,
+Anteil richtiger Antworten).
+
+Bewertet wird wie in QuizEngine.evaluate (check_answer): ungültige Auswahl
+wird abgelehnt, richtig ist nur die exakt richtige Menge.
+
+Eine Antwort kostet nur ein paar Zähler-Updates. Der Zwischenstand wird
+höchstens alle TALLY_INTERVAL Sekunden an die Lehrperson geschickt, auch
+wenn in dieser Zeit tausend Antworten eintreffen. Broadcasts schreiben
+in die Sendepuffer, ohne auf einzelne Clients zu warten; wer nicht
+mitliest, wird übersprungen.
+"""
+
+import asyncio
+import json
+import random
+import string
+import time
+from typing import Callable, Dict, Iterable, Optional, Sequence, Set
+
+from quiz_engine import AnswerEvent, Question, check_answer, make_answer_event, prepare_question
+
+
+TALLY_INTERVAL = 0.2                     # Sekunden zwischen Zwischenständen
+MAX_WRITE_BUFFER = 256 * 1024            # Langsame Clients bekommen keine weiteren Broadcasts
+CODE_LENGTH = 5
+
+
+def encode_message(message: dict) -> bytes:
+    return json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def broadcast(writers: Iterable[asyncio.StreamWriter], message: dict) -> int:
+    """
+    Schickt eine Nachricht an viele Clients, ohne zu blockieren.
+
+    Returns:
+        Anzahl der Clients, an die geschrieben wurde
+    """
+    data = encode_message(message)
+    sent = 0
+    for writer in writers:
+        if writer.is_closing() or writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            continue
+        writer.write(data)
+        sent += 1
+    return sent
+
+
+class Classroom:
+    """Ein Raum: eine Lehrperson, beliebig viele Teilnehmende"""
+
+    def __init__(self, code: str, bank: Sequence[Question], host: asyncio.StreamWriter,
+                 listeners: Iterable[Callable[[AnswerEvent], None]] = (),
+                 rng: Optional[random.Random] = None):
+        self.code = code
+        self.bank = bank
+        self.host = host
+        self.listeners = list(listeners)
+        self.rng = rng or random.Random()
+        self.members: Dict[asyncio.StreamWriter, str] = {}
+
+        self.round = 0
+        self.question: Optional[Question] = None
+        self.open = False
+        self.answered: Set[asyncio.StreamWriter] = set()
+        self.option_counts: Dict[str, int] = {}
+        self.correct_count = 0
+        self.pushed_at = 0.0
+        self._dirty = False
+        self._tally_task: Optional[asyncio.Task] = None
+        self._asked: Set[int] = set()
+
+    # ------------------------------------------------------------------
+    # Teilnehmende
+    # ------------------------------------------------------------------
+
+    def join(self, writer: asyncio.StreamWriter, user: str) -> dict:
+        self.members[writer] = user
+        self._dirty = True
+        message = {"op": "joined", "room": self.code, "members": len(self.members)}
+        if self.open:
+            # Späte Ankunft: laufende Frage direkt mitschicken
+            writer.write(encode_message(self.question_message()))
+        return message
+
+    def leave(self, writer: asyncio.StreamWriter) -> None:
+        if self.members.pop(writer, None) is not None:
+            self._dirty = True
+
+    # ------------------------------------------------------------------
+    # Fragen
+    # ------------------------------------------------------------------
+
+    def question_message(self) -> dict:
+        q = self.question
+        return {
+            "op": "question",
+            "round": self.round,
+            "topic": q.topic,
+            "prompt": q.prompt,
+            "options": q.options,
+            "multi": len(q.correct) > 1,
+        }
+
+    def push(self, index: Optional[int] = None) -> dict:
+        """Stellt die nächste Frage an alle (gleiche Mischung für alle)"""
+        if index is None:
+            # Bis die Bank durch ist, keine Frage doppelt
+            if len(self._asked) >= len(self.bank):
+                self._asked.clear()
+            index = self.rng.randrange(len(self.bank))
+            while index in self._asked:
+                index = self.rng.randrange(len(self.bank))
+        if not 0 <= index < len(self.bank):
+            raise ValueError(f"Fragenindex außerhalb der Bank: {index}")
+        self._asked.add(index)
+
+        self.round += 1
+        self.question = prepare_question(self.bank[index], rng=self.rng)
+        self.open = True
+        self.pushed_at = time.monotonic()
+        self.answered.clear()
+        self.option_counts = {key: 0 for key in self.question.options}
+        self.correct_count = 0
+        self._dirty = True
+
+        message = self.question_message()
+        sent = broadcast(self.members, message)
+        self._ensure_tally_task()
+        return dict(message, op="pushed", sent=sent)
+
+    def submit(self, writer: asyncio.StreamWriter, user_set: Set[str]) -> Optional[str]:
+        """Nimmt eine Antwort an; gibt eine Fehlermeldung zurück oder None"""
+        if not self.open:
+            return "Keine offene Frage"
+        if writer in self.answered:
+            return "Bereits beantwortet"
+        if not user_set:
+            return "Keine gültige Antwort eingegeben"
+
+        is_correct, invalid = check_answer(self.question, user_set)
+        if invalid:
+            return f"Ungültige Auswahl: {' '.join(sorted(invalid))}"
+
+        self.answered.add(writer)
+        counts = self.option_counts
+        for key in user_set:
+            counts[key] += 1
+        self.correct_count += is_correct
+        self._dirty = True
+
+        if self.listeners:
+            latency_ms = (time.monotonic() - self.pushed_at) * 1000.0
+            event = make_answer_event(self.question, user_set, is_correct, self.members.get(writer, ""), latency_ms)
+            for listener in self.listeners:
+                listener(event)
+        return None
+
+    def tally(self) -> dict:
+        answers = len(self.answered)
+        return {
+            "op": "tally",
+            "round": self.round,
+            "open": self.open,
+            "members": len(self.members),
+            "answers": answers,
+            "correct": self.correct_count,
+            "correct_rate": self.correct_count / answers if answers else 0.0,
+            "option_counts": self.option_counts,
+        }
+
+    def reveal(self) -> dict:
+        """Schließt die Frage und schickt Lösung und Endstand an alle"""
+        if self.question is None:
+            raise ValueError("Noch keine Frage gestellt")
+        self.open = False
+        q = self.question
+        result = {
+            "op": "reveal",
+            "round": self.round,
+            "correct_keys": sorted(q.correct),
+            "explain": q.explain_correct,
+            "explain_wrong": q.explain_wrong,
+            "tally": self.tally(),
+        }
+        broadcast(self.members, result)
+        self._dirty = False
+        return result
+
+    def close(self) -> None:
+        broadcast(self.members, {"op": "room_closed", "room": self.code})
+        self.members.clear()
+        self.open = False
+        if self._tally_task is not None:
+            self._tally_task.cancel()
+
+    # ------------------------------------------------------------------
+    # Zwischenstand
+    # ------------------------------------------------------------------
+
+    def _ensure_tally_task(self) -> None:
+        if self._tally_task is None or self._tally_task.done():
+            self._tally_task = asyncio.get_running_loop().create_task(self._tally_loop())
+
+    async def _tally_loop(self) -> None:
+        """Schickt den Zwischenstand gebündelt an die Lehrperson"""
+        while self.open:
+            await asyncio.sleep(TALLY_INTERVAL)
+            if self._dirty and not self.host.is_closing():
+                self._dirty = False
+                broadcast((self.host,), self.tally())
+
+
+class ClassroomHub:
+    """Verwaltet alle offenen Räume eines Servers"""
+
+    def __init__(self, listeners: Iterable[Callable[[AnswerEvent], None]] = ()):
+        self.rooms: Dict[str, Classroom] = {}
+        self.listeners = list(listeners)
+        self._rng = random.Random()
+
+    def create(self, bank: Sequence[Question], host: asyncio.StreamWriter) -> Classroom:
+        while True:
+            code = "".join(self._rng.choice(string.ascii_uppercase) for _ in range(CODE_LENGTH))
+            if code not in self.rooms:
+                break
+        room = Classroom(code, bank, host, self.listeners)
+        self.rooms[code] = room
+        return room
+
+    def get(self, code: str) -> Classroom:
+        room = self.rooms.get(str(code).upper())
+        if room is None:
+            raise ValueError(f"Unbekannter Raum: {code}")
+        return room
+
+    def close(self, room: Classroom) -> None:
+        room.close()
+        self.rooms.pop(room.code, None)
@@ -0,0 +1,588 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Spalten-Log
+Antwort-Log in Spalten statt Zeilen: Einträge werden im Speicher als
+Arrays gesammelt und blockweise (Chunks) geschrieben, jede Spalte
+einzeln mit zlib komprimiert. Auswertungen lesen nur die Spalten, die sie
+brauchen, und springen über den Rest.
+
+Dateiformat (little endian):
+
+    Kopf     MAGIC (8 Bytes)
+    Chunk    "CHNK", Zeilen (u32), Länge Verzeichnis (u32)
+             Verzeichnis JSON [[Name, Typ, Länge, crc32], ...]
+             Spalten in Verzeichnis-Reihenfolge (zlib)
+    Chunk    ...
+
+Typen sind array-Typcodes ("I", "B", "d", ...) oder "s" für eine Liste
+von Texten (durch "\\n" getrennt). Nutzer und Fragenschlüssel stehen
+einmal pro Chunk in einem Wörterbuch ("users", "keys"), die Spalten
+"user" und "question" enthalten nur Indizes darauf. Neue Spalten können
+dazukommen, Leser übergehen unbekannte.
+
+Pro Antwort kostet record() nur ein paar Array-Appends; komprimiert und
+geschrieben wird in einem Hintergrund-Thread. Beim Öffnen wird ein nach
+einem Absturz unvollständiger Chunk am Dateiende abgeschnitten.
+
+Aufruf:
+    python column_log.py --info
+    python column_log.py --convert ~/.lern_quiz/answers.log
+    python column_log.py --export antworten.parquet
+    python column_log.py --export antworten.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from quiz_engine import AnswerEvent, _index_to_letters
+
+
+DEFAULT_COLUMN_LOG_PATH = os.path.join(os.path.expanduser("~"), ".lern_quiz", "answers.qcol")
+
+MAGIC = b"QCOL\x01\x00\x00\x00"
+CHUNK_MAGIC = b"CHNK"
+_CHUNK_HEADER = struct.Struct("<4sII")
+
+COMPRESS_LEVEL = 6
+
+# Spalten der Antworten (Name -> array-Typcode), dazu die Wörterbücher "users" und "keys"
+EVENT_COLUMNS = {
+    "user": "I",                         # Index in "users"
+    "question": "I",                     # Index in "keys"
+    "selected": "I",                     # Bitmaske der gewählten Originaloptionen (A = Bit 0)
+    "correct": "B",
+    "timestamp": "d",
+    "latency": "f",                      # Antwortzeit in ms (0 = nicht gemessen; fehlt in alten Chunks)
+}
+
+
+def selection_mask(selected: str, cache: Dict[str, int]) -> int:
+    """'A,C' -> 0b101 (mit Cache, es gibt nur wenige verschiedene Auswahlen)"""
+    mask = cache.get(selected)
+    if mask is None:
+        mask = 0
+        for letter in filter(None, selected.split(",")):
+            if len(letter) == 1 and "A" <= letter <= "Z":
+                mask |= 1 << (ord(letter) - ord("A"))
+        cache[selected] = mask
+    return mask
+
+
+def mask_letters(mask: int) -> str:
+    """0b101 -> 'A,C'"""
+    letters = []
+    bit = 0
+    while mask:
+        if mask & 1:
+            letters.append(_index_to_letters(bit))
+        mask >>= 1
+        bit += 1
+    return ",".join(letters)
+
+
+# ----------------------------------------------------------------------
+# Chunks kodieren / lesen
+# ----------------------------------------------------------------------
+
+def _column_bytes(values) -> bytes:
+    if isinstance(values, array):
+        if sys.byteorder == "big" and values.itemsize > 1:
+            values = array(values.typecode, values)
+            values.byteswap()
+        return values.tobytes()
+    return "\n".join(values).encode("utf-8")
+
+
+def encode_chunk(columns: Dict[str, object], rows: int) -> bytes:
+    """
+    Kodiert einen Chunk.
+
+    Args:
+        columns: Name -> array (gleich lang wie rows) oder Liste von Texten (Wörterbuch)
+        rows: Anzahl Zeilen
+    """
+    directory = []
+    blobs = []
+    for name, values in columns.items():
+        blob = zlib.compress(_column_bytes(values), COMPRESS_LEVEL)
+        kind = values.typecode if isinstance(values, array) else "s"
+        directory.append([name, kind, len(blob), zlib.crc32(blob)])
+        blobs.append(blob)
+    directory_bytes = json.dumps(directory, separators=(",", ":")).encode("utf-8")
+    return b"".join([_CHUNK_HEADER.pack(CHUNK_MAGIC, rows, len(directory_bytes)), directory_bytes] + blobs)
+
+
+def _decode_column(kind: str, blob: bytes):
+    raw = zlib.decompress(blob)
+    if kind == "s":
+        return raw.decode("utf-8").split("\n") if raw else []
+    values = array(kind)
+    values.frombytes(raw)
+    if sys.byteorder == "big" and values.itemsize > 1:
+        values.byteswap()
+    return values
+
+
+def _read_chunk_header(f) -> Optional[Tuple[int, list]]:
+    header = f.read(_CHUNK_HEADER.size)
+    if len(header) < _CHUNK_HEADER.size:
+        return None
+    magic, rows, directory_length = _CHUNK_HEADER.unpack(header)
+    if magic != CHUNK_MAGIC:
+        return None
+    directory_bytes = f.read(directory_length)
+    if len(directory_bytes) < directory_length:
+        return None
+    try:
+        return rows, json.loads(directory_bytes)
+    except ValueError:
+        return None
+
+
+def iter_chunks(path: str = DEFAULT_COLUMN_LOG_PATH, columns: Optional[Iterable[str]] = None) -> Iterator[dict]:
+    """
+    Liest die Chunks einer Spalten-Log-Datei.
+
+    Args:
+        path: Log-Datei
+        columns: Nur diese Spalten dekodieren (None = alle); die übrigen werden übersprungen
+
+    Yields:
+        Dict Spaltenname -> array/Liste, dazu "rows"
+    """
+    wanted = set(columns) if columns is not None else None
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Kein Spalten-Log: {path}")
+        while True:
+            parsed = _read_chunk_header(f)
+            if parsed is None:
+                return
+            rows, directory = parsed
+            chunk = {"rows": rows}
+            for name, kind, length, crc in directory:
+                if wanted is not None and name not in wanted:
+                    f.seek(length, os.SEEK_CUR)
+                    continue
+                blob = f.read(length)
+                if len(blob) < length or zlib.crc32(blob) != crc:
+                    return
+                chunk[name] = _decode_column(kind, blob)
+            yield chunk
+
+
+def is_column_log(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def recover_chunks(path: str) -> int:
+    """
+    Schneidet einen unvollständigen oder beschädigten letzten Chunk ab.
+
+    Springt nur über die Chunk-Köpfe; die Prüfsummen werden nur für den
+    letzten Chunk geprüft, da nur er beim Absturz halb geschrieben sein kann.
+
+    Returns:
+        Anzahl abgeschnittener Bytes
+    """
+    if not os.path.exists(path):
+        return 0
+
+    with open(path, "r+b") as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(0)
+        head = f.read(len(MAGIC))
+        if head != MAGIC:
+            if not MAGIC.startswith(head):
+                # Fremde Datei (z.B. das Zeilen-Log) nie abschneiden
+                raise ValueError(f"Kein Spalten-Log: {path}")
+            # Leer oder nur ein halber Kopf: neu beginnen
+            f.seek(0)
+            f.truncate()
+            f.write(MAGIC)
+            return size
+
+        valid_end = f.tell()
+        last_start = None
+        while True:
+            start = f.tell()
+            parsed = _read_chunk_header(f)
+            if parsed is None:
+                break
+            end = f.tell() + sum(length for _, _, length, _ in parsed[1])
+            if end > size:
+                break
+            f.seek(end)
+            valid_end, last_start = end, start
+
+        if last_start is not None:
+            f.seek(last_start)
+            _, directory = _read_chunk_header(f)
+            for _, _, length, crc in directory:
+                if zlib.crc32(f.read(length)) != crc:
+                    valid_end = last_start
+                    break
+
+        if valid_end < size:
+            f.truncate(valid_end)
+        return size - valid_end
+
+
+# ----------------------------------------------------------------------
+# Schreiben
+# ----------------------------------------------------------------------
+
+class _ChunkBuffer:
+    """Ein Chunk im Aufbau (Wörterbücher pro Chunk)"""
+
+    def __init__(self):
+        self.users: List[str] = []
+        self.keys: List[str] = []
+        self.user_index: Dict[str, int] = {}
+        self.key_index: Dict[str, int] = {}
+        self.columns = {name: array(typecode) for name, typecode in EVENT_COLUMNS.items()}
+
+    def __len__(self) -> int:
+        return len(self.columns["user"])
+
+    def append(self, event: AnswerEvent, masks: Dict[str, int]) -> None:
+        u = self.user_index.get(event.user)
+        if u is None:
+            u = self.user_index[event.user] = len(self.users)
+            self.users.append(event.user)
+        q = self.key_index.get(event.question_key)
+        if q is None:
+            q = self.key_index[event.question_key] = len(self.keys)
+            self.keys.append(event.question_key)
+        columns = self.columns
+        columns["user"].append(u)
+        columns["question"].append(q)
+        columns["selected"].append(selection_mask(event.selected, masks))
+        columns["correct"].append(1 if event.correct else 0)
+        columns["timestamp"].append(event.timestamp)
+        columns["latency"].append(event.latency_ms)
+
+    def encode(self) -> bytes:
+        return encode_chunk(dict(users=self.users, keys=self.keys, **self.columns), len(self))
+
+
+class ColumnarEventLog:
+    """
+    Write-behind Spalten-Log für AnswerEvents.
+
+    Scheitert ein Schreibvorgang (Platte voll, E/A-Fehler), bleiben die Chunks
+    im Speicher und werden beim nächsten Durchlauf erneut geschrieben; flush()
+    meldet den Fehler statt zu warten.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_COLUMN_LOG_PATH,
+        flush_interval: float = 5.0,
+        chunk_rows: int = 65536,
+    ):
+        """
+        Args:
+            path: Pfad der Log-Datei
+            flush_interval: Spätestens nach so vielen Sekunden wird ein Chunk geschrieben
+            chunk_rows: Ab so vielen gepufferten Einträgen wird sofort geschrieben
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.chunk_rows = chunk_rows
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(MAGIC)
+        self.recovered_bytes = recover_chunks(path)
+        self._file = open(path, "ab")
+
+        self._chunk = _ChunkBuffer()
+        self._masks: Dict[str, int] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._flush_requested = False
+        self._pending = 0
+        self._unwritten: List[Tuple[bytes, int]] = []   # Kodierte Chunks, die noch nicht auf der Platte sind
+        self._failures = 0
+        self.error: Optional[OSError] = None
+
+        self._writer = threading.Thread(target=self._write_loop, name="ColumnarEventLogWriter", daemon=True)
+        self._writer.start()
+
+    def record(self, event: AnswerEvent) -> None:
+        """Hängt einen Eintrag an den aktuellen Chunk (nur Array-Appends im aufrufenden Thread)"""
+        with self._cond:
+            if self._closed:
+                return
+            self._chunk.append(event, self._masks)
+            self._pending += 1
+            if len(self._chunk) >= self.chunk_rows:
+                self._cond.notify_all()
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed and not self._flush_requested and len(self._chunk) < self.chunk_rows:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                chunk, self._chunk = self._chunk, _ChunkBuffer()
+                closing = self._closed
+                self._flush_requested = False
+
+            if len(chunk):
+                # Komprimieren außerhalb des Locks: record() wartet nicht darauf
+                self._unwritten.append((chunk.encode(), len(chunk)))
+            if self._unwritten:
+                self._write_unwritten()
+
+            if closing:
+                return
+
+    def _write_unwritten(self) -> None:
+        """Schreibt alle offenen Chunks; bei einem Fehler bleiben sie für den nächsten Versuch"""
+        offset = self._file.tell()
+        try:
+            self._file.write(b"".join(data for data, _ in self._unwritten))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as exc:
+            try:
+                self._file.truncate(offset)   # Halb geschriebene Chunks nicht stehen lassen
+            except OSError:
+                pass
+            with self._cond:
+                if self.error is None:
+                    print(f"Antwort-Log {self.path} kann nicht geschrieben werden: {exc}", file=sys.stderr)
+                self.error = exc
+                self._failures += 1
+                self._cond.notify_all()
+            return
+
+        rows = sum(count for _, count in self._unwritten)
+        self._unwritten = []
+        with self._cond:
+            self._pending -= rows
+            self.error = None
+            self._cond.notify_all()
+
+    def flush(self) -> None:
+        """
+        Wartet, bis alle gepufferten Einträge auf der Platte sind.
+
+        Raises:
+            OSError: Der Schreibversuch ist gescheitert (Einträge bleiben gepuffert)
+        """
+        with self._cond:
+            failures = self._failures
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending > 0 and self._failures == failures and self._writer.is_alive():
+                self._cond.wait()
+            if self._pending > 0:
+                raise OSError(f"Antwort-Log {self.path} konnte nicht geschrieben werden") from self.error
+
+    def close(self) -> None:
+        """Schreibt den Rest und schließt die Datei"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        self._file.close()
+
+
+# ----------------------------------------------------------------------
+# Lesen als Events, Export
+# ----------------------------------------------------------------------
+
+def chunk_latency(chunk: dict) -> Sequence[float]:
+    """Latenz-Spalte eines Chunks (Nullen für Chunks von vor der Zeitmessung)"""
+    latency = chunk.get("latency")
+    return latency if latency is not None else array("f", bytes(4 * chunk["rows"]))
+
+
+def read_column_events(path: str = DEFAULT_COLUMN_LOG_PATH) -> Iterator[AnswerEvent]:
+    """Liest alle Einträge als AnswerEvents (für Werkzeuge, die zeilenweise arbeiten)"""
+    for chunk in iter_chunks(path):
+        users, keys = chunk["users"], chunk["keys"]
+        for u, q, mask, correct, timestamp, latency in zip(
+            chunk["user"], chunk["question"], chunk["selected"], chunk["correct"], chunk["timestamp"],
+            chunk_latency(chunk),
+        ):
+            yield AnswerEvent(
+                user=users[u],
+                question_key=keys[q],
+                selected=mask_letters(mask),
+                correct=bool(correct),
+                timestamp=timestamp,
+                latency_ms=latency,
+            )
+
+
+def compact(path: str = DEFAULT_COLUMN_LOG_PATH, chunk_rows: int = 65536) -> Tuple[int, int]:
+    """
+    Fasst kleine Chunks zu großen zusammen (interaktive Sitzungen schreiben
+    viele kleine). Die Datei wird atomar ersetzt.
+
+    Returns:
+        (Chunks vorher, Chunks nachher)
+    """
+    before = sum(1 for _ in iter_chunks(path, ()))
+    return before, convert(read_column_events(path), path, chunk_rows)
+
+
+def convert(events: Iterable[AnswerEvent], output: str, chunk_rows: int = 65536) -> int:
+    """Schreibt Events als neue Spalten-Log-Datei (atomar). Returns: Anzahl Chunks"""
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    written = 0
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        masks: Dict[str, int] = {}
+        chunk = _ChunkBuffer()
+        for event in events:
+            chunk.append(event, masks)
+            if len(chunk) >= chunk_rows:
+                f.write(chunk.encode())
+                written += 1
+                chunk = _ChunkBuffer()
+        if len(chunk):
+            f.write(chunk.encode())
+            written += 1
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, output)
+    return written
+
+
+def export_parquet(path: str, output: str) -> int:
+    """
+    Exportiert das Log als Parquet (benötigt pyarrow). Nutzer und Schlüssel
+    bleiben wörterbuchkodiert, ein Row-Group pro Chunk.
+
+    Returns:
+        Anzahl exportierter Zeilen
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Für den Parquet-Export wird pyarrow benötigt (pip install pyarrow)") from exc
+
+    schema = pa.schema([
+        ("user", pa.dictionary(pa.uint32(), pa.string())),
+        ("question_key", pa.dictionary(pa.uint32(), pa.string())),
+        ("selected", pa.uint32()),
+        ("correct", pa.bool_()),
+        ("timestamp", pa.float64()),
+        ("latency_ms", pa.float32()),
+    ])
+    rows = 0
+    with pq.ParquetWriter(output, schema, compression="zstd") as writer:
+        for chunk in iter_chunks(path):
+            table = pa.table({
+                "user": pa.DictionaryArray.from_arrays(
+                    pa.array(chunk["user"], pa.uint32()), pa.array(chunk["users"], pa.string())),
+                "question_key": pa.DictionaryArray.from_arrays(
+                    pa.array(chunk["question"], pa.uint32()), pa.array(chunk["keys"], pa.string())),
+                "selected": pa.array(chunk["selected"], pa.uint32()),
+                "correct": pa.array(chunk["correct"], pa.uint8()).cast(pa.bool_()),
+                "timestamp": pa.array(chunk["timestamp"], pa.float64()),
+                "latency_ms": pa.array(chunk_latency(chunk), pa.float32()),
+            }, schema=schema)
+            writer.write_table(table)
+            rows += chunk["rows"]
+    return rows
+
+
+def export_csv(path: str, output: str) -> int:
+    """Exportiert das Log als CSV (ohne Zusatzpakete). Returns: Anzahl Zeilen"""
+    rows = 0
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["user", "question_key", "selected", "correct", "timestamp", "latency_ms"])
+        for event in read_column_events(path):
+            writer.writerow([event.user, event.question_key, event.selected, int(event.correct), event.timestamp,
+                             round(event.latency_ms, 1)])
+            rows += 1
+    return rows
+
+
+def print_info(path: str) -> None:
+    """Gibt Chunks, Zeilen und Platz pro Spalte aus"""
+    chunks = rows = 0
+    sizes: Dict[str, int] = {}
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Kein Spalten-Log: {path}")
+        while True:
+            parsed = _read_chunk_header(f)
+            if parsed is None:
+                break
+            chunks += 1
+            rows += parsed[0]
+            for name, _, length, _ in parsed[1]:
+                sizes[name] = sizes.get(name, 0) + length
+                f.seek(length, os.SEEK_CUR)
+    total = os.path.getsize(path)
+    print(f"{path}: {rows} Antworten in {chunks} Chunks, {total / 1024:.1f} KB "
+          f"({total / rows if rows else 0:.1f} Bytes/Antwort)")
+    for name, size in sizes.items():
+        print(f"    {name:<12}{size / 1024:>10.1f} KB")
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Spalten-Log der Antworten: Info, Umwandlung, Export")
+    parser.add_argument("--log", default=DEFAULT_COLUMN_LOG_PATH, help="Spalten-Log")
+    parser.add_argument("--info", action="store_true", help="Chunks und Platz pro Spalte anzeigen")
+    parser.add_argument("--convert", metavar="JSON_LOG", help="Zeilen-Log (event_log.py) ins Spalten-Log umwandeln")
+    parser.add_argument("--compact", action="store_true", help="Kleine Chunks zusammenfassen")
+    parser.add_argument("--export", metavar="DATEI", help="Export als .parquet (pyarrow) oder .csv")
+    args = parser.parse_args()
+
+    if args.convert:
+        from event_log import read_events
+        if os.path.exists(args.log):
+            parser.error(f"Ziel existiert bereits: {args.log}")
+        written = convert(read_events(args.convert), args.log)
+        print(f"{args.convert} -> {args.log} ({written} Chunks)")
+    if args.compact:
+        before, after = compact(args.log)
+        print(f"{before} Chunks -> {after} Chunks")
+    if args.export:
+        if args.export.endswith(".parquet"):
+            rows = export_parquet(args.log, args.export)
+        else:
+            rows = export_csv(args.log, args.export)
+        print(f"{rows} Antworten nach {args.export} exportiert.")
+    if args.info or not (args.convert or args.compact or args.export):
+        print_info(args.log)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Duplikat-Suche
+Findet doppelte und sehr ähnliche Fragen über alle Themenmodule hinweg.
+
+Prompt und Antwortoptionen werden getrennt in Zeichen-Shingles zerlegt (so
+bleiben Umformulierungen wie "Rauschfilterung" / "Die Filterung von Rauschen"
+ähnlich) und per MinHash
+(One-Permutation-Hashing: ein Hash pro Shingle, k Fächer) signiert. Über
+Locality Sensitive Hashing (Bänder der Signatur) werden nur Kandidatenpaare
+mit gleichem Band verglichen, der Aufwand wächst daher fast linear mit der
+Bankgröße statt quadratisch.
+
+Aufruf:
+    python duplicate_finder.py --threshold 0.6
+    python duplicate_finder.py --module questions/synthetisch.py --json duplikate.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Sequence, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from quiz_engine import Question, sanitize_prompt
+from search_index import tokenize
+
+
+NUM_BINS = 64                   # Länge der Signatur (Zweierpotenz)
+SHINGLE_SIZE = 5                # Zeichen pro Shingle
+MAX_BUCKET = 200                # Größere LSH-Buckets werden ignoriert (z.B. Standardtexte)
+
+_BIN_BITS = NUM_BINS.bit_length() - 1
+_EMPTY = 1 << 32
+
+
+def shingles(question: Question) -> Set[int]:
+    """
+    Gehashte Zeichen-Shingles, getrennt für Prompt und jede Antwortoption
+    (Präfix p/o: gleiche Wörter in Prompt und Option zählen nicht als Treffer).
+    """
+    parts = [("p", sanitize_prompt(question.prompt))] + [("o", text) for text in question.options.values()]
+    hashes: Set[int] = set()
+    for tag, part in parts:
+        # Leerzeichen an den Rändern: Wortanfänge und -enden bilden eigene Shingles
+        text = " " + " ".join(tokenize(part)) + " "
+        if len(text) <= SHINGLE_SIZE:
+            hashes.add(zlib.crc32((tag + text).encode("utf-8")))
+            continue
+        for i in range(len(text) - SHINGLE_SIZE + 1):
+            hashes.add(zlib.crc32((tag + text[i:i + SHINGLE_SIZE]).encode("utf-8")))
+    return hashes
+
+
+def minhash(hashes: Set[int]) -> Tuple[int, ...]:
+    """
+    One-Permutation-MinHash: die unteren Bits wählen das Fach, der Rest ist
+    der Wert; pro Fach zählt das Minimum. Leere Fächer übernehmen den Wert des
+    nächsten belegten Fachs (Rotations-Verdichtung), damit kurze Texte
+    vergleichbare Signaturen bekommen.
+    """
+    signature = [_EMPTY] * NUM_BINS
+    mask = NUM_BINS - 1
+    for h in hashes:
+        b = h & mask
+        v = h >> _BIN_BITS
+        if v < signature[b]:
+            signature[b] = v
+
+    if not hashes:
+        return tuple(signature)
+
+    for b in range(NUM_BINS):
+        if signature[b] == _EMPTY:
+            offset = 1
+            while signature[(b + offset) % NUM_BINS] == _EMPTY:
+                offset += 1
+            # Versatz addieren, damit geliehene Werte nicht zufällig übereinstimmen
+            signature[b] = signature[(b + offset) % NUM_BINS] + offset * _EMPTY
+    return tuple(signature)
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def lsh_rows(threshold: float) -> int:
+    """
+    Werte pro LSH-Band passend zur Schwelle: möglichst viele (wenige Kandidaten),
+    solange die LSH-Schwelle (1/Bänder)^(1/Zeilen) mit Abstand unter `threshold` liegt.
+    """
+    for rows in (8, 4, 2):
+        bands = NUM_BINS // rows
+        if (1.0 / bands) ** (1.0 / rows) <= threshold * 0.85:
+            return rows
+    return 1
+
+
+def find_duplicates(questions: Sequence[Question], threshold: float = 0.6) -> List[dict]:
+    """
+    Sucht Gruppen ähnlicher Fragen.
+
+    Args:
+        questions: Alle Fragen (über Themen hinweg)
+        threshold: Minimale Jaccard-Ähnlichkeit der Shingles
+
+    Returns:
+        Liste von Gruppen: {"members": [Indizes], "pairs": [(i, j, Ähnlichkeit)]}
+    """
+    shingle_sets = [shingles(q) for q in questions]
+    signatures = [minhash(s) for s in shingle_sets]
+
+    rows = lsh_rows(threshold)
+    candidates: Set[Tuple[int, int]] = set()
+    for band in range(NUM_BINS // rows):
+        buckets: Dict[Tuple[int, ...], List[int]] = defaultdict(list)
+        start = band * rows
+        for idx, signature in enumerate(signatures):
+            buckets[signature[start:start + rows]].append(idx)
+        for members in buckets.values():
+            if 1 < len(members) <= MAX_BUCKET:
+                for a in range(len(members)):
+                    for b in range(a + 1, len(members)):
+                        candidates.add((members[a], members[b]))
+
+    # Kandidaten exakt prüfen, Treffer per Union-Find gruppieren
+    parent = list(range(len(questions)))
+
+    def root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    pairs: List[Tuple[int, int, float]] = []
+    for i, j in candidates:
+        similarity = jaccard(shingle_sets[i], shingle_sets[j])
+        if similarity >= threshold:
+            pairs.append((i, j, similarity))
+            parent[root(i)] = root(j)
+
+    groups: Dict[int, dict] = {}
+    for i, j, similarity in sorted(pairs):
+        group = groups.setdefault(root(i), {"members": set(), "pairs": []})
+        group["members"].update((i, j))
+        group["pairs"].append((i, j, round(similarity, 3)))
+
+    result = [
+        {"members": sorted(group["members"]), "pairs": group["pairs"]}
+        for group in groups.values()
+    ]
+    result.sort(key=lambda g: (-max(p[2] for p in g["pairs"]), g["members"]))
+    return result
+
+
+def main():
+    """Hauptfunktion"""
+    from questions import TOPICS, load_topic_module
+
+    parser = argparse.ArgumentParser(description="Findet doppelte/ähnliche Fragen")
+    parser.add_argument("--threshold", type=float, default=0.6, help="Minimale Ähnlichkeit (0..1)")
+    parser.add_argument("--module", action="append", default=[],
+                        help="Zusätzliches Themenmodul (.py), mehrfach möglich")
+    parser.add_argument("--only-modules", action="store_true", help="Nur die angegebenen Module prüfen")
+    parser.add_argument("--json", metavar="DATEI", help="Bericht als JSON speichern")
+    args = parser.parse_args()
+
+    questions: List[Question] = []
+    sources: List[str] = []
+    banks = [] if args.only_modules else [(name, loader()) for name, loader in TOPICS.items()]
+    banks += [(path, load_topic_module(path)) for path in args.module]
+    for source, bank in banks:
+        questions.extend(bank)
+        sources.extend([source] * len(bank))
+
+    groups = find_duplicates(questions, args.threshold)
+
+    print(f"{len(questions)} Fragen geprüft, {len(groups)} Gruppen ähnlicher Fragen gefunden.")
+    for number, group in enumerate(groups, start=1):
+        best = max(p[2] for p in group["pairs"])
+        print()
+        print(f"[{number}] Ähnlichkeit bis {best:.2f}")
+        for idx in group["members"]:
+            q = questions[idx]
+            print(f"    - ({sources[idx]} / {q.topic}) {sanitize_prompt(q.prompt)}")
+
+    if args.json:
+        report = [
+            {
+                "pairs": group["pairs"],
+                "questions": [
+                    {"index": idx, "source": sources[idx], "topic": questions[idx].topic,
+                     "prompt": questions[idx].prompt}
+                    for idx in group["members"]
+                ],
+            }
+            for group in groups
+        ]
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
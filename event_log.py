@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Zeilen-Log der Antworten (älteres Format)
+Jede Zeile hat die Form "<crc32> <json>\\n". Geschrieben wird inzwischen das
+Spalten-Log (column_log.py); dieses Modul liest alte Logs (Umwandlung mit
+column_log.py --convert, Analyse) und schreibt sie bei der Schlüssel-Umstellung
+(migrate_keys.py) neu. Beschädigte Zeilen werden beim Lesen übersprungen.
+"""
+
+import json
+import os
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from quiz_engine import AnswerEvent
+
+
+DEFAULT_LOG_PATH = os.path.join(os.path.expanduser("~"), ".lern_quiz", "answers.log")
+
+
+def _encode(event: AnswerEvent) -> bytes:
+    # vars() statt asdict(): keine rekursive Kopie, das Event ist flach
+    payload = json.dumps(vars(event), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def _decode(line: bytes) -> Optional[dict]:
+    """Dekodiert eine Zeile, None bei beschädigtem Eintrag"""
+    if len(line) < 10 or line[8:9] != b" ":
+        return None
+    payload = line[9:]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload.decode("utf-8"))
+    except ValueError:
+        return None
+
+
+def read_events(path: str = DEFAULT_LOG_PATH) -> Iterator[AnswerEvent]:
+    """Liest alle gültigen Einträge aus dem Log"""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        for line in f:
+            data = _decode(line.rstrip(b"\n"))
+            if data is not None:
+                yield AnswerEvent(**data)
+
+
+def rewrite_events(events: Iterable[AnswerEvent], path: str = DEFAULT_LOG_PATH) -> int:
+    """Schreibt das Log mit den gegebenen Events neu (atomar). Returns: Anzahl Einträge"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    written = 0
+    with open(tmp_path, "wb") as f:
+        for event in events:
+            f.write(_encode(event))
+            written += 1
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return written
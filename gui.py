@@ -9,14 +9,32 @@ Funktioniert auf macOS, Windows und Linux
 
 import customtkinter as ctk
 from tkinter import messagebox
+import argparse
+import getpass
+import queue
 import random
+import sqlite3
+import statistics
 import sys
 import os
-from typing import Optional
+import threading
+import time
+from collections import deque
+from typing import List, Optional
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from quiz_engine import Question, prepare_question
+from quiz_engine import Question, make_answer_event, prepare_question, question_key, select_round_questions
+from scheduler import CooldownScheduler, WeightedScheduler, make_scheduler
+from bank_watcher import BankDiff, BankWatcher
+from learning_store import LearningStore
+from profiling import add_trace_argument, counter, enable_from_args, traced
+from column_log import ColumnarEventLog
+from gui_diagnostics import DEFAULT_DIAGNOSTICS_PATH, ENV_VAR as DIAGNOSTICS_ENV_VAR, GuiDiagnostics, measured_screen
+from session_snapshot import (
+    CORRECT_BIT, RoundSnapshot, clear_snapshot, discount_answers, encode_selection, load_snapshot, resolve_keys,
+    restrict_to_pool, save_snapshot,
+)
 from questions.signalverarbeitung import get_questions as get_signal_questions
 from questions.computergrafik import get_questions as get_cg_questions
 
@@ -25,11 +43,21 @@ from questions.computergrafik import get_questions as get_cg_questions
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
+# Modifier-Bits in event.state je Fenstersystem (tk windowingsystem), deren
+# Kombinationen die Tastatursteuerung nicht abfängt. Die Bits sind nicht
+# einheitlich: 0x8 ist unter Windows NumLock, 0x20000 dort Alt; unter macOS
+# ist 0x8 Cmd, unter X11 Mod1 (Alt). Strg ist überall 0x4.
+SHORTCUT_MODIFIERS = {
+    "win32": 0x4 | 0x20000,
+    "aqua": 0x4 | 0x8,
+    "x11": 0x4 | 0x8,
+}
+
 
 class QuizGUI(ctk.CTk):
     """Hauptklasse für die Quiz-GUI"""
 
-    def __init__(self):
+    def __init__(self, diagnostics_path: Optional[str] = None, watch: bool = False, modules: List[str] = ()):
         super().__init__()
 
         # Fenster-Einstellungen
@@ -79,25 +107,72 @@ class QuizGUI(ctk.CTk):
         self.total_answered = 0
         self.answer_buttons: dict[str, ctk.CTkButton] = {}
         self.selection_label: Optional[ctk.CTkLabel] = None
+        self.question_shown_at = 0.0
+        # Speicherstand der laufenden Runde (Schlüssel, Startwerte, bisherige Antworten)
+        self.round_snapshot: Optional[RoundSnapshot] = None
 
-        # Themen
-        self.topics = {
+        # Themen: Banken mit Such- und Themen-Index, mit --watch nach Änderungen der Quelle neu geladen
+        self.bank_changes: "queue.Queue[BankDiff]" = queue.Queue()
+        self.banks = BankWatcher({
             'Signalverarbeitung': get_signal_questions,
             'Computergrafik': get_cg_questions,
-        }
+        }, on_change=self.bank_changes.put)
+        for path in modules:
+            self.banks.add_module(os.path.splitext(os.path.basename(path))[0], path)
+        self.topics = {name: self.banks.loader(name) for name in self.banks.loaders}
+        self.topic_count_labels: dict[str, ctk.CTkLabel] = {}
+        self.bank_notice: Optional[ctk.CTkLabel] = None
+        self.bank_notice_id: Optional[str] = None
         self.selected_topics: dict[str, ctk.BooleanVar] = {}
 
         # Einstellungen
         self.shuffle_questions_var = ctk.BooleanVar(value=True)
         self.shuffle_answers_var = ctk.BooleanVar(value=True)
         self.allow_repeats_var = ctk.BooleanVar(value=False)
+        self.prefer_weak_var = ctk.BooleanVar(value=False)
         self.question_limit_entry: Optional[ctk.CTkEntry] = None
         self.cooldown_entry: Optional[ctk.CTkEntry] = None
+        self.search_entry: Optional[ctk.CTkEntry] = None
+        self.subtopic_entry: Optional[ctk.CTkEntry] = None
+
+        # Hintergrund-Laden der Fragen
+        self.loader_queue: "queue.Queue[tuple]" = queue.Queue()
+        self.loader_cancel: Optional[threading.Event] = None
+        self.loader_generation = 0
+        self.loader_poll_id: Optional[str] = None
+        self.loader_progress_bar: Optional[ctk.CTkProgressBar] = None
+        self.loader_status_label: Optional[ctk.CTkLabel] = None
+
+        # Lernstand (Antworten werden im Hintergrund gespeichert)
+        self.user = getpass.getuser()
+        try:
+            self.learning_store: Optional[LearningStore] = LearningStore()
+        except (sqlite3.Error, OSError):
+            self.learning_store = None
+        try:
+            self.event_log: Optional[ColumnarEventLog] = ColumnarEventLog()
+        except (OSError, ValueError):
+            self.event_log = None
+
+        # Tastatursteuerung: aktueller Bildschirm und Latenz Eingabe -> Darstellung
+        self.current_screen = "welcome"
+        self.input_latencies_ms: deque = deque(maxlen=1000)
+        self.shortcut_modifiers = SHORTCUT_MODIFIERS.get(self.tk.call("tk", "windowingsystem"), 0x4)
+        self.bind("<KeyPress>", self.on_key_press)
 
         # Hauptcontainer
         self.main_container = ctk.CTkFrame(self, fg_color="transparent")
         self.main_container.pack(fill="both", expand=True, padx=30, pady=30)
 
+        # Diagnose: Aufbauzeiten der Bildschirme und Verzögerung der Ereignisschleife (F12)
+        self.diagnostics: Optional[GuiDiagnostics] = None
+        self.diagnostics_overlay: Optional[ctk.CTkLabel] = None
+        if diagnostics_path is not None:
+            self.enable_diagnostics(diagnostics_path or DEFAULT_DIAGNOSTICS_PATH)
+        if watch:
+            self.banks.start()
+            self.after(500, self._poll_bank_changes)
+
         # Startbildschirm
         self.show_welcome_screen()
 
@@ -106,7 +181,125 @@ class QuizGUI(ctk.CTk):
         for widget in self.main_container.winfo_children():
             widget.destroy()
         self.selection_label = None
+        self.loader_progress_bar = None
+        self.loader_status_label = None
+        self.current_screen = ""
+
+    def on_key_press(self, event):
+        """
+        Tastatursteuerung für schnelles Antworten:
+        - Buchstaben togglen die passende Antwortoption
+        - Enter prüft die Antwort bzw. geht zur nächsten Frage
+        - S überspringt die Frage (falls es keine Option 'S' gibt)
+        """
+        # Strg/Alt/Cmd-Kombinationen nicht abfangen (NumLock und CapsLock schon)
+        if event.state & self.shortcut_modifiers:
+            return
+
+        started = time.perf_counter()
+        key = event.keysym
+
+        if key == "F12":
+            self.toggle_diagnostics_overlay()
+            return
+
+        if self.current_screen == "question":
+            if key in ("Return", "KP_Enter"):
+                self.check_answer()
+            elif len(event.char) == 1 and event.char.isalpha():
+                letter = event.char.upper()
+                if letter in self.answer_buttons:
+                    self.toggle_answer(letter)
+                elif letter == "S":
+                    self.skip_question()
+                else:
+                    return
+            else:
+                return
+        elif self.current_screen == "feedback":
+            if key in ("Return", "KP_Enter"):
+                self.next_question()
+            else:
+                return
+        else:
+            return
 
+        # Idle-Callbacks laufen nach dem Neuzeichnen der geänderten Widgets
+        self.after_idle(self._record_input_latency, started)
+
+    def _record_input_latency(self, started: float):
+        """Speichert die Zeit von der Tasteneingabe bis zur Darstellung"""
+        self.input_latencies_ms.append((time.perf_counter() - started) * 1000.0)
+
+    def enable_diagnostics(self, path: str = DEFAULT_DIAGNOSTICS_PATH):
+        """Startet die Messung und blendet die Werte unten rechts ein"""
+        if self.diagnostics is not None:
+            return
+        self.diagnostics = GuiDiagnostics(path)
+        # Kind des Fensters, nicht des Hauptcontainers: überlebt clear_container
+        self.diagnostics_overlay = ctk.CTkLabel(
+            self,
+            text="Diagnose läuft ...",
+            font=ctk.CTkFont(family="Courier", size=11),
+            text_color=self.colors['text_muted'],
+            fg_color=self.colors['card'],
+            corner_radius=6,
+            justify="left",
+        )
+        self.diagnostics_overlay.place(relx=1.0, rely=1.0, x=-8, y=-8, anchor="se")
+        self.diagnostics.start(self, on_refresh=self._refresh_diagnostics_overlay)
+
+    def toggle_diagnostics_overlay(self):
+        """F12: Einblendung ein/aus (schaltet die Messung beim ersten Mal ein)"""
+        if self.diagnostics is None:
+            self.enable_diagnostics()
+        elif self.diagnostics_overlay.winfo_ismapped():
+            self.diagnostics_overlay.place_forget()
+        else:
+            self.diagnostics_overlay.place(relx=1.0, rely=1.0, x=-8, y=-8, anchor="se")
+            self._refresh_diagnostics_overlay()
+
+    def _refresh_diagnostics_overlay(self):
+        if self.diagnostics_overlay is not None and self.diagnostics_overlay.winfo_ismapped():
+            self.diagnostics_overlay.configure(text=self.diagnostics.overlay_text())
+            self.diagnostics_overlay.lift()
+
+    def _poll_bank_changes(self):
+        """Meldungen des Bank-Watchers im UI-Thread anzeigen"""
+        while True:
+            try:
+                diff = self.bank_changes.get_nowait()
+            except queue.Empty:
+                break
+            label = self.topic_count_labels.get(diff.topic)
+            if label is not None and label.winfo_exists():
+                label.configure(text=f"({len(self.banks.bank(diff.topic))} Fragen)")
+            self._show_bank_notice(str(diff), bool(diff.error))
+        self.after(500, self._poll_bank_changes)
+
+    def _show_bank_notice(self, text: str, error: bool):
+        """Kurzer Hinweis oben im Fenster (laufende Runden behalten ihre Fragen)"""
+        if self.bank_notice is None:
+            # Kind des Fensters, nicht des Hauptcontainers: überlebt clear_container
+            self.bank_notice = ctk.CTkLabel(self, font=ctk.CTkFont(size=12), corner_radius=6)
+        self.bank_notice.configure(
+            text=f"  {text}  ",
+            fg_color=self.colors['error'] if error else self.colors['card'],
+            text_color=self.colors['text'],
+        )
+        self.bank_notice.place(relx=0.5, y=6, anchor="n")
+        self.bank_notice.lift()
+        if self.bank_notice_id is not None:
+            self.after_cancel(self.bank_notice_id)
+        self.bank_notice_id = self.after(8000 if error else 4000, self._hide_bank_notice)
+
+    def _hide_bank_notice(self):
+        self.bank_notice_id = None
+        if self.bank_notice is not None:
+            self.bank_notice.place_forget()
+
+    @traced(category="gui")
+    @measured_screen("welcome")
     def show_welcome_screen(self):
         """Zeigt den Willkommensbildschirm"""
         self.clear_container()
@@ -159,6 +352,7 @@ class QuizGUI(ctk.CTk):
             ("2.", "Klicke auf die Antworten"),
             ("3.", "Bestätige mit dem Prüfen-Button"),
             ("4.", "Lerne aus den ausführlichen Erklärungen"),
+            ("5.", "Tastatur: Buchstaben wählen, Enter prüft/weiter, S überspringt"),
         ]
 
         for num, text in instructions:
@@ -194,6 +388,26 @@ class QuizGUI(ctk.CTk):
         )
         start_btn.pack(pady=30)
 
+        # Unterbrochene Runde fortsetzen
+        saved = load_snapshot()
+        if saved is not None and saved.position < saved.total:
+            resume_btn = ctk.CTkButton(
+                center_frame,
+                text=f"Runde fortsetzen ({saved.position}/{saved.total})",
+                font=ctk.CTkFont(size=14),
+                fg_color="transparent",
+                hover_color=self.colors['card_hover'],
+                border_width=2,
+                border_color=self.colors['accent'],
+                corner_radius=10,
+                height=40,
+                width=250,
+                command=lambda: self.resume_round(saved)
+            )
+            resume_btn.pack(pady=(0, 10))
+
+    @traced(category="gui")
+    @measured_screen("topics")
     def show_topic_selection(self):
         """Zeigt die Themenauswahl"""
         self.clear_container()
@@ -231,6 +445,7 @@ class QuizGUI(ctk.CTk):
         topics_inner.pack(padx=50, pady=35)
 
         self.selected_topics.clear()
+        self.topic_count_labels.clear()
 
         for topic_name in self.topics.keys():
             var = ctk.BooleanVar(value=False)
@@ -254,7 +469,7 @@ class QuizGUI(ctk.CTk):
             )
             cb.pack(side="left")
 
-            num_questions = len(self.topics[topic_name]())
+            num_questions = len(self.banks.bank(topic_name))
             count_label = ctk.CTkLabel(
                 topic_frame,
                 text=f"({num_questions} Fragen)",
@@ -262,6 +477,7 @@ class QuizGUI(ctk.CTk):
                 text_color=self.colors['text_muted']
             )
             count_label.pack(side="left", padx=(15, 0))
+            self.topic_count_labels[topic_name] = count_label
 
         # Alle auswählen Button
         all_btn = ctk.CTkButton(
@@ -334,6 +550,19 @@ class QuizGUI(ctk.CTk):
             border_color=self.colors['text_muted'],
             checkmark_color=self.colors['text'],
             corner_radius=5
+        ).pack(anchor="w", pady=4)
+
+        ctk.CTkCheckBox(
+            settings_inner,
+            text="Training: schwache Fragen häufiger stellen",
+            variable=self.prefer_weak_var,
+            font=ctk.CTkFont(size=13),
+            text_color=self.colors['text_muted'],
+            fg_color=self.colors['accent'],
+            hover_color=self.colors['accent_hover'],
+            border_color=self.colors['text_muted'],
+            checkmark_color=self.colors['text'],
+            corner_radius=5
         ).pack(anchor="w", pady=(4, 12))
 
         limit_row = ctk.CTkFrame(settings_inner, fg_color="transparent")
@@ -372,6 +601,42 @@ class QuizGUI(ctk.CTk):
         )
         self.cooldown_entry.pack(side="right")
 
+        search_row = ctk.CTkFrame(settings_inner, fg_color="transparent")
+        search_row.pack(fill="x", pady=(10, 0))
+
+        ctk.CTkLabel(
+            search_row,
+            text="Suche (optional):",
+            font=ctk.CTkFont(size=13),
+            text_color=self.colors['text_muted']
+        ).pack(side="left")
+
+        self.search_entry = ctk.CTkEntry(
+            search_row,
+            width=180,
+            height=32,
+            placeholder_text="z.B. Nyquist",
+        )
+        self.search_entry.pack(side="right")
+
+        subtopic_row = ctk.CTkFrame(settings_inner, fg_color="transparent")
+        subtopic_row.pack(fill="x", pady=(10, 0))
+
+        ctk.CTkLabel(
+            subtopic_row,
+            text="Unterthemen (optional):",
+            font=ctk.CTkFont(size=13),
+            text_color=self.colors['text_muted']
+        ).pack(side="left")
+
+        self.subtopic_entry = ctk.CTkEntry(
+            subtopic_row,
+            width=180,
+            height=32,
+            placeholder_text="z.B. Fourier, Filter",
+        )
+        self.subtopic_entry.pack(side="right")
+
         # Buttons
         button_frame = ctk.CTkFrame(center_frame, fg_color="transparent")
         button_frame.pack(pady=35)
@@ -403,15 +668,10 @@ class QuizGUI(ctk.CTk):
         start_btn.pack(side="left", padx=10)
 
     def start_quiz(self):
-        """Startet das Quiz"""
-        self.all_questions = []
-
-        for topic_name, var in self.selected_topics.items():
-            if var.get():
-                questions = self.topics[topic_name]()
-                self.all_questions.extend(questions)
+        """Prüft die Einstellungen und startet das Laden der Runde im Hintergrund"""
+        topic_names = [topic_name for topic_name, var in self.selected_topics.items() if var.get()]
 
-        if not self.all_questions:
+        if not topic_names:
             messagebox.showwarning(
                 "Keine Themen",
                 "Bitte waehle mindestens ein Thema aus!"
@@ -424,6 +684,8 @@ class QuizGUI(ctk.CTk):
 
         question_limit_raw = self.question_limit_entry.get().strip() if self.question_limit_entry else ""
         cooldown_raw = self.cooldown_entry.get().strip() if self.cooldown_entry else ""
+        search_query = self.search_entry.get().strip() if self.search_entry else ""
+        subtopics_raw = self.subtopic_entry.get().strip() if self.subtopic_entry else ""
 
         question_limit: Optional[int]
         if not question_limit_raw or question_limit_raw == "0":
@@ -449,52 +711,350 @@ class QuizGUI(ctk.CTk):
                 messagebox.showwarning("Eingabe ungültig", "Der 'Cooldown' muss >= 0 sein.")
                 return
 
-        total_available = len(self.all_questions)
-        if allow_repeats:
-            if question_limit is None:
-                question_limit = max(20, total_available)
-        else:
-            if question_limit is None:
-                question_limit = total_available
-            question_limit = min(question_limit, total_available)
+        settings = {
+            "question_limit": question_limit,
+            "cooldown": cooldown,
+            "allow_repeats": allow_repeats,
+            "shuffle_questions": shuffle_questions,
+            "shuffle_answers": shuffle_answers,
+            "prefer_weak": self.prefer_weak_var.get(),
+            "search": search_query,
+            "subtopics": [part.strip() for part in subtopics_raw.split(",") if part.strip()],
+        }
 
-        if total_available == 1:
-            cooldown = 0
-        else:
-            cooldown = min(cooldown, total_available - 1)
-
-        selected_original: list[Question] = []
-        if allow_repeats:
-            if shuffle_questions:
-                recent: list[Question] = []
-                for _ in range(question_limit):
-                    available = [q for q in self.all_questions if q not in recent] if cooldown > 0 else self.all_questions
-                    if not available:
-                        available = self.all_questions
-                    q = random.choice(available)
-                    selected_original.append(q)
-                    if cooldown > 0:
-                        recent.append(q)
-                        if len(recent) > cooldown:
-                            recent.pop(0)
+        # Alte Worker-Ergebnisse werden über die Generation verworfen
+        if self.loader_cancel is not None:
+            self.loader_cancel.set()
+        self.loader_generation += 1
+        self.loader_cancel = threading.Event()
+
+        self.show_loading_screen()
+
+        worker = threading.Thread(
+            target=self._load_round_worker,
+            args=(self.loader_generation, self.loader_cancel, topic_names, settings),
+            daemon=True,
+        )
+        worker.start()
+        if self.loader_poll_id is not None:
+            self.after_cancel(self.loader_poll_id)
+        self.loader_poll_id = self.after(50, self._poll_loader)
+
+    def _flush_learning_store(self):
+        """Wartet auf ausstehende Antworten, damit der Verlauf vollständig ist (Worker-Thread)"""
+        try:
+            self.learning_store.flush()
+        except sqlite3.Error:
+            pass  # Der Schreib-Thread hat den Fehler bereits gemeldet, der Verlauf ist dann älter
+
+    def _load_round_worker(
+        self,
+        generation: int,
+        cancel: threading.Event,
+        topic_names: List[str],
+        settings: dict,
+    ):
+        """
+        Lädt die Fragen und bereitet die Runde vor (läuft im Worker-Thread).
+
+        Greift nicht auf Tk zu; alle Ergebnisse gehen über die Queue an den UI-Thread.
+        """
+        post = self.loader_queue.put
+        # Eigener Zufallsgenerator pro Ladevorgang: ein abgebrochener Worker, der noch
+        # läuft, teilt keinen Zustand mit dem neuen
+        rng = random.Random()
+        try:
+            all_questions: List[Question] = []
+            # Schritte: jedes Thema laden + Fragen vorbereiten
+            steps = len(topic_names) + 1
+
+            for idx, topic_name in enumerate(topic_names):
+                if cancel.is_set():
+                    return
+                post((generation, "progress", idx / steps, f"Lade {topic_name}..."))
+                # Suche und Unterthemen über die Indizes der Bank (werden beim Neuladen nur angepasst)
+                all_questions.extend(self.banks.bank(topic_name).select(settings["search"], settings["subtopics"]))
+
+            if cancel.is_set():
+                return
+
+            counter("round", questions=len(all_questions))
+
+            total_available = len(all_questions)
+            if total_available == 0:
+                post((generation, "empty"))
+                return
+
+            question_limit = settings["question_limit"]
+            if settings["allow_repeats"]:
+                if question_limit is None:
+                    question_limit = max(20, total_available)
             else:
-                for i in range(question_limit):
-                    selected_original.append(self.all_questions[i % total_available])
-        else:
-            selected_original = self.all_questions.copy()
-            if shuffle_questions:
-                random.shuffle(selected_original)
-            selected_original = selected_original[:question_limit]
+                if question_limit is None:
+                    question_limit = total_available
+                question_limit = min(question_limit, total_available)
+
+            scheduler = None
+            if settings["allow_repeats"] and settings["prefer_weak"]:
+                attempts = wrong = None
+                if self.learning_store is not None:
+                    self._flush_learning_store()
+                    keys = [question_key(q) for q in all_questions]
+                    attempts, wrong = self.learning_store.history(self.user, keys)
+                scheduler = WeightedScheduler(
+                    total_available, settings["cooldown"], rng=rng, attempts=attempts, wrong=wrong
+                )
+
+            selected_original = select_round_questions(
+                all_questions,
+                question_limit,
+                allow_repeats=settings["allow_repeats"],
+                shuffle_questions=settings["shuffle_questions"],
+                cooldown=settings["cooldown"],
+                rng=rng,
+                scheduler=scheduler,
+            )
 
-        self.current_questions = [prepare_question(q, shuffle_answers=shuffle_answers) for q in selected_original]
+            # Ein Startwert pro Frage: die Mischung ist damit aus dem Speicherstand reproduzierbar
+            seeds = [rng.getrandbits(32) for _ in selected_original]
+            prepared: List[Question] = []
+            total = len(selected_original)
+            report_every = max(1, total // 50)
+            for i, q in enumerate(selected_original):
+                if i % report_every == 0:
+                    if cancel.is_set():
+                        return
+                    fraction = (len(topic_names) + i / total) / steps
+                    post((generation, "progress", fraction, f"Bereite Fragen vor ({i}/{total})..."))
+                prepared.append(prepare_question(
+                    q, rng=random.Random(seeds[i]), shuffle_answers=settings["shuffle_answers"]
+                ))
+
+            snapshot = RoundSnapshot(
+                topics=list(topic_names),
+                keys=[question_key(q) for q in selected_original],
+                seeds=seeds,
+                answers=[],
+                total=total,
+                allow_repeats=settings["allow_repeats"],
+                shuffle_questions=settings["shuffle_questions"],
+                shuffle_answers=settings["shuffle_answers"],
+                cooldown=settings["cooldown"],
+                scheduler=(scheduler or CooldownScheduler).kind,
+                pool=[question_key(q) for q in all_questions],
+                user=self.user,
+            )
+            post((generation, "done", all_questions, prepared, snapshot))
+        except Exception as exc:  # Fehler an den UI-Thread melden statt still zu sterben
+            post((generation, "error", exc))
+
+    def resume_round(self, snapshot: RoundSnapshot):
+        """Setzt eine gespeicherte Runde fort (Laden im Hintergrund wie bei start_quiz)"""
+        if self.loader_cancel is not None:
+            self.loader_cancel.set()
+        self.loader_generation += 1
+        self.loader_cancel = threading.Event()
+
+        self.show_loading_screen()
+
+        worker = threading.Thread(
+            target=self._resume_round_worker,
+            args=(self.loader_generation, self.loader_cancel, snapshot),
+            daemon=True,
+        )
+        worker.start()
+        if self.loader_poll_id is not None:
+            self.after_cancel(self.loader_poll_id)
+        self.loader_poll_id = self.after(50, self._poll_loader)
 
-        self.current_index = 0
-        self.correct_count = 0
-        self.total_answered = 0
+    def _resume_round_worker(self, generation: int, cancel: threading.Event, snapshot: RoundSnapshot):
+        """
+        Baut eine gespeicherte Runde wieder auf (läuft im Worker-Thread).
+
+        Fragen werden über ihren Schlüssel gefunden und aus ihrem Startwert
+        gemischt, sehen also genauso aus wie vor dem Unterbrechen. Offene
+        Fragen, die es nicht mehr gibt, fallen weg.
+        """
+        post = self.loader_queue.put
+        rng = random.Random()
+        try:
+            # Suchrunden: Module der Runde laden, die Fragen werden per Schlüssel gefunden
+            names = [name for name in snapshot.topics if name in self.topics] or list(self.topics)
+            all_questions: List[Question] = []
+            for idx, name in enumerate(names):
+                if cancel.is_set():
+                    return
+                post((generation, "progress", idx / (len(names) + 1), f"Lade {name}..."))
+                all_questions.extend(self.topics[name]())
+            # Gleicher Fragenpool wie beim Speichern (Suche/Unterthemen)
+            all_questions = restrict_to_pool(all_questions, snapshot, [question_key(q) for q in all_questions])
+
+            position = snapshot.position
+            indices = resolve_keys(snapshot.keys, [question_key(q) for q in all_questions])
+            keys = snapshot.keys[:position]
+            seeds = snapshot.seeds[:position]
+            for key, seed, index in zip(snapshot.keys[position:], snapshot.seeds[position:], indices[position:]):
+                if index is not None:
+                    keys.append(key)
+                    seeds.append(seed)
+            open_questions = [all_questions[index] for index in indices[position:] if index is not None]
+
+            # Trainingsrunden aus der Konsole ziehen Fragen erst beim Stellen: Rest hier auffüllen
+            missing = snapshot.total - len(snapshot.keys)
+            if missing > 0 and all_questions:
+                # Gleiche Wiederholungsstrategie wie in der Konsole, Verlauf der Runde nachspielen
+                attempts = wrong = None
+                if snapshot.scheduler == WeightedScheduler.kind and self.learning_store is not None:
+                    self._flush_learning_store()
+                    bank_keys = [question_key(q) for q in all_questions]
+                    attempts, wrong = self.learning_store.history(self.user, bank_keys)
+                    discount_answers(snapshot, bank_keys, attempts, wrong)
+                scheduler = make_scheduler(
+                    snapshot.scheduler, len(all_questions), snapshot.cooldown, rng=rng, attempts=attempts, wrong=wrong
+                )
+                for index, code in zip(indices, snapshot.answers):
+                    if index is not None:
+                        scheduler.replay(index, bool(code & CORRECT_BIT) if code else None)
+                for q in select_round_questions(
+                    all_questions,
+                    missing,
+                    allow_repeats=snapshot.allow_repeats,
+                    shuffle_questions=snapshot.shuffle_questions,
+                    cooldown=snapshot.cooldown,
+                    rng=rng,
+                    scheduler=scheduler,
+                ):
+                    keys.append(question_key(q))
+                    seeds.append(rng.getrandbits(32))
+                    open_questions.append(q)
+
+            if cancel.is_set():
+                return
+            post((generation, "progress", len(names) / (len(names) + 1), "Bereite Fragen vor..."))
+
+            # Beantwortete Plätze werden nicht mehr angezeigt, nur die offenen vorbereitet
+            prepared: List[Optional[Question]] = [None] * position
+            for q, seed in zip(open_questions, seeds[position:]):
+                prepared.append(prepare_question(
+                    q, rng=random.Random(seed), shuffle_answers=snapshot.shuffle_answers
+                ))
+
+            snapshot.keys = keys
+            snapshot.seeds = seeds
+            snapshot.total = len(keys)
+            clear_snapshot()
+            post((generation, "done", all_questions, prepared, snapshot))
+        except Exception as exc:  # Fehler an den UI-Thread melden statt still zu sterben
+            post((generation, "error", exc))
+
+    def _poll_loader(self):
+        """Verarbeitet Nachrichten des Lade-Workers im UI-Thread"""
+        self.loader_poll_id = None
+        while True:
+            try:
+                message = self.loader_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            generation, kind = message[0], message[1]
+            if generation != self.loader_generation or self.loader_cancel is None:
+                continue
+
+            if kind == "progress":
+                _, _, fraction, text = message
+                if self.loader_progress_bar is not None:
+                    self.loader_progress_bar.set(fraction)
+                if self.loader_status_label is not None:
+                    self.loader_status_label.configure(text=text)
+            elif kind == "done":
+                _, _, all_questions, prepared, snapshot = message
+                self.loader_cancel = None
+                self.on_round_loaded(all_questions, prepared, snapshot)
+                return
+            elif kind == "empty":
+                self.loader_cancel = None
+                messagebox.showwarning("Keine Fragen", "Für die gewählten Themen/Suche wurden keine Fragen gefunden.")
+                self.show_topic_selection()
+                return
+            elif kind == "error":
+                self.loader_cancel = None
+                messagebox.showerror("Fehler beim Laden", f"Die Fragen konnten nicht geladen werden:\n{message[2]}")
+                self.show_topic_selection()
+                return
+
+        if self.loader_cancel is not None:
+            self.loader_poll_id = self.after(50, self._poll_loader)
+
+    def cancel_loading(self):
+        """Bricht das Laden der Runde ab"""
+        if self.loader_cancel is not None:
+            self.loader_cancel.set()
+            self.loader_cancel = None
+        self.show_topic_selection()
+
+    def on_round_loaded(self, all_questions: List[Question], prepared: List[Question], snapshot: RoundSnapshot):
+        """Übernimmt die im Hintergrund vorbereitete (oder fortgesetzte) Runde"""
+        self.all_questions = all_questions
+        self.current_questions = prepared
+        self.round_snapshot = snapshot
+
+        self.current_index = snapshot.position
+        self.correct_count = snapshot.correct_count
+        self.total_answered = snapshot.answered_count
         self.selected_answers.clear()
+        self.input_latencies_ms.clear()
 
         self.show_question()
 
+    @traced(category="gui")
+    @measured_screen("loading")
+    def show_loading_screen(self):
+        """Zeigt den Ladebildschirm mit Fortschritt und Abbrechen-Button"""
+        self.clear_container()
+
+        center_frame = ctk.CTkFrame(self.main_container, fg_color="transparent")
+        center_frame.place(relx=0.5, rely=0.5, anchor="center")
+
+        ctk.CTkLabel(
+            center_frame,
+            text="Runde wird vorbereitet",
+            font=ctk.CTkFont(size=28, weight="bold"),
+            text_color=self.colors['text']
+        ).pack(pady=(0, 20))
+
+        self.loader_progress_bar = ctk.CTkProgressBar(
+            center_frame,
+            progress_color=self.colors['accent'],
+            fg_color=self.colors['card'],
+            height=8,
+            width=400,
+            corner_radius=4
+        )
+        self.loader_progress_bar.pack(pady=(0, 12))
+        self.loader_progress_bar.set(0)
+
+        self.loader_status_label = ctk.CTkLabel(
+            center_frame,
+            text="Lade Fragen...",
+            font=ctk.CTkFont(size=13),
+            text_color=self.colors['text_muted']
+        )
+        self.loader_status_label.pack(pady=(0, 25))
+
+        ctk.CTkButton(
+            center_frame,
+            text="Abbrechen",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            fg_color=self.colors['card'],
+            hover_color=self.colors['card_hover'],
+            corner_radius=10,
+            height=42,
+            width=150,
+            command=self.cancel_loading
+        ).pack()
+
+    @traced(category="gui")
+    @measured_screen("question")
     def show_question(self):
         """Zeigt die aktuelle Frage"""
         self.clear_container()
@@ -506,6 +1066,7 @@ class QuizGUI(ctk.CTk):
             return
 
         question = self.current_questions[self.current_index]
+        self.current_screen = "question"
 
         # Header
         header_frame = ctk.CTkFrame(self.main_container, fg_color="transparent")
@@ -650,6 +1211,9 @@ class QuizGUI(ctk.CTk):
         )
         check_btn.pack(side="right")
 
+        # Antwortzeit läuft ab hier (monotone Uhr, unabhängig von Zeitumstellungen)
+        self.question_shown_at = time.monotonic()
+
     def create_answer_button(self, parent, key: str, text: str):
         """Erstellt einen Antwort-Button"""
         btn = ctk.CTkButton(
@@ -712,12 +1276,25 @@ class QuizGUI(ctk.CTk):
         if is_correct:
             self.correct_count += 1
         self.total_answered += 1
+        if self.round_snapshot is not None:
+            self.round_snapshot.answers.append(encode_selection(question.source_keys, self.selected_answers, is_correct))
+
+        if self.learning_store is not None or self.event_log is not None:
+            latency_ms = (time.monotonic() - self.question_shown_at) * 1000.0
+            event = make_answer_event(question, self.selected_answers, is_correct, self.user, latency_ms)
+            if self.learning_store is not None:
+                self.learning_store.record(event)
+            if self.event_log is not None:
+                self.event_log.record(event)
 
         self.show_feedback(question, is_correct)
 
+    @traced(category="gui")
+    @measured_screen("feedback")
     def show_feedback(self, question: Question, is_correct: bool):
         """Zeigt das Feedback"""
         self.clear_container()
+        self.current_screen = "feedback"
 
         # Scrollbarer Bereich
         scroll_frame = ctk.CTkScrollableFrame(
@@ -875,17 +1452,31 @@ class QuizGUI(ctk.CTk):
 
     def skip_question(self):
         """Ueberspringt die Frage"""
+        if self.round_snapshot is not None:
+            self.round_snapshot.answers.append(0)
         self.current_index += 1
         self.show_question()
 
     def confirm_quit(self):
         """Bestaetigung zum Beenden"""
         if messagebox.askyesno("Quiz beenden", "Möchtest du das Quiz wirklich beenden?"):
+            snapshot = self.round_snapshot
+            if snapshot is not None and snapshot.position < len(snapshot.keys) and messagebox.askyesno(
+                "Runde speichern",
+                f"Runde speichern ({snapshot.position}/{snapshot.total}) und später fortsetzen?"
+            ):
+                try:
+                    save_snapshot(snapshot)
+                except OSError as exc:
+                    messagebox.showerror("Fehler", f"Die Runde konnte nicht gespeichert werden:\n{exc}")
             self.show_results()
 
+    @traced(category="gui")
+    @measured_screen("results")
     def show_results(self):
         """Zeigt die Ergebnisse"""
         self.clear_container()
+        self.round_snapshot = None
 
         # Zentrierter Container
         center_frame = ctk.CTkFrame(self.main_container, fg_color="transparent")
@@ -956,6 +1547,19 @@ class QuizGUI(ctk.CTk):
             text_color=rating_color
         ).pack()
 
+        if self.input_latencies_ms:
+            latencies = sorted(self.input_latencies_ms)
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            ctk.CTkLabel(
+                result_inner,
+                text=(
+                    f"Tastatur-Latenz: Median {statistics.median(latencies):.1f} ms, "
+                    f"p95 {p95:.1f} ms ({len(latencies)} Eingaben)"
+                ),
+                font=ctk.CTkFont(size=12),
+                text_color=self.colors['text_muted']
+            ).pack(pady=(15, 0))
+
         # Buttons
         button_frame = ctk.CTkFrame(center_frame, fg_color="transparent")
         button_frame.pack(pady=40)
@@ -986,11 +1590,48 @@ class QuizGUI(ctk.CTk):
         )
         quit_btn.pack(side="left", padx=10)
 
+    def shutdown(self):
+        """Schreibt ausstehende Daten nach dem Ende der Hauptschleife"""
+        self.banks.stop()
+        if self.diagnostics is not None:
+            self.diagnostics.stop()
+            try:
+                self.diagnostics.write_log(self)
+            except OSError as exc:
+                print(f"Diagnose-Log konnte nicht geschrieben werden: {exc}")
+            self.diagnostics = None
+        if self.learning_store is not None:
+            self.learning_store.close()
+            self.learning_store = None
+        if self.event_log is not None:
+            self.event_log.close()
+            self.event_log = None
+
 
 def main():
     """Hauptfunktion"""
-    app = QuizGUI()
+    parser = argparse.ArgumentParser(description="Lern-Quiz (GUI)")
+    add_trace_argument(parser)
+    parser.add_argument("--diagnostics", nargs="?", const="", default=None, metavar="DATEI",
+                        help=f"Aufbauzeiten der Bildschirme messen und einblenden (auch per {DIAGNOSTICS_ENV_VAR}=1, "
+                             f"Standard-Log: {DEFAULT_DIAGNOSTICS_PATH})")
+    parser.add_argument("--watch", action="store_true",
+                        help="Themenmodule überwachen und nach Änderungen im Hintergrund neu laden")
+    parser.add_argument("--module", action="append", default=[], metavar="DATEI",
+                        help="Zusätzliches Themenmodul (.py, z.B. aus bank_generator.py), mehrfach möglich")
+    args = parser.parse_args()
+    trace_path = enable_from_args(args)
+    if trace_path:
+        print(f"Trace: {trace_path}")
+
+    diagnostics_path = args.diagnostics
+    env_value = os.environ.get(DIAGNOSTICS_ENV_VAR, "")
+    if diagnostics_path is None and env_value and env_value != "0":
+        diagnostics_path = "" if env_value == "1" else env_value
+
+    app = QuizGUI(diagnostics_path, watch=args.watch, modules=args.module)
     app.mainloop()
+    app.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+GUI-Diagnose
+Misst in der GUI pro Bildschirmaufbau (clear_container und neue Widgets) die
+Aufbauzeit, die Zeit bis zum Neuzeichnen und die Anzahl der Tk-Widgets,
+dazu die Verzögerung der Tk-Ereignisschleife. Die Werte erscheinen als
+Einblendung unten rechts (F12) und werden beim Beenden als eine JSON-Zeile
+pro Sitzung an ~/.lern_quiz/gui_diagnostics.jsonl angehängt.
+
+Einschalten:
+    python gui.py --diagnostics [DATEI]
+    LERN_QUIZ_DIAGNOSTICS=1 python gui.py
+    F12 in der laufenden GUI (misst ab dann)
+
+Auswertung (auch mehrere Rechner, Dateien einfach zusammenkopieren):
+    python gui_diagnostics.py
+    python gui_diagnostics.py --log raum1.jsonl --log raum2.jsonl --json diagnose.json
+
+Ausgeschaltet kostet ein Bildschirmaufbau nur eine Attributabfrage.
+"""
+
+import argparse
+import functools
+import json
+import os
+import platform
+import sys
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from profiling import counter
+
+
+ENV_VAR = "LERN_QUIZ_DIAGNOSTICS"
+DEFAULT_DIAGNOSTICS_PATH = os.path.join(os.path.expanduser("~"), ".lern_quiz", "gui_diagnostics.jsonl")
+LAG_INTERVAL_MS = 50                     # Takt der Messung der Ereignisschleife
+OVERLAY_REFRESH_MS = 500                 # Aktualisierung der Einblendung
+RECENT_BUILDS = 200                      # Letzte Aufbauten einzeln im Log
+
+
+def count_widgets(widget) -> int:
+    """Anzahl der Tk-Widgets unterhalb von widget (ohne widget selbst)"""
+    count = 0
+    stack = list(widget.winfo_children())
+    while stack:
+        child = stack.pop()
+        count += 1
+        stack.extend(child.winfo_children())
+    return count
+
+
+@dataclass
+class ScreenBuild:
+    """Ein Bildschirmaufbau"""
+    screen: str
+    build_ms: float                      # Aufruf von show_... bis zur Rückkehr
+    widgets: int                         # Tk-Widgets im Hauptcontainer danach
+    paint_ms: float = 0.0                # Rückkehr bis zum ersten Idle-Callback (Layout und Zeichnen)
+    timestamp: float = field(default_factory=time.time)
+
+
+class GuiDiagnostics:
+    """Sammelt Aufbauzeiten, Widget-Zahlen und Verzögerung der Ereignisschleife"""
+
+    def __init__(self, path: str = DEFAULT_DIAGNOSTICS_PATH):
+        # latency zieht analytics (und ggf. numpy) nach: erst laden, wenn gemessen wird
+        from latency import LatencyHistogram
+
+        self._histogram = LatencyHistogram
+        self.path = path
+        self.started = time.time()
+        self.build_ms: Dict[str, LatencyHistogram] = {}
+        self.paint_ms: Dict[str, LatencyHistogram] = {}
+        self.widgets_max: Dict[str, int] = {}
+        self.lag_ms = LatencyHistogram()
+        self.recent: deque = deque(maxlen=RECENT_BUILDS)
+        self.last_build: Optional[ScreenBuild] = None
+        self.window_lag_ms = 0.0         # Größte Verzögerung seit der letzten Aktualisierung
+        self._depth = 0
+        self._screen = ""
+        self._build_started = 0.0
+        self._root = None
+        self._tick_id: Optional[str] = None
+        self._expected = 0.0
+        self._last_refresh = 0.0
+        self._on_refresh: Optional[Callable[[], None]] = None
+
+    # ------------------------------------------------------------------
+    # Bildschirmaufbau
+    # ------------------------------------------------------------------
+
+    def begin_screen(self, screen: str) -> None:
+        if self._depth == 0:
+            self._build_started = time.perf_counter()
+        # Verschachtelt (show_question -> show_results): der innere Bildschirm zählt
+        self._screen = screen
+        self._depth += 1
+
+    def end_screen(self, root, container) -> Optional[ScreenBuild]:
+        """Schließt einen Aufbau ab; das Neuzeichnen wird per Idle-Callback gemessen"""
+        self._depth -= 1
+        if self._depth:
+            return None
+        built_at = time.perf_counter()
+        build = ScreenBuild(self._screen, (built_at - self._build_started) * 1000.0, count_widgets(container))
+        self.build_ms.setdefault(build.screen, self._histogram()).record(build.build_ms)
+        self.widgets_max[build.screen] = max(self.widgets_max.get(build.screen, 0), build.widgets)
+        self.recent.append(build)
+        self.last_build = build
+        # Idle-Callbacks laufen nach dem Layout und Neuzeichnen der neuen Widgets
+        root.after_idle(self._painted, build, built_at)
+        return build
+
+    def _painted(self, build: ScreenBuild, built_at: float) -> None:
+        build.paint_ms = (time.perf_counter() - built_at) * 1000.0
+        self.paint_ms.setdefault(build.screen, self._histogram()).record(build.paint_ms)
+        counter("gui_screen", build_ms=round(build.build_ms, 2), paint_ms=round(build.paint_ms, 2),
+                widgets=build.widgets)
+
+    # ------------------------------------------------------------------
+    # Ereignisschleife
+    # ------------------------------------------------------------------
+
+    def start(self, root, on_refresh: Optional[Callable[[], None]] = None) -> None:
+        """
+        Startet die Messung der Ereignisschleife: ein Timer im festen Takt, die
+        Verspätung gegenüber dem geplanten Zeitpunkt ist die Verzögerung.
+
+        Args:
+            root: Tk-Hauptfenster
+            on_refresh: Wird alle OVERLAY_REFRESH_MS aufgerufen (Einblendung)
+        """
+        self._root = root
+        self._on_refresh = on_refresh
+        self._expected = time.perf_counter() + LAG_INTERVAL_MS / 1000.0
+        self._last_refresh = time.perf_counter()
+        self._tick_id = root.after(LAG_INTERVAL_MS, self._tick)
+
+    def stop(self) -> None:
+        if self._root is not None and self._tick_id is not None:
+            try:
+                self._root.after_cancel(self._tick_id)
+            except Exception:
+                pass  # Fenster schon zerstört
+        self._tick_id = None
+
+    def _tick(self) -> None:
+        now = time.perf_counter()
+        lag = max(0.0, (now - self._expected) * 1000.0)
+        self.lag_ms.record(lag)
+        self.window_lag_ms = max(self.window_lag_ms, lag)
+        self._expected = now + LAG_INTERVAL_MS / 1000.0
+        self._tick_id = self._root.after(LAG_INTERVAL_MS, self._tick)
+
+        if (now - self._last_refresh) * 1000.0 >= OVERLAY_REFRESH_MS:
+            self._last_refresh = now
+            if self._on_refresh is not None:
+                self._on_refresh()
+            counter("gui_event_loop_lag", max_ms=round(self.window_lag_ms, 2))
+            self.window_lag_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Ausgabe
+    # ------------------------------------------------------------------
+
+    def overlay_text(self) -> str:
+        """Kurzer Text für die Einblendung"""
+        lines = []
+        build = self.last_build
+        if build is not None:
+            lines.append(f"{build.screen or '?'}: Aufbau {build.build_ms:.1f} ms, "
+                         f"Zeichnen {build.paint_ms:.1f} ms, {build.widgets} Widgets")
+            histogram = self.build_ms.get(build.screen)
+            if histogram is not None and histogram.total > 1:
+                lines.append(f"Aufbau {build.screen}: Median {histogram.percentile(50):.0f} ms, "
+                             f"p90 {histogram.percentile(90):.0f} ms (n={histogram.total})")
+        lines.append(f"Schleife: max {self.window_lag_ms:.0f} ms, p99 {self.lag_ms.percentile(99):.0f} ms, "
+                     f"größte {self.lag_ms.max_ms} ms")
+        return "\n".join(lines)
+
+    def to_record(self, root=None) -> dict:
+        """Eine Sitzung als JSON-Objekt (Histogramme verlustfrei zum Zusammenführen)"""
+        environment = {
+            "host": platform.node(),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+        }
+        if root is not None:
+            try:
+                environment.update(
+                    tk=str(root.tk.call("info", "patchlevel")),
+                    screen=f"{root.winfo_screenwidth()}x{root.winfo_screenheight()}",
+                    scaling=round(float(root.tk.call("tk", "scaling")), 3),
+                )
+            except Exception:
+                pass  # Fenster schon zerstört
+        return {
+            "started": self.started,
+            "ended": time.time(),
+            "environment": environment,
+            "screens": {
+                screen: {
+                    "build": histogram.to_dict(),
+                    "paint": self.paint_ms[screen].to_dict() if screen in self.paint_ms else None,
+                    "widgets_max": self.widgets_max.get(screen, 0),
+                }
+                for screen, histogram in self.build_ms.items()
+            },
+            "lag": self.lag_ms.to_dict(),
+            "recent": [asdict(build) for build in self.recent],
+        }
+
+    def write_log(self, root=None) -> None:
+        """Hängt die Sitzung als eine Zeile an das Log an"""
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.to_record(root), separators=(",", ":"), ensure_ascii=False) + "\n")
+
+
+def measured_screen(screen: str) -> Callable[[Callable], Callable]:
+    """
+    Misst eine Bildschirm-Methode der GUI (erwartet self.diagnostics und
+    self.main_container). Ohne Diagnose wird die Methode direkt aufgerufen.
+    """
+    def decorate(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            diagnostics = self.diagnostics
+            if diagnostics is None:
+                return method(self, *args, **kwargs)
+            diagnostics.begin_screen(screen)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                diagnostics.end_screen(self, self.main_container)
+        return wrapper
+    return decorate
+
+
+# ----------------------------------------------------------------------
+# Auswertung über mehrere Sitzungen
+# ----------------------------------------------------------------------
+
+def read_sessions(path: str) -> List[dict]:
+    """Liest alle Sitzungen eines Logs (unlesbare Zeilen werden übersprungen)"""
+    sessions = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                sessions.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # abgebrochene letzte Zeile
+    return sessions
+
+
+def merge_sessions(sessions: List[dict]) -> Dict[str, dict]:
+    """
+    Führt die Histogramme pro Rechner zusammen.
+
+    Returns:
+        Rechner -> {"sessions", "screens": Bildschirm -> {"build", "paint", "widgets_max"}, "lag"}
+    """
+    from latency import LatencyHistogram
+
+    hosts: Dict[str, dict] = {}
+    for session in sessions:
+        host = session.get("environment", {}).get("host") or "?"
+        merged = hosts.setdefault(host, {"sessions": 0, "screens": {}, "lag": LatencyHistogram()})
+        merged["sessions"] += 1
+        merged["lag"].merge(LatencyHistogram.from_dict(session["lag"]))
+        for screen, data in session.get("screens", {}).items():
+            entry = merged["screens"].setdefault(
+                screen, {"build": LatencyHistogram(), "paint": LatencyHistogram(), "widgets_max": 0})
+            entry["build"].merge(LatencyHistogram.from_dict(data["build"]))
+            if data.get("paint"):
+                entry["paint"].merge(LatencyHistogram.from_dict(data["paint"]))
+            entry["widgets_max"] = max(entry["widgets_max"], data.get("widgets_max", 0))
+    return hosts
+
+
+def print_report(hosts: Dict[str, dict]) -> None:
+    """Aufbau- und Zeichenzeiten pro Rechner und Bildschirm"""
+    for host, merged in sorted(hosts.items()):
+        lag = merged["lag"]
+        print(f"\n  {host}: {merged['sessions']} Sitzungen, Ereignisschleife p50 {lag.percentile(50):.0f} ms, "
+              f"p99 {lag.percentile(99):.0f} ms, größte {lag.max_ms} ms")
+        print(f"    {'Bildschirm':<12} {'n':>6} {'Aufbau p50':>11} {'p90':>7} {'Zeichnen p50':>13} "
+              f"{'p90':>7} {'Widgets':>8}")
+        screens = sorted(merged["screens"].items(), key=lambda item: item[1]["build"].percentile(50), reverse=True)
+        for screen, entry in screens:
+            build, paint = entry["build"], entry["paint"]
+            print(f"    {screen:<12} {build.total:>6} {build.percentile(50):>8.0f} ms {build.percentile(90):>4.0f} ms "
+                  f"{paint.percentile(50):>10.0f} ms {paint.percentile(90):>4.0f} ms {entry['widgets_max']:>8}")
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Auswertung der GUI-Diagnose")
+    parser.add_argument("--log", action="append", default=None, metavar="DATEI",
+                        help=f"Diagnose-Log (mehrfach möglich, Standard: {DEFAULT_DIAGNOSTICS_PATH})")
+    parser.add_argument("--json", metavar="DATEI", help="Zusammenfassung als JSON speichern")
+    args = parser.parse_args()
+
+    sessions = []
+    for path in args.log or [DEFAULT_DIAGNOSTICS_PATH]:
+        try:
+            sessions.extend(read_sessions(path))
+        except OSError as exc:
+            print(f"  {path}: {exc}")
+    if not sessions:
+        print("Keine Sitzungen gefunden (GUI mit --diagnostics starten).")
+        return
+
+    hosts = merge_sessions(sessions)
+    print_report(hosts)
+
+    if args.json:
+        data = {
+            host: {
+                "sessions": merged["sessions"],
+                "lag": merged["lag"].summary(),
+                "screens": {
+                    screen: {"build": entry["build"].summary(), "paint": entry["paint"].summary(),
+                             "widgets_max": entry["widgets_max"]}
+                    for screen, entry in merged["screens"].items()
+                },
+            }
+            for host, merged in hosts.items()
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
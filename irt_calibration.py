@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+IRT-Kalibrierung
+Schätzt aus dem Antwort-Log Trennschärfe a und Schwierigkeit b jeder Frage
+(2PL-Modell, siehe irt.py) und speichert sie zusammen mit dem
+vorberechneten Informationsindex für den adaptiven Einstufungstest.
+
+Verwendet wird nur die erste Antwort jeder Person auf jede Frage (spätere
+Antworten sind durch Lernen verzerrt). Geschätzt wird per Joint Maximum
+Likelihood mit schwachen Priors (θ ~ N(0, 1), b ~ N(0, 2²), a ~ N(1, 0,5²)),
+abwechselnd Newton-Schritte für Personen und Fragen; danach wird θ auf
+Mittel 0 und Standardabweichung 1 normiert. Mit NumPy laufen alle Summen als
+bincount über die Spalten, ohne NumPy in reinem Python (für kleine Logs).
+
+Aufruf:
+    python irt_calibration.py
+    python irt_calibration.py --log ~/.lern_quiz/answers.qcol --min-answers 30 --out irt.bin
+    python irt_calibration.py --synthetic 2000000
+    python irt_calibration.py --benchmark 20000
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from analytics import AnswerColumns, load_columns, np, synthetic_columns
+from column_log import DEFAULT_COLUMN_LOG_PATH
+from irt import (DEFAULT_IRT_PATH, AdaptiveScheduler, ItemCalibration, build_information_order,
+                 grid_values, save_calibration)
+
+
+THETA_LIMIT = 4.0
+B_LIMIT = 4.0
+A_MIN, A_MAX = 0.2, 3.0
+A_PRIOR_MEAN, A_PRIOR_VAR = 1.0, 0.25
+B_PRIOR_VAR = 4.0
+MAX_STEP = 0.5
+
+
+def first_attempts(columns: AnswerColumns) -> Tuple[Sequence[int], Sequence[int], Sequence[int]]:
+    """
+    Erste Antwort jeder Person auf jede Frage (nach Zeit).
+
+    Returns:
+        (Frage, Person, richtig) als gleich lange Spalten
+    """
+    if np is not None:
+        question = np.asarray(columns.question, dtype=np.int64)
+        user = np.asarray(columns.user, dtype=np.int64)
+        order = np.argsort(np.asarray(columns.timestamp), kind="stable")
+        _, first = np.unique(user[order] * max(len(columns.keys), 1) + question[order], return_index=True)
+        rows = order[first]
+        return question[rows], user[rows], np.asarray(columns.correct, dtype=np.float64)[rows]
+
+    seen = set()
+    questions, users, correct = [], [], []
+    rows = sorted(range(len(columns)), key=columns.timestamp.__getitem__)
+    for row in rows:
+        pair = (columns.user[row], columns.question[row])
+        if pair in seen:
+            continue
+        seen.add(pair)
+        questions.append(columns.question[row])
+        users.append(columns.user[row])
+        correct.append(float(columns.correct[row]))
+    return questions, users, correct
+
+
+def _logit_start(index: Sequence[int], x: Sequence[float], size: int) -> List[float]:
+    """Logit des (geglätteten) Anteils richtiger Antworten als Startwert"""
+    right = [0.5] * size
+    total = [1.0] * size
+    for i, value in zip(index, x):
+        right[i] += value
+        total[i] += 1.0
+    return [math.log(r / (t - r)) for r, t in zip(right, total)]
+
+
+def _fit_numpy(item, person, x, items: int, persons: int, iterations: int):
+    def sigmoid(z):
+        return 1.0 / (1.0 + np.exp(-np.clip(z, -30.0, 30.0)))
+
+    def logit_start(index, size):
+        p = (np.bincount(index, weights=x, minlength=size) + 0.5) / (np.bincount(index, minlength=size) + 1.0)
+        return np.log(p / (1.0 - p))
+
+    a = np.ones(items)
+    b = np.clip(-logit_start(item, items), -B_LIMIT, B_LIMIT)
+    theta = np.clip(logit_start(person, persons), -THETA_LIMIT, THETA_LIMIT)
+
+    for _ in range(iterations):
+        # Personen: Newton-Schritt auf θ (Prior N(0, 1))
+        ai = a[item]
+        p = sigmoid(ai * (theta[person] - b[item]))
+        grad = np.bincount(person, weights=ai * (x - p), minlength=persons) - theta
+        hess = np.bincount(person, weights=ai * ai * p * (1.0 - p), minlength=persons) + 1.0
+        theta = np.clip(theta + np.clip(grad / hess, -1.0, 1.0), -THETA_LIMIT, THETA_LIMIT)
+
+        # Fragen: Newton-Schritte auf b und a (getrennt, diagonale Näherung)
+        d = theta[person] - b[item]
+        p = sigmoid(a[item] * d)
+        r, w = x - p, p * (1.0 - p)
+        grad_b = -a * np.bincount(item, weights=r, minlength=items) - b / B_PRIOR_VAR
+        hess_b = a * a * np.bincount(item, weights=w, minlength=items) + 1.0 / B_PRIOR_VAR
+        grad_a = np.bincount(item, weights=r * d, minlength=items) - (a - A_PRIOR_MEAN) / A_PRIOR_VAR
+        hess_a = np.bincount(item, weights=w * d * d, minlength=items) + 1.0 / A_PRIOR_VAR
+        b = np.clip(b + np.clip(grad_b / hess_b, -MAX_STEP, MAX_STEP), -B_LIMIT, B_LIMIT)
+        a = np.clip(a + np.clip(grad_a / hess_a, -MAX_STEP, MAX_STEP), A_MIN, A_MAX)
+
+        # Normierung: θ mit Mittel 0 und Standardabweichung 1
+        mean, std = theta.mean(), theta.std() or 1.0
+        theta = (theta - mean) / std
+        b = np.clip((b - mean) / std, -B_LIMIT, B_LIMIT)
+        a = np.clip(a * std, A_MIN, A_MAX)
+
+    return a.tolist(), b.tolist(), theta.tolist()
+
+
+def _fit_python(item, person, x, items: int, persons: int, iterations: int):
+    def sigmoid(z):
+        return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+
+    def clip(value, low, high):
+        return max(low, min(high, value))
+
+    a = [1.0] * items
+    b = [clip(-value, -B_LIMIT, B_LIMIT) for value in _logit_start(item, x, items)]
+    theta = [clip(value, -THETA_LIMIT, THETA_LIMIT) for value in _logit_start(person, x, persons)]
+
+    for _ in range(iterations):
+        grad = [-t for t in theta]
+        hess = [1.0] * persons
+        for i, j, value in zip(item, person, x):
+            p = sigmoid(a[i] * (theta[j] - b[i]))
+            grad[j] += a[i] * (value - p)
+            hess[j] += a[i] * a[i] * p * (1.0 - p)
+        theta = [clip(t + clip(g / h, -1.0, 1.0), -THETA_LIMIT, THETA_LIMIT)
+                 for t, g, h in zip(theta, grad, hess)]
+
+        sum_r, sum_w, sum_rd, sum_wdd = [0.0] * items, [0.0] * items, [0.0] * items, [0.0] * items
+        for i, j, value in zip(item, person, x):
+            d = theta[j] - b[i]
+            p = sigmoid(a[i] * d)
+            r, w = value - p, p * (1.0 - p)
+            sum_r[i] += r
+            sum_w[i] += w
+            sum_rd[i] += r * d
+            sum_wdd[i] += w * d * d
+        for i in range(items):
+            grad_b = -a[i] * sum_r[i] - b[i] / B_PRIOR_VAR
+            hess_b = a[i] * a[i] * sum_w[i] + 1.0 / B_PRIOR_VAR
+            grad_a = sum_rd[i] - (a[i] - A_PRIOR_MEAN) / A_PRIOR_VAR
+            hess_a = sum_wdd[i] + 1.0 / A_PRIOR_VAR
+            b[i] = clip(b[i] + clip(grad_b / hess_b, -MAX_STEP, MAX_STEP), -B_LIMIT, B_LIMIT)
+            a[i] = clip(a[i] + clip(grad_a / hess_a, -MAX_STEP, MAX_STEP), A_MIN, A_MAX)
+
+        mean = sum(theta) / persons
+        std = math.sqrt(sum((t - mean) ** 2 for t in theta) / persons) or 1.0
+        theta = [(t - mean) / std for t in theta]
+        b = [clip((value - mean) / std, -B_LIMIT, B_LIMIT) for value in b]
+        a = [clip(value * std, A_MIN, A_MAX) for value in a]
+
+    return a, b, theta
+
+
+def information_order(a: Sequence[float], b: Sequence[float], use_numpy: Optional[bool] = None) -> List[array]:
+    """Informationsindex: pro Rasterpunkt die Fragen absteigend nach Information"""
+    grid = grid_values()
+    if not (np is not None if use_numpy is None else use_numpy):
+        return build_information_order(a, b, grid)
+
+    a_values, b_values = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    theta = np.asarray(grid)[:, None]
+    p = 1.0 / (1.0 + np.exp(-np.clip(a_values * (theta - b_values), -30.0, 30.0)))
+    ranked = np.argsort(-(a_values * a_values * p * (1.0 - p)), axis=1, kind="stable").astype(np.uint32)
+    orders = []
+    for row in ranked:
+        order = array("I")
+        order.frombytes(row.tobytes())
+        orders.append(order)
+    return orders
+
+
+def calibrate(
+    columns: AnswerColumns,
+    min_answers: int = 20,
+    iterations: int = 30,
+    use_numpy: Optional[bool] = None,
+) -> ItemCalibration:
+    """
+    Kalibriert alle Fragen mit mindestens `min_answers` Erstantworten.
+
+    Args:
+        columns: Antwort-Log in Spalten
+        min_answers: Fragen mit weniger Erstantworten bleiben unkalibriert
+        iterations: Anzahl der Newton-Runden
+        use_numpy: None = NumPy falls installiert
+    """
+    numpy = np is not None if use_numpy is None else use_numpy
+    question, user, correct = first_attempts(columns)
+    size = len(columns.keys)
+
+    # Nur Fragen mit genug Antworten; Fragen und Personen neu durchnummerieren
+    if numpy:
+        question, user = np.asarray(question, dtype=np.int64), np.asarray(user, dtype=np.int64)
+        counts = np.bincount(question, minlength=size)
+        keep = np.flatnonzero(counts >= min_answers)
+        item_of = np.full(size, -1, dtype=np.int64)
+        item_of[keep] = np.arange(len(keep))
+        rows = item_of[question] >= 0
+        people, person = np.unique(user[rows], return_inverse=True)
+        item, x, persons = item_of[question[rows]], np.asarray(correct, dtype=np.float64)[rows], len(people)
+        counts, keep = counts.tolist(), keep.tolist()
+    else:
+        if np is not None:
+            question, user, correct = (np.asarray(column).tolist() for column in (question, user, correct))
+        counts = [0] * size
+        for q in question:
+            counts[q] += 1
+        keep = [q for q, count in enumerate(counts) if count >= min_answers]
+        item_of = {q: i for i, q in enumerate(keep)}
+        person_of = {}
+        item, person, x = [], [], []
+        for q, u, value in zip(question, user, correct):
+            if q in item_of:
+                item.append(item_of[q])
+                person.append(person_of.setdefault(u, len(person_of)))
+                x.append(float(value))
+        persons = len(person_of)
+
+    if not keep:
+        a, b = [], []
+    elif numpy:
+        a, b, _ = _fit_numpy(item, person, x, len(keep), persons, iterations)
+    else:
+        a, b, _ = _fit_python(item, person, x, len(keep), persons, iterations)
+
+    return ItemCalibration(
+        keys=[columns.keys[q] for q in keep],
+        a=array("f", a),
+        b=array("f", b),
+        answers=array("I", [counts[q] for q in keep]),
+        order=information_order(a, b, numpy) if keep else [array("I") for _ in grid_values()],
+        persons=persons,
+    )
+
+
+def benchmark_selection(items: int, tests: int = 200, length: int = 30, seed: int = 0) -> Tuple[float, float]:
+    """
+    Misst die Auswahl der nächsten Frage auf einer künstlichen Bank.
+
+    Returns:
+        (Sekunden für den Indexaufbau, Mikrosekunden pro Auswahl im Mittel)
+    """
+    rng = random.Random(seed)
+    a = [rng.uniform(0.4, 2.5) for _ in range(items)]
+    b = [rng.gauss(0.0, 1.2) for _ in range(items)]
+    start = time.perf_counter()
+    order = information_order(a, b)
+    build_seconds = time.perf_counter() - start
+
+    keys = [f"{i:016x}" for i in range(items)]
+    calibration = ItemCalibration(keys=keys, a=array("f", a), b=array("f", b),
+                                  answers=array("I", [0]) * items, order=order)
+    scheduler = AdaptiveScheduler(keys, calibration, max_se=0.0, rng=rng)
+    selections, elapsed = 0, 0.0
+    for _ in range(tests):
+        scheduler.reset()
+        ability = rng.gauss(0.0, 1.0)
+        for _ in range(length):
+            start = time.perf_counter()
+            index = scheduler.next_index()
+            elapsed += time.perf_counter() - start
+            selections += 1
+            scheduler.record(index, rng.random() < 1.0 / (1.0 + math.exp(-a[index] * (ability - b[index]))))
+    return build_seconds, elapsed / selections * 1e6
+
+
+def main():
+    """Hauptfunktion"""
+    from questions import TOPICS
+    from quiz_engine import question_key, sanitize_prompt
+
+    parser = argparse.ArgumentParser(description="IRT-Parameter für den adaptiven Einstufungstest schätzen")
+    parser.add_argument("--log", default=DEFAULT_COLUMN_LOG_PATH, help="Antwort-Log (Spalten- oder Zeilen-Log)")
+    parser.add_argument("--out", default=DEFAULT_IRT_PATH, help="Zieldatei für Parameter und Index")
+    parser.add_argument("--min-answers", type=int, default=20, help="Mindestzahl an Erstantworten pro Frage")
+    parser.add_argument("--iterations", type=int, default=30, help="Newton-Runden")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N",
+                        help="Künstliches Log mit N Antworten statt --log kalibrieren")
+    parser.add_argument("--no-numpy", action="store_true", help="Reines Python (zum Vergleich)")
+    parser.add_argument("--benchmark", type=int, default=0, metavar="FRAGEN",
+                        help="Nur die Auswahlzeit auf einer künstlichen Bank dieser Größe messen")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        build_seconds, per_selection = benchmark_selection(args.benchmark)
+        print(f"{args.benchmark} Fragen: Index {build_seconds:.2f} s, Auswahl {per_selection:.1f} µs pro Frage")
+        return
+
+    banks = {name: loader() for name, loader in TOPICS.items()}
+    start = time.perf_counter()
+    if args.synthetic:
+        columns = synthetic_columns([q for questions in banks.values() for q in questions], args.synthetic)
+    else:
+        columns = load_columns(args.log)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    calibration = calibrate(columns, args.min_answers, args.iterations, use_numpy=False if args.no_numpy else None)
+    fit_seconds = time.perf_counter() - start
+    if not len(calibration):
+        print(f"Keine Frage hat mindestens {args.min_answers} Erstantworten, nichts gespeichert.")
+        return
+    save_calibration(calibration, args.out)
+
+    prompts = {question_key(q): sanitize_prompt(q.prompt) for qs in banks.values() for q in qs}
+    ranked = sorted(range(len(calibration)), key=lambda i: calibration.b[i])
+    print(f"\n  {len(calibration)} Fragen kalibriert ({calibration.persons} Personen), gespeichert in {args.out}")
+    for title, rows in (("Leichteste", ranked[:5]), ("Schwerste", ranked[-5:][::-1])):
+        print(f"  {title} Fragen:")
+        for i in rows:
+            print(f"    b={calibration.b[i]:+.2f} a={calibration.a[i]:.2f} n={calibration.answers[i]:<6} "
+                  f"{prompts.get(calibration.keys[i], calibration.keys[i])[:60]}")
+    print(f"\n{len(columns)} Antworten: laden {load_seconds:.2f} s, kalibrieren {fit_seconds:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Antwortzeiten
+Histogramme der Antwortzeit (Anzeige der Frage bis Antwort) pro Frage und
+pro Themenmodul, im Stil eines HDR-Histogramms: Werte in ganzen
+Millisekunden, unter 128 ms exakt, darüber 64 Stufen pro Zweierpotenz
+(relativer Fehler unter 1,6 %). Ein Histogramm speichert nur belegte
+Stufen und lässt sich verlustfrei zusammenführen.
+
+Damit lassen sich Fragen finden, die lange zum Lesen brauchen (auch pro
+Zeichen Text), und Sitzungslängen planen (Fragen pro 10 Minuten).
+
+Aufruf:
+    python latency.py
+    python latency.py --log ~/.lern_quiz/answers.qcol --top 20 --json zeiten.json
+    python latency.py --synthetic 1000000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Mapping, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from analytics import AnswerColumns, load_columns, np, synthetic_columns
+from column_log import DEFAULT_COLUMN_LOG_PATH
+from quiz_engine import Question, question_key, sanitize_prompt
+
+
+SUB_BUCKET_BITS = 7                      # 128 exakte Werte, danach 64 Stufen pro Zweierpotenz
+_HALF = 1 << (SUB_BUCKET_BITS - 1)
+MAX_LATENCY_MS = 60 * 60 * 1000          # Längere Zeiten (Pause) zählen als 1 h
+SESSION_MINUTES = 10
+
+
+def bucket_index(value_ms: int) -> int:
+    """Stufe eines Werts (ganze ms)"""
+    shift = max(0, value_ms.bit_length() - SUB_BUCKET_BITS)
+    return (shift << (SUB_BUCKET_BITS - 1)) + (value_ms >> shift)
+
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """Kleinster und größter Wert einer Stufe"""
+    if index < 2 * _HALF:
+        return index, index
+    shift = (index >> (SUB_BUCKET_BITS - 1)) - 1
+    low = (index - (shift << (SUB_BUCKET_BITS - 1))) << shift
+    return low, low + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """Histogramm der Antwortzeiten (ms)"""
+
+    __slots__ = ("counts", "total", "sum_ms", "max_ms")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0
+
+    def record(self, latency_ms: float, count: int = 1) -> None:
+        value = min(int(latency_ms + 0.5), MAX_LATENCY_MS)
+        index = bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+        self.sum_ms += value * count
+        if value > self.max_ms:
+            self.max_ms = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum_ms += other.sum_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def __len__(self) -> int:
+        return self.total
+
+    @property
+    def mean(self) -> float:
+        return self.sum_ms / self.total if self.total else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Wert, unter dem `percent` Prozent der Antworten liegen (Mitte der Stufe)"""
+        if not self.total:
+            return 0.0
+        rank = max(1, int(self.total * percent / 100.0 + 0.5))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                return min((low + high) / 2.0, self.max_ms)
+        return float(self.max_ms)
+
+    def summary(self) -> dict:
+        return {
+            "count": self.total,
+            "mean_ms": round(self.mean, 1),
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+        }
+
+    def to_dict(self) -> dict:
+        """Verlustfreie Darstellung für JSON (Stufe -> Anzahl)"""
+        return {"counts": {str(k): v for k, v in sorted(self.counts.items())},
+                "sum_ms": self.sum_ms, "max_ms": self.max_ms}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        histogram = cls()
+        histogram.counts = {int(k): v for k, v in data["counts"].items()}
+        histogram.total = sum(histogram.counts.values())
+        histogram.sum_ms = data["sum_ms"]
+        histogram.max_ms = data["max_ms"]
+        return histogram
+
+
+# ----------------------------------------------------------------------
+# Aggregation aus dem Log
+# ----------------------------------------------------------------------
+
+def _histograms_numpy(columns: AnswerColumns) -> Dict[int, LatencyHistogram]:
+    q = np.asarray(columns.question, dtype=np.int64)
+    latency = np.asarray(columns.latency_ms, dtype=np.float64)
+    measured = latency > 0
+    q = q[measured]
+    values = np.minimum(np.floor(latency[measured] + 0.5), MAX_LATENCY_MS).astype(np.int64)
+
+    # bit_length über frexp (exakt für ganze Zahlen < 2**53)
+    bit_length = np.frexp(values.astype(np.float64))[1]
+    shift = np.maximum(0, bit_length - SUB_BUCKET_BITS)
+    index = (shift << (SUB_BUCKET_BITS - 1)) + (values >> shift)
+
+    # Eine Zählung über (Frage, Stufe), dazu Summe und Maximum pro Frage
+    stride = int(index.max()) + 1 if len(index) else 1
+    cells, counts = np.unique(q * stride + index, return_counts=True)
+    size = len(columns.keys)
+    sums = np.bincount(q, weights=values, minlength=size)
+    maxima = np.zeros(size, dtype=np.int64)
+    np.maximum.at(maxima, q, values)
+
+    histograms: Dict[int, LatencyHistogram] = {}
+    for cell, count in zip(cells.tolist(), counts.tolist()):
+        question, bucket = divmod(cell, stride)
+        histogram = histograms.get(question)
+        if histogram is None:
+            histogram = histograms[question] = LatencyHistogram()
+            histogram.sum_ms = float(sums[question])
+            histogram.max_ms = int(maxima[question])
+        histogram.counts[bucket] = count
+        histogram.total += count
+    return histograms
+
+
+def _histograms_python(columns: AnswerColumns) -> Dict[int, LatencyHistogram]:
+    histograms: Dict[int, LatencyHistogram] = {}
+    for question, latency in zip(columns.question, columns.latency_ms):
+        if latency <= 0:
+            continue
+        histogram = histograms.get(question)
+        if histogram is None:
+            histogram = histograms[question] = LatencyHistogram()
+        histogram.record(latency)
+    return histograms
+
+
+def latency_histograms(
+    columns: AnswerColumns,
+    banks: Mapping[str, Sequence[Question]],
+) -> Tuple[Dict[str, Dict[str, LatencyHistogram]], Dict[str, LatencyHistogram]]:
+    """
+    Histogramme pro Frage und pro Themenmodul (Antworten ohne Zeitmessung zählen nicht).
+
+    Returns:
+        (Themenmodul -> Fragenschlüssel -> Histogramm, Themenmodul -> Histogramm)
+    """
+    topic_of: Dict[str, str] = {}
+    for topic, questions in banks.items():
+        for q in questions:
+            topic_of.setdefault(question_key(q), topic)
+
+    per_question: Dict[str, Dict[str, LatencyHistogram]] = {}
+    per_topic: Dict[str, LatencyHistogram] = {}
+    if not len(columns.latency_ms):
+        return per_question, per_topic
+
+    histograms = _histograms_numpy(columns) if np is not None else _histograms_python(columns)
+    for index, histogram in histograms.items():
+        key = columns.keys[index]
+        topic = topic_of.get(key, "Unbekannt")
+        per_question.setdefault(topic, {})[key] = histogram
+        per_topic.setdefault(topic, LatencyHistogram()).merge(histogram)
+    return per_question, per_topic
+
+
+def question_text_length(q: Question) -> int:
+    """Zeichen, die zum Beantworten gelesen werden (Prompt und Optionen)"""
+    return len(sanitize_prompt(q.prompt)) + sum(len(text) for text in q.options.values())
+
+
+def print_report(
+    per_question: Dict[str, Dict[str, LatencyHistogram]],
+    per_topic: Dict[str, LatencyHistogram],
+    banks: Mapping[str, Sequence[Question]],
+    min_answers: int = 10,
+    top: int = 10,
+) -> None:
+    """Antwortzeiten pro Themenmodul und die langsamsten Fragen"""
+    questions = {question_key(q): q for qs in banks.values() for q in qs}
+
+    for topic, histogram in per_topic.items():
+        p50 = histogram.percentile(50)
+        per_session = SESSION_MINUTES * 60_000 / histogram.mean if histogram.mean else 0
+        print(f"\n  {topic}: {histogram.total} Antworten, Median {p50 / 1000:.1f} s, "
+              f"p90 {histogram.percentile(90) / 1000:.1f} s, p99 {histogram.percentile(99) / 1000:.1f} s")
+        print(f"    ≈ {per_session:.0f} Fragen in {SESSION_MINUTES} Minuten (nur Antwortzeit, ohne Erklärungen)")
+
+        rows = []
+        for key, h in per_question.get(topic, {}).items():
+            if h.total < min_answers:
+                continue
+            q = questions.get(key)
+            chars = question_text_length(q) if q is not None else 0
+            rows.append((h.percentile(50), h, chars, sanitize_prompt(q.prompt) if q is not None else key))
+        rows.sort(key=lambda row: row[0], reverse=True)
+        if rows:
+            print(f"    Langsamste Fragen (Median, mind. {min_answers} Antworten):")
+        for median, h, chars, prompt in rows[:top]:
+            per_100 = f"{median / chars * 100 / 1000:4.1f} s/100 Z." if chars else "      -      "
+            print(f"      {median / 1000:6.1f} s  p90 {h.percentile(90) / 1000:6.1f} s  {per_100}  "
+                  f"n={h.total:<6} {prompt[:60]}")
+
+
+def main():
+    """Hauptfunktion"""
+    from questions import TOPICS
+
+    parser = argparse.ArgumentParser(description="Antwortzeiten pro Frage und Themenmodul")
+    parser.add_argument("--log", default=DEFAULT_COLUMN_LOG_PATH, help="Antwort-Log (Spalten- oder Zeilen-Log)")
+    parser.add_argument("--min-answers", type=int, default=10, help="Fragen mit weniger Antworten übergehen")
+    parser.add_argument("--top", type=int, default=10, help="Anzahl der langsamsten Fragen pro Thema")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N",
+                        help="Künstliches Log mit N Antworten statt --log auswerten")
+    parser.add_argument("--json", metavar="DATEI", help="Histogramme als JSON speichern")
+    args = parser.parse_args()
+
+    banks = {name: loader() for name, loader in TOPICS.items()}
+
+    start = time.perf_counter()
+    if args.synthetic:
+        columns = synthetic_columns([q for questions in banks.values() for q in questions], args.synthetic)
+    else:
+        columns = load_columns(args.log, latency=True)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    per_question, per_topic = latency_histograms(columns, banks)
+    aggregate_seconds = time.perf_counter() - start
+
+    print_report(per_question, per_topic, banks, args.min_answers, args.top)
+    print(f"\n{len(columns)} Antworten: laden {load_seconds:.2f} s, Histogramme {aggregate_seconds:.2f} s")
+
+    if args.json:
+        data = {
+            topic: {
+                "summary": per_topic[topic].summary(),
+                "histogram": per_topic[topic].to_dict(),
+                "questions": {key: dict(h.summary(), histogram=h.to_dict())
+                              for key, h in per_question.get(topic, {}).items()},
+            }
+            for topic in per_topic
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lernstand-Speicher
+Speichert beantwortete Fragen pro Person lokal in SQLite (WAL-Modus).
+
+Antworten werden über eine Queue an einen Schreib-Thread übergeben und dort
+gebündelt in einer Transaktion geschrieben, damit das Beantworten nicht auf
+die Festplatte wartet.
+"""
+
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from quiz_engine import AnswerEvent
+
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".lern_quiz", "learning.db")
+
+# Wiederholungsabstände für "fällige" Fragen (Leitner-artig)
+RETRY_AFTER_WRONG = 10 * 60          # falsch -> nach 10 Minuten wieder fällig
+BASE_INTERVAL = 24 * 60 * 60         # richtig -> 1, 2, 4, ... Tage
+MAX_STREAK_EXPONENT = 8
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    question_key TEXT NOT NULL,
+    selected TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_answers_user_question ON answers(user, question_key);
+
+CREATE TABLE IF NOT EXISTS question_stats (
+    user TEXT NOT NULL,
+    question_key TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    streak INTEGER NOT NULL,
+    last_ts REAL NOT NULL,
+    due_ts REAL NOT NULL,
+    PRIMARY KEY (user, question_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_stats_due ON question_stats(user, due_ts);
+CREATE INDEX IF NOT EXISTS idx_stats_weakest ON question_stats(user, (CAST(correct AS REAL) / attempts));
+"""
+
+_INSERT_ANSWER = "INSERT INTO answers (user, question_key, selected, correct, ts) VALUES (?, ?, ?, ?, ?)"
+
+# Laufende Statistik pro Person/Frage, damit Abfragen nicht über alle Antworten laufen
+_UPSERT_STATS = f"""
+INSERT INTO question_stats (user, question_key, attempts, correct, streak, last_ts, due_ts)
+VALUES (:user, :key, 1, :correct, :correct, :ts,
+        CASE WHEN :correct THEN :ts + {BASE_INTERVAL} ELSE :ts + {RETRY_AFTER_WRONG} END)
+ON CONFLICT (user, question_key) DO UPDATE SET
+    attempts = attempts + 1,
+    correct = correct + excluded.correct,
+    streak = CASE WHEN excluded.correct THEN streak + 1 ELSE 0 END,
+    last_ts = excluded.last_ts,
+    due_ts = CASE
+        WHEN excluded.correct
+        THEN excluded.last_ts + {BASE_INTERVAL} * (1 << min(streak + 1, {MAX_STREAK_EXPONENT}))
+        ELSE excluded.last_ts + {RETRY_AFTER_WRONG}
+    END
+"""
+
+_STOP = object()
+
+
+class LearningStore:
+    """Persistenter Lernstand mit asynchronem, gebündeltem Schreiben"""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_DB_PATH,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ):
+        """
+        Args:
+            path: Pfad zur SQLite-Datei
+            batch_size: Maximale Anzahl Antworten pro Transaktion
+            flush_interval: Maximale Wartezeit (Sekunden), bevor geschrieben wird
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        # Schema im aufrufenden Thread anlegen, damit Fehler sofort sichtbar sind
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.close()
+
+        self._queue: "queue.Queue[object]" = queue.Queue()
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        self._closed = False
+        self.error: Optional[sqlite3.Error] = None
+
+        self._writer = threading.Thread(target=self._write_loop, name="LearningStoreWriter", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, event: AnswerEvent) -> None:
+        """Nimmt eine Antwort entgegen (blockiert nicht)"""
+        if self._closed:
+            return
+        self._queue.put(event)
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        failed: List[AnswerEvent] = []   # Batch, dessen Transaktion gescheitert ist (wird wiederholt)
+        try:
+            while True:
+                try:
+                    # Mit gescheitertem Batch nicht ewig warten, sondern regelmäßig neu versuchen
+                    item = self._queue.get(timeout=self.flush_interval if failed else None)
+                except queue.Empty:
+                    item = None
+                taken = 0 if item is None else 1
+                stop = item is _STOP
+                batch: List[AnswerEvent] = failed
+                if item is not None and not stop:
+                    batch.append(item)
+
+                # Weitere Antworten einsammeln, bis Batch voll oder Intervall abgelaufen
+                deadline = time.monotonic() + self.flush_interval
+                while item is not None and not stop and len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    taken += 1
+                    if item is _STOP:
+                        stop = True
+                    else:
+                        batch.append(item)
+
+                failed = []
+                if batch:
+                    try:
+                        self._write_batch(conn, batch)
+                        self.error = None
+                    except sqlite3.Error as exc:
+                        # z.B. "database is locked", solange ein anderer Prozess schreibt
+                        if self.error is None:
+                            print(f"Lernstand {self.path} kann nicht geschrieben werden: {exc}", file=sys.stderr)
+                        self.error = exc
+                        failed = batch
+
+                # Immer quittieren, sonst hängt flush() für immer
+                for _ in range(taken):
+                    self._queue.task_done()
+
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[AnswerEvent]) -> None:
+        with conn:
+            conn.executemany(
+                _INSERT_ANSWER,
+                [(e.user, e.question_key, e.selected, int(e.correct), e.timestamp) for e in batch],
+            )
+            conn.executemany(
+                _UPSERT_STATS,
+                [{"user": e.user, "key": e.question_key, "correct": int(e.correct), "ts": e.timestamp} for e in batch],
+            )
+
+    def flush(self) -> None:
+        """
+        Wartet, bis alle bisher gemeldeten Antworten geschrieben sind.
+
+        Raises:
+            sqlite3.Error: Der letzte Schreibversuch ist gescheitert (Antworten
+                           bleiben im Schreib-Thread und werden erneut versucht)
+        """
+        self._queue.join()
+        if self.error is not None:
+            raise sqlite3.OperationalError(f"Lernstand {self.path} konnte nicht geschrieben werden") from self.error
+
+    def close(self) -> None:
+        """Schreibt ausstehende Antworten und beendet den Schreib-Thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+
+    def _query(self, sql: str, params: tuple) -> List[tuple]:
+        with self._read_lock:
+            if self._read_conn is None:
+                self._read_conn = self._connect()
+            return self._read_conn.execute(sql, params).fetchall()
+
+    def weakest_questions(self, user: str, limit: int = 20, min_attempts: int = 1) -> List[Tuple[str, int, int]]:
+        """
+        Fragen mit der niedrigsten Trefferquote.
+
+        Returns:
+            Liste von (question_key, Versuche, davon richtig)
+        """
+        return self._query(
+            """
+            SELECT question_key, attempts, correct FROM question_stats
+            WHERE user = ? AND attempts >= ?
+            ORDER BY CAST(correct AS REAL) / attempts, attempts DESC
+            LIMIT ?
+            """,
+            (user, min_attempts, limit),
+        )
+
+    def due_questions(self, user: str, now: Optional[float] = None, limit: int = 50) -> List[str]:
+        """Schlüssel der Fragen, die zur Wiederholung fällig sind (älteste zuerst)"""
+        now = time.time() if now is None else now
+        rows = self._query(
+            """
+            SELECT question_key FROM question_stats
+            WHERE user = ? AND due_ts <= ?
+            ORDER BY due_ts
+            LIMIT ?
+            """,
+            (user, now, limit),
+        )
+        return [row[0] for row in rows]
+
+    def history(self, user: str, keys: Sequence[str]) -> Tuple[List[int], List[int]]:
+        """
+        Versuche und falsche Antworten pro Frage, in der Reihenfolge von `keys`.
+        Unbekannte Fragen haben 0 Versuche.
+        """
+        rows = self._query(
+            "SELECT question_key, attempts, correct FROM question_stats WHERE user = ?",
+            (user,),
+        )
+        stats: Dict[str, Tuple[int, int]] = {key: (attempts, correct) for key, attempts, correct in rows}
+        attempts: List[int] = []
+        wrong: List[int] = []
+        for key in keys:
+            total, right = stats.get(key, (0, 0))
+            attempts.append(total)
+            wrong.append(total - right)
+        return attempts, wrong
+
+    def answer_count(self, user: str) -> int:
+        """Anzahl gespeicherter Antworten einer Person"""
+        return self._query("SELECT COUNT(*) FROM answers WHERE user = ?", (user,))[0][0]
+
+
+# Beim Umbenennen: Statistiken zweier alter Schlüssel, die auf dieselbe neue ID fallen, zusammenführen
+_MERGE_STATS = """
+INSERT INTO question_stats (user, question_key, attempts, correct, streak, last_ts, due_ts)
+SELECT user, :new, attempts, correct, streak, last_ts, due_ts FROM question_stats WHERE question_key = :old
+ON CONFLICT (user, question_key) DO UPDATE SET
+    attempts = attempts + excluded.attempts,
+    correct = correct + excluded.correct,
+    streak = max(streak, excluded.streak),
+    last_ts = max(last_ts, excluded.last_ts),
+    due_ts = min(due_ts, excluded.due_ts)
+"""
+
+
+def rename_question_keys(mapping: Dict[str, str], path: str = DEFAULT_DB_PATH) -> int:
+    """
+    Stellt gespeicherte Antworten und Statistiken auf neue Fragenschlüssel um
+    (eine Transaktion; nicht während ein Quiz in dieselbe Datei schreibt).
+
+    Args:
+        mapping: Alter Schlüssel -> neuer Schlüssel
+        path: Pfad zur SQLite-Datei
+
+    Returns:
+        Anzahl umgestellter Antworten
+    """
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(_SCHEMA)
+        renamed = 0
+        with conn:
+            for old, new in mapping.items():
+                if old == new:
+                    continue
+                conn.execute(_MERGE_STATS, {"old": old, "new": new})
+                conn.execute("DELETE FROM question_stats WHERE question_key = ?", (old,))
+                renamed += conn.execute("UPDATE answers SET question_key = ? WHERE question_key = ?",
+                                        (new, old)).rowcount
+        return renamed
+    finally:
+        conn.close()
@@ -6,16 +6,37 @@ Multiple-Choice-Quiz - Hauptprogramm
 Startet das Quiz mit Begrüßung und Themenauswahl
 """
 
+import argparse
+import getpass
 import os
+import sqlite3
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from quiz_engine import QuizEngine
+from quiz_engine import QuizEngine, question_key
+from irt import AbilityEstimate, AdaptiveScheduler, ItemCalibration, calibrated_count, load_calibration
+from scheduler import SpacedRepetitionScheduler, WeightedScheduler, make_scheduler
+from learning_store import LearningStore
+from profiling import add_trace_argument, enable_from_args
+from column_log import ColumnarEventLog
+from search_index import search_topics
+from topic_index import TopicIndex, TOPIC_SEPARATOR, get_topic_bank
+from session_snapshot import clear_snapshot, discount_answers, load_snapshot, restrict_to_pool, save_snapshot
 from questions.signalverarbeitung import get_questions as get_signal_questions
 from questions.computergrafik import get_questions as get_cg_questions
 
 
+# Einstufungstest: nur mit genug kalibrierten Fragen, Stufen nach Fähigkeit θ (Obergrenze, Name)
+MIN_PLACEMENT_QUESTIONS = 10
+PLACEMENT_LEVELS = (
+    (-1.0, "Grundlagen"),
+    (0.0, "Basis"),
+    (1.0, "Fortgeschritten"),
+    (float("inf"), "Sehr gut"),
+)
+
+
 def clear_screen():
     """Bildschirm leeren"""
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -94,7 +115,13 @@ def get_quiz_settings(total_questions: int) -> dict:
 
     if allow_repeats:
         question_limit = prompt_int("  Wie viele Fragen möchtest du üben?", max(20, total_questions), min_value=1)
-        cooldown = prompt_int("  Cooldown (Abstand bis Wiederholung möglich)", 3, min_value=0)
+        spaced_repetition = prompt_yes_no("  Spaced Repetition (falsche Fragen kommen früher wieder)?", False)
+        if spaced_repetition:
+            cooldown = 3
+            weighted = False
+        else:
+            weighted = prompt_yes_no("  Fragen mit vielen Fehlern häufiger stellen?", False)
+            cooldown = prompt_int("  Cooldown (Abstand bis Wiederholung möglich)", 3, min_value=0)
     else:
         while True:
             limit_raw = input("  Wie viele Fragen in dieser Runde? (ENTER/0 = alle): ").strip()
@@ -112,6 +139,8 @@ def get_quiz_settings(total_questions: int) -> dict:
             question_limit = parsed
             break
         cooldown = 3
+        spaced_repetition = False
+        weighted = False
 
     print()
     print("=" * 70)
@@ -123,6 +152,8 @@ def get_quiz_settings(total_questions: int) -> dict:
         "allow_repeats": allow_repeats,
         "question_limit": question_limit,
         "cooldown": cooldown,
+        "spaced_repetition": spaced_repetition,
+        "weighted": weighted,
     }
 
 
@@ -139,6 +170,7 @@ def show_topic_menu():
     print("  [2] Computergrafik")
     print()
     print("  [A] Alle Themen")
+    print("  [S] Suche in allen Themen (z.B. 'Nyquist')")
     print("  [Q] Beenden")
     print()
     print("=" * 70)
@@ -148,7 +180,7 @@ def show_topic_menu():
 
 
 def get_selected_topics():
-    """Ausgewählte Themen zurückgeben"""
+    """Ausgewählte Themen als (Name, Fragen, Themen-Index) zurückgeben"""
     topics = {
         '1': ('Signalverarbeitung', get_signal_questions),
         '2': ('Computergrafik', get_cg_questions),
@@ -161,10 +193,21 @@ def get_selected_topics():
         if choice == 'q':
             return None
 
+        if choice == 's':
+            query = input("  Suchbegriff: ").strip()
+            if not query:
+                continue
+            found = search_topics(query, topics.values())
+            if found:
+                return [(f"Suche: {query}", found, TopicIndex(found))]
+            print(f"\n  Keine Fragen zu '{query}' gefunden.")
+            input("  Drücke ENTER...")
+            continue
+
         if choice == 'a':
             selected = []
             for key, (name, func) in topics.items():
-                selected.append((name, func()))
+                selected.append((name, *get_topic_bank(name, func)))
             return selected
 
         selected = []
@@ -174,15 +217,52 @@ def get_selected_topics():
             if char in topics and char not in seen:
                 seen.add(char)
                 name, func = topics[char]
-                selected.append((name, func()))
+                selected.append((name, *get_topic_bank(name, func)))
 
         if selected:
             return selected
 
-        print("\n  Ungültige Auswahl! Bitte wähle 1, 2, A oder Q.")
+        print("\n  Ungültige Auswahl! Bitte wähle 1, 2, A, S oder Q.")
         input("  Drücke ENTER...")
 
 
+def select_subtopics(selected: list) -> list:
+    """Optional auf Unterthemen einschränken (über die beim Laden gebauten Themen-Indizes)"""
+    all_questions = [q for _, questions, _ in selected for q in questions]
+    counts = {}
+    for _, _, index in selected:
+        for path, count in index.all_subtopics():
+            counts[path] = counts.get(path, 0) + count
+    subtopics = sorted(counts.items())
+    if len(subtopics) < 2:
+        return all_questions
+
+    clear_screen()
+    print("=" * 70)
+    print("                    UNTERTHEMEN")
+    print("=" * 70)
+    print()
+    for number, (path, count) in enumerate(subtopics, start=1):
+        print(f"  [{number:>2}] {TOPIC_SEPARATOR.join(path)} ({count})")
+    print()
+    print("=" * 70)
+
+    while True:
+        raw = input("  Unterthemen wählen (z.B. '1 4', ENTER = alle): ").strip()
+        if not raw:
+            return all_questions
+        try:
+            numbers = {int(part) for part in raw.replace(",", " ").split()}
+        except ValueError:
+            print("  Bitte Nummern eingeben.")
+            continue
+        if not all(1 <= n <= len(subtopics) for n in numbers):
+            print(f"  Bitte Nummern zwischen 1 und {len(subtopics)} eingeben.")
+            continue
+        paths = [subtopics[n - 1][0] for n in numbers]
+        return [questions[doc_id] for _, questions, index in selected for doc_id in sorted(index.ids_for(paths))]
+
+
 def show_results(correct: int, total: int):
     """Ergebnisse anzeigen"""
     clear_screen()
@@ -212,10 +292,157 @@ def show_results(correct: int, total: int):
     print("=" * 70)
 
 
-def main():
-    """Hauptfunktion"""
-    show_greeting()
+def ask_placement_test(questions: list, calibration: ItemCalibration):
+    """Fragt, ob statt einer Runde ein adaptiver Einstufungstest laufen soll (None = normale Runde)"""
+    keys = [question_key(q) for q in questions]
+    available = calibrated_count(keys, calibration)
+    if available < MIN_PLACEMENT_QUESTIONS:
+        return None
 
+    clear_screen()
+    print("=" * 70)
+    print("                    EINSTUFUNGSTEST")
+    print("=" * 70)
+    print()
+    print(f"  {available} von {len(questions)} Fragen sind kalibriert.")
+    print("  Der Test wählt jede Frage passend zu deinen bisherigen Antworten")
+    print("  und endet, sobald deine Einstufung genau genug ist.")
+    print()
+    if not prompt_yes_no("  Einstufungstest statt einer normalen Runde starten?", False):
+        return None
+    max_questions = prompt_int("  Höchstens wie viele Fragen?", min(20, available), min_value=1)
+    return {"keys": keys, "max_questions": min(max_questions, available)}
+
+
+def show_placement_result(estimate: AbilityEstimate, correct: int, total: int):
+    """Ergebnis des Einstufungstests anzeigen"""
+    clear_screen()
+    print("=" * 70)
+    print("                    EINSTUFUNG")
+    print("=" * 70)
+    print()
+    if estimate.responses == 0:
+        print("  Keine Antworten, keine Einstufung möglich.")
+        print()
+        print("=" * 70)
+        return
+
+    level = next(name for limit, name in PLACEMENT_LEVELS if estimate.theta < limit)
+    print(f"  Einstufung: {level}")
+    print(f"  Fähigkeit: {estimate.theta:+.2f} (± {estimate.se:.2f})")
+    print(f"  Besser als etwa {estimate.percentile:.0%} der bisherigen Lernenden")
+    print(f"  Richtige Antworten: {correct} von {total}")
+    print()
+    print("=" * 70)
+
+
+def run_placement_test(questions: list, settings: dict, calibration: ItemCalibration, listeners: list, user: str):
+    """Adaptiver Einstufungstest über die Engine (der Scheduler wählt die informativste Frage)"""
+    scheduler = AdaptiveScheduler(settings["keys"], calibration, randomesque=3)
+    engine = QuizEngine(questions, cooldown=0, scheduler=scheduler, user=user)
+    for listener in listeners:
+        engine.add_answer_listener(listener)
+    correct, total = engine.run(
+        question_limit=settings["max_questions"],
+        allow_repeats=True,
+        shuffle_questions=True,
+        shuffle_answers=True,
+    )
+    show_placement_result(scheduler.estimate, correct, total)
+
+
+def open_learning_store():
+    """Öffnet den Lernstand-Speicher (None, falls nicht möglich)"""
+    try:
+        return LearningStore()
+    except (sqlite3.Error, OSError) as exc:
+        print(f"\n  Lernstand kann nicht gespeichert werden: {exc}")
+        return None
+
+
+def open_event_log():
+    """Öffnet das Antwort-Log (None, falls nicht möglich)"""
+    try:
+        return ColumnarEventLog()
+    except (OSError, ValueError) as exc:
+        print(f"\n  Antwort-Log kann nicht geschrieben werden: {exc}")
+        return None
+
+
+def build_scheduler(settings: dict, questions: list, store, user: str):
+    """Erstellt die Wiederholungsstrategie passend zu den Einstellungen"""
+    if settings["spaced_repetition"]:
+        kind = SpacedRepetitionScheduler.kind
+    elif settings["weighted"]:
+        kind = WeightedScheduler.kind
+    else:
+        return None
+    return scheduler_for_kind(kind, settings["cooldown"], questions, store, user)
+
+
+def scheduler_for_kind(kind: str, cooldown: int, questions: list, store, user: str, resume=None):
+    """Scheduler nach Art, gewichtete Auswahl mit dem Verlauf aus dem Lernstand"""
+    attempts = wrong = None
+    if kind == WeightedScheduler.kind and store is not None:
+        try:
+            store.flush()  # Antworten der letzten Sekunden gehören zum Verlauf
+        except sqlite3.Error as exc:
+            print(f"\n  Lernstand ist nicht aktuell: {exc}")
+        keys = [question_key(q) for q in questions]
+        attempts, wrong = store.history(user, keys)
+        if resume is not None:
+            discount_answers(resume, keys, attempts, wrong)
+    return make_scheduler(kind, len(questions), cooldown, attempts=attempts, wrong=wrong)
+
+
+def offer_save_round(engine: QuizEngine):
+    """Bietet an, eine mit 'quit' unterbrochene Runde zu speichern"""
+    snapshot = engine.last_snapshot
+    if snapshot is None:
+        return
+    if prompt_yes_no(f"  Runde speichern ({snapshot.position}/{snapshot.total}) und später fortsetzen?", True):
+        try:
+            save_snapshot(snapshot)
+        except OSError as exc:
+            print(f"\n  Runde konnte nicht gespeichert werden: {exc}")
+
+
+def resume_saved_round(listeners: list, user: str, store=None):
+    """Setzt eine gespeicherte Runde fort, falls vorhanden und gewünscht"""
+    from questions import TOPICS
+
+    snapshot = load_snapshot()
+    if snapshot is None:
+        return
+    print(f"\n  Gespeicherte Runde gefunden: {', '.join(snapshot.topics)} "
+          f"(Frage {snapshot.position + 1} von {snapshot.total})")
+    if not prompt_yes_no("  Fortsetzen?", True):
+        if prompt_yes_no("  Gespeicherte Runde verwerfen?", False):
+            clear_snapshot()
+        return
+
+    # Suchrunden haben keinen Modulnamen: dann alle Themen laden, die Fragen werden per Schlüssel gefunden
+    names = [name for name in snapshot.topics if name in TOPICS] or list(TOPICS)
+    questions = [q for name in names for q in TOPICS[name]()]
+    # Auf den Pool der Runde (Suche/Unterthemen) einschränken, sonst zieht der Scheduler aus allen Fragen
+    questions = restrict_to_pool(questions, snapshot, [question_key(q) for q in questions])
+
+    # Gleiche Wiederholungsstrategie wie vor dem Speichern (Verlauf wird beim Fortsetzen nachgespielt)
+    scheduler = scheduler_for_kind(snapshot.scheduler, snapshot.cooldown, questions, store, user,
+                                   resume=snapshot)
+    engine = QuizEngine(questions, cooldown=snapshot.cooldown, scheduler=scheduler, user=user)
+    for listener in listeners:
+        engine.add_answer_listener(listener)
+    correct, total = engine.run(resume=snapshot)
+    clear_snapshot()
+    offer_save_round(engine)
+    show_results(correct, total)
+    input("\n  Drücke ENTER...")
+
+
+def run_rounds(listeners: list, user: str, store=None):
+    """Spielt Runden, bis der Nutzer beendet"""
+    calibration = load_calibration()
     while True:
         selected_topics = get_selected_topics()
 
@@ -223,27 +450,37 @@ def main():
             print("\n  Auf Wiedersehen!")
             break
 
-        all_questions = []
-        topic_names = []
-
-        for name, questions in selected_topics:
-            topic_names.append(name)
-            all_questions.extend(questions)
+        topic_names = [name for name, _, _ in selected_topics]
+        all_questions = select_subtopics(selected_topics)
 
         if not all_questions:
             print("\n  Keine Fragen verfügbar!")
             input("  Drücke ENTER...")
             continue
 
+        placement = ask_placement_test(all_questions, calibration) if calibration is not None else None
+        if placement is not None:
+            run_placement_test(all_questions, placement, calibration, listeners, user)
+            again = input("\n  Noch eine Runde? (j/n): ").strip().lower()
+            if again != 'j':
+                print("\n  Auf Wiedersehen!")
+                break
+            continue
+
         settings = get_quiz_settings(len(all_questions))
 
-        engine = QuizEngine(all_questions, cooldown=settings["cooldown"])
+        scheduler = build_scheduler(settings, all_questions, store, user)
+        engine = QuizEngine(all_questions, cooldown=settings["cooldown"], scheduler=scheduler, user=user)
+        for listener in listeners:
+            engine.add_answer_listener(listener)
         correct, total = engine.run(
             question_limit=settings["question_limit"],
             allow_repeats=settings["allow_repeats"],
             shuffle_questions=settings["shuffle_questions"],
             shuffle_answers=settings["shuffle_answers"],
+            topics=topic_names,
         )
+        offer_save_round(engine)
 
         show_results(correct, total)
 
@@ -253,5 +490,27 @@ def main():
             break
 
 
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Lern-Quiz (Konsole)")
+    add_trace_argument(parser)
+    args = parser.parse_args()
+    trace_path = enable_from_args(args)
+
+    show_greeting()
+    if trace_path:
+        print(f"  Trace: {trace_path}")
+    store = open_learning_store()
+    sinks = [sink for sink in (store, open_event_log()) if sink is not None]
+    user = getpass.getuser()
+
+    try:
+        resume_saved_round([sink.record for sink in sinks], user, store)
+        run_rounds([sink.record for sink in sinks], user, store)
+    finally:
+        for sink in sinks:
+            sink.close()
+
+
 if __name__ == "__main__":
     main()
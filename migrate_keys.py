@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fragen-IDs umstellen
+Die Fragen-ID (question_key) wird inzwischen aus dem Inhalt der Frage
+berechnet statt aus Thema und Prompt. Ältere Lernstände, Antwort-Logs,
+Runden-Speicherstände und IRT-Kalibrierungen verwenden noch die alten
+Schlüssel; dieses Skript rechnet sie über die aktuellen Banken um.
+
+Alte Schlüssel, die zu mehreren Fragen gehören (gleiches Thema, gleicher
+Prompt, aber verschiedene Antworten), lassen sich nicht eindeutig zuordnen.
+Sie bleiben stehen und werden keiner Frage mehr zugerechnet.
+
+Das Quiz sollte dabei nicht laufen (Lernstand und Log werden neu geschrieben).
+Ein zweiter Lauf ändert nichts mehr.
+
+Aufruf:
+    python migrate_keys.py --dry-run
+    python migrate_keys.py
+    python migrate_keys.py --module bank.py --db learning.db --log answers.qcol
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+from dataclasses import replace
+from typing import Dict, Iterable, Mapping, Sequence, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from column_log import DEFAULT_COLUMN_LOG_PATH, convert, is_column_log, read_column_events
+from event_log import DEFAULT_LOG_PATH, read_events, rewrite_events
+from irt import DEFAULT_IRT_PATH, load_calibration, save_calibration
+from learning_store import DEFAULT_DB_PATH, rename_question_keys
+from quiz_engine import AnswerEvent, Question, legacy_question_key, question_key
+from session_snapshot import DEFAULT_SNAPSHOT_PATH, load_snapshot, save_snapshot
+
+
+def key_mapping(banks: Mapping[str, Sequence[Question]]) -> Tuple[Dict[str, str], Set[str]]:
+    """
+    Alte Schlüssel -> neue Fragen-IDs.
+
+    Returns:
+        (eindeutige Zuordnungen, alte Schlüssel mit mehreren Fragen)
+    """
+    targets: Dict[str, Set[str]] = {}
+    for questions in banks.values():
+        for q in questions:
+            targets.setdefault(legacy_question_key(q), set()).add(question_key(q))
+    mapping = {old: next(iter(new)) for old, new in targets.items() if len(new) == 1}
+    ambiguous = {old for old, new in targets.items() if len(new) > 1}
+    return mapping, ambiguous
+
+
+def _renamed(events: Iterable[AnswerEvent], mapping: Mapping[str, str], counts: Counter) -> Iterable[AnswerEvent]:
+    for event in events:
+        new = mapping.get(event.question_key)
+        if new is not None and new != event.question_key:
+            counts["renamed"] += 1
+            event = replace(event, question_key=new)
+        counts["events"] += 1
+        yield event
+
+
+def migrate_event_log(path: str, mapping: Mapping[str, str], dry_run: bool = False) -> Counter:
+    """Stellt ein Antwort-Log (Spalten- oder Zeilen-Log) um. Returns: Zähler events/renamed"""
+    counts: Counter = Counter()
+    column_log = is_column_log(path)
+    events = _renamed(read_column_events(path) if column_log else read_events(path), mapping, counts)
+    if dry_run:
+        for _ in events:
+            pass
+    elif column_log:
+        convert(events, path)
+    else:
+        rewrite_events(events, path)
+    return counts
+
+
+def count_store_answers(path: str, mapping: Mapping[str, str]) -> int:
+    """Antworten im Lernstand, die umgestellt würden (für --dry-run)"""
+    import sqlite3
+
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute("SELECT question_key, COUNT(*) FROM answers GROUP BY question_key").fetchall()
+    except sqlite3.Error:
+        return 0
+    finally:
+        conn.close()
+    return sum(count for key, count in rows if mapping.get(key, key) != key)
+
+
+def main():
+    """Hauptfunktion"""
+    from questions import TOPICS, load_topic_module
+
+    parser = argparse.ArgumentParser(description="Gespeicherte Daten auf inhaltsbasierte Fragen-IDs umstellen")
+    parser.add_argument("--module", action="append", default=[],
+                        help="Zusätzliches Themenmodul (.py), mehrfach möglich")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Lernstand (SQLite)")
+    parser.add_argument("--log", action="append", default=None,
+                        help=f"Antwort-Log, mehrfach möglich (Standard: {DEFAULT_COLUMN_LOG_PATH} und {DEFAULT_LOG_PATH})")
+    parser.add_argument("--snapshot", default=DEFAULT_SNAPSHOT_PATH, help="Runden-Speicherstand")
+    parser.add_argument("--irt", default=DEFAULT_IRT_PATH, help="IRT-Kalibrierung")
+    parser.add_argument("--dry-run", action="store_true", help="Nur zählen, nichts schreiben")
+    args = parser.parse_args()
+
+    banks: Dict[str, Sequence[Question]] = {name: loader() for name, loader in TOPICS.items()}
+    for path in args.module:
+        banks[path] = load_topic_module(path)
+    mapping, ambiguous = key_mapping(banks)
+    print(f"  {len(mapping)} Fragen zugeordnet, {len(ambiguous)} alte Schlüssel mehrdeutig (bleiben stehen)")
+    action = "würden umgestellt" if args.dry_run else "umgestellt"
+
+    if os.path.exists(args.db):
+        renamed = count_store_answers(args.db, mapping) if args.dry_run else rename_question_keys(mapping, args.db)
+        print(f"  Lernstand {args.db}: {renamed} Antworten {action}")
+
+    for path in args.log or [DEFAULT_COLUMN_LOG_PATH, DEFAULT_LOG_PATH]:
+        if os.path.exists(path):
+            counts = migrate_event_log(path, mapping, args.dry_run)
+            print(f"  Antwort-Log {path}: {counts['renamed']} von {counts['events']} Antworten {action}")
+
+    snapshot = load_snapshot(args.snapshot)
+    if snapshot is not None:
+        keys = [mapping.get(key, key) for key in snapshot.keys]
+        pool = [mapping.get(key, key) for key in snapshot.pool]
+        renamed = sum(1 for old, new in zip(snapshot.keys, keys) if old != new)
+        if not args.dry_run and (renamed or pool != snapshot.pool):
+            snapshot.keys = keys
+            snapshot.pool = pool
+            save_snapshot(snapshot, args.snapshot)
+        print(f"  Speicherstand {args.snapshot}: {renamed} von {len(keys)} Fragen {action}")
+
+    calibration = load_calibration(args.irt)
+    if calibration is not None:
+        keys = [mapping.get(key, key) for key in calibration.keys]
+        renamed = sum(1 for old, new in zip(calibration.keys, keys) if old != new)
+        if not args.dry_run and renamed:
+            calibration.keys = keys
+            save_calibration(calibration, args.irt)
+        print(f"  IRT-Kalibrierung {args.irt}: {renamed} von {len(keys)} Fragen {action}")
+
+
+if __name__ == "__main__":
+    main()
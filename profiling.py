@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Profiling-Hooks
+Optionale Messpunkte um die heißen Pfade (Fragen vorbereiten, Antworten
+auswerten, Banken laden, GUI-Bildschirme aufbauen). Die Messungen landen
+als Trace-Events in einer lokalen Datei, die sich in chrome://tracing
+oder https://ui.perfetto.dev öffnen lässt.
+
+Einschalten:
+    LERN_QUIZ_TRACE=1 python main.py             (Datei ~/.lern_quiz/trace-<pid>.json)
+    LERN_QUIZ_TRACE=/tmp/quiz.json python gui.py
+    python main.py --trace [DATEI]
+
+Ausgeschaltet kostet ein Messpunkt nichts: @traced gibt die Funktion
+unverändert zurück. Wird erst später (per --trace) eingeschaltet, ersetzt
+enable() die registrierten Funktionen in den Modulen dieses Projekts, wo sie
+referenziert werden (Modul-Attribute, Klassen, Dicts wie questions.TOPICS).
+
+Die Datei ist im JSON-Array-Format und wird blockweise angehängt; die
+schließende Klammer ist für Trace-Viewer optional, eine abgebrochene
+Sitzung bleibt also lesbar.
+"""
+
+import atexit
+import functools
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+import types
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+ENV_VAR = "LERN_QUIZ_TRACE"
+DEFAULT_TRACE_DIR = os.path.join(os.path.expanduser("~"), ".lern_quiz")
+FLUSH_EVENTS = 10000
+# Nur Module unterhalb dieses Verzeichnisses werden beim Einschalten umgebogen
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Tracer:
+    """Sammelt Zeitspannen und Zähler und schreibt sie als Trace-Events"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pid = os.getpid()
+        self.calls: Dict[str, int] = {}
+        self._events: List[tuple] = []
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+        self._epoch_us = time.time() * 1e6
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write("[\n")
+        self._write([{"ph": "M", "name": "process_name", "pid": self.pid, "tid": 0,
+                      "args": {"name": f"lern-quiz {os.path.basename(sys.argv[0])}"}}])
+
+    def span(self, name: str, category: str, start_ns: int, end_ns: int) -> None:
+        # Im heißen Pfad nur ein Tupel anhängen (list.append ist unter dem GIL atomar)
+        self._events.append((name, category, start_ns, end_ns, threading.get_ident()))
+        if len(self._events) >= FLUSH_EVENTS:
+            self.flush()
+
+    def counter(self, name: str, **values: float) -> None:
+        """Zähler-Event (im Viewer als Verlauf dargestellt)"""
+        self._events.append((name, None, time.perf_counter_ns(), values, 0))
+
+    def _to_us(self, ns: int) -> float:
+        return self._epoch_us + (ns - self._origin_ns) / 1000.0
+
+    def flush(self) -> None:
+        with self._lock:
+            events, self._events = self._events, []
+            if self._file.closed:
+                return
+            records = []
+            for name, category, start_ns, end, tid in events:
+                if category is None:
+                    records.append({"ph": "C", "name": name, "pid": self.pid, "tid": tid,
+                                    "ts": self._to_us(start_ns), "args": end})
+                    continue
+                self.calls[name] = self.calls.get(name, 0) + 1
+                records.append({"ph": "X", "name": name, "cat": category, "pid": self.pid, "tid": tid,
+                                "ts": self._to_us(start_ns), "dur": (end - start_ns) / 1000.0})
+            if records:
+                # Aufrufe pro Messpunkt als Zähler, damit Häufigkeiten ohne Auszählen sichtbar sind
+                records.append({"ph": "C", "name": "calls", "pid": self.pid, "tid": 0,
+                                "ts": self._to_us(time.perf_counter_ns()), "args": dict(self.calls)})
+            self._write(records)
+
+    def _write(self, records: List[dict]) -> None:
+        self._file.write("".join(json.dumps(r, separators=(",", ":"), ensure_ascii=False) + ",\n"
+                                 for r in records))
+        self._file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            if not self._file.closed:
+                # Letzter Eintrag ohne Komma: die Datei ist danach gültiges JSON
+                end = {"ph": "M", "name": "process_labels", "pid": self.pid, "tid": 0, "args": {"labels": "beendet"}}
+                self._file.write(json.dumps(end) + "]\n")
+                self._file.close()
+
+
+_tracer: Optional[Tracer] = None
+# Registrierte Messpunkte: (Originalfunktion, Name, Kategorie)
+_hooks: List[Tuple[Callable, str, str]] = []
+_wrappers: Dict[Callable, Callable] = {}
+
+
+class _Traced:
+    """
+    Messpunkt um eine Funktion. Eine Klasse statt einer Closure, damit sich
+    ummantelte Funktionen weiter picklen lassen (z.B. die Loader aus
+    questions.TOPICS für den Prozess-Pool in bank_validator.py): gepickelt
+    wird nur Modul und Name der Originalfunktion.
+    """
+
+    def __init__(self, func: Callable, name: str, category: str):
+        functools.update_wrapper(self, func)
+        self._func = func
+        self._name = name
+        self._category = category
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return self._func(*args, **kwargs)
+        finally:
+            tracer = _tracer
+            if tracer is not None:
+                tracer.span(self._name, self._category, start, time.perf_counter_ns())
+
+    def __get__(self, instance, owner=None):
+        # Als Methode an die Instanz binden wie eine normale Funktion
+        return self if instance is None else types.MethodType(self, instance)
+
+    def __reduce__(self):
+        return _resolve, (self._func.__module__, self._func.__qualname__)
+
+    def __repr__(self) -> str:
+        return f"<traced {self._name}>"
+
+
+def _resolve(module: str, qualname: str) -> Callable:
+    """Gegenstück zu _Traced.__reduce__: Funktion per Modul und Name, ummantelt falls Tracing an ist"""
+    func = importlib.import_module(module)
+    for part in qualname.split("."):
+        func = getattr(func, part)
+    return _wrappers.get(func, func)
+
+
+def _wrap(func: Callable, name: str, category: str) -> Callable:
+    return _Traced(func, name, category)
+
+
+def traced(name: Optional[str] = None, category: str = "engine") -> Callable[[Callable], Callable]:
+    """
+    Markiert eine Funktion oder Methode als Messpunkt.
+
+    Args:
+        name: Name im Trace (Standard: Modul und qualifizierter Name)
+        category: Kategorie im Trace (engine, bank, gui, ...)
+    """
+    def decorate(func: Callable) -> Callable:
+        module = func.__module__
+        if module == "__main__":
+            # Als Skript gestartet (python gui.py): Dateiname statt __main__
+            module = os.path.splitext(os.path.basename(sys.argv[0]))[0] or module
+        span_name = name or f"{module}.{func.__qualname__}"
+        _hooks.append((func, span_name, category))
+        if _tracer is None:
+            return func
+        wrapper = _wrappers[func] = _wrap(func, span_name, category)
+        return wrapper
+    return decorate
+
+
+def counter(name: str, **values: float) -> None:
+    """Schreibt einen Zähler-Event, falls Tracing an ist"""
+    if _tracer is not None:
+        _tracer.counter(name, **values)
+
+
+def is_enabled() -> bool:
+    return _tracer is not None
+
+
+def _project_modules() -> List[object]:
+    """Geladene Module aus diesem Projekt (ohne Standardbibliothek und installierte Pakete)"""
+    modules = []
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None)
+        if not path:
+            continue
+        path = os.path.abspath(path)
+        if path.startswith(PROJECT_DIR + os.sep) and "site-packages" not in path:
+            modules.append(module)
+    return modules
+
+
+def _rebind(replacements: Dict[int, Callable]) -> int:
+    """Ersetzt Referenzen auf Originalfunktionen in den geladenen Modulen dieses Projekts"""
+    replaced = 0
+    for module in _project_modules():
+        namespace = getattr(module, "__dict__", None)
+        if not isinstance(namespace, dict):
+            continue
+        for attr, value in list(namespace.items()):
+            if id(value) in replacements:
+                namespace[attr] = replacements[id(value)]
+                replaced += 1
+            elif isinstance(value, dict):
+                for key, item in list(value.items()):
+                    if id(item) in replacements:
+                        value[key] = replacements[id(item)]
+                        replaced += 1
+            elif isinstance(value, type) and value.__module__ == module.__name__:
+                for name, member in list(vars(value).items()):
+                    if id(member) in replacements:
+                        setattr(value, name, replacements[id(member)])
+                        replaced += 1
+    return replaced
+
+
+def default_trace_path() -> str:
+    return os.path.join(DEFAULT_TRACE_DIR, f"trace-{os.getpid()}.json")
+
+
+def enable(path: Optional[str] = None) -> str:
+    """
+    Schaltet Tracing ein und setzt die Umgebungsvariable, damit Kindprozesse
+    (z.B. Server-Worker) ebenfalls messen. Erneute Aufrufe ersetzen nur noch
+    Referenzen, die seit dem letzten Aufruf importiert wurden.
+
+    Returns:
+        Pfad der Trace-Datei
+    """
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(path or default_trace_path())
+        atexit.register(_tracer.close)
+        # Kindprozesse schreiben in eigene Dateien (pid im Namen)
+        os.environ[ENV_VAR] = "1"
+
+    replacements = {}
+    for func, span_name, category in _hooks:
+        if func not in _wrappers:
+            _wrappers[func] = _wrap(func, span_name, category)
+        replacements[id(func)] = _wrappers[func]
+    _rebind(replacements)
+    return _tracer.path
+
+
+def disable() -> None:
+    """Schaltet Tracing aus und schreibt die Datei zu (Wrapper bleiben, messen aber nicht mehr)"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()
+        atexit.unregister(tracer.close)
+
+
+def add_trace_argument(parser) -> None:
+    """--trace [DATEI] für die argparse-CLIs"""
+    parser.add_argument("--trace", nargs="?", const="", default=None, metavar="DATEI",
+                        help=f"Messpunkte als Trace-Events schreiben (auch per {ENV_VAR}=1 oder =DATEI)")
+
+
+def enable_from_args(args) -> Optional[str]:
+    """
+    Schaltet Tracing ein, falls --trace angegeben wurde (oder per Umgebungsvariable
+    schon an ist, dann werden die Referenzen der inzwischen geladenen Module ersetzt).
+
+    Returns:
+        Pfad der Trace-Datei oder None
+    """
+    if getattr(args, "trace", None) is None and _tracer is None:
+        return None
+    return enable(getattr(args, "trace", None) or None)
+
+
+def _enable_from_env() -> None:
+    value = os.environ.get(ENV_VAR, "")
+    if value and value != "0":
+        enable(None if value == "1" else value)
+
+
+# Per Umgebungsvariable schon beim Import: die Messpunkte werden dann direkt
+# beim Definieren ummantelt
+_enable_from_env()
@@ -6,10 +6,41 @@ Questions Package
 Enthält alle Fragen für verschiedene Themen
 """
 
+import importlib.util
+import os
+
+from profiling import traced
+
 from .signalverarbeitung import get_questions as get_signal_questions
 from .computergrafik import get_questions as get_cg_questions
 
+# Laden der Banken als Messpunkt (siehe profiling.py)
+get_signal_questions = traced("bank.Signalverarbeitung", "bank")(get_signal_questions)
+get_cg_questions = traced("bank.Computergrafik", "bank")(get_cg_questions)
+
+# Alle Themenmodule: Anzeigename -> Loader
+TOPICS = {
+    'Signalverarbeitung': get_signal_questions,
+    'Computergrafik': get_cg_questions,
+}
+
+
+
+@traced("bank.load_topic_module", "bank")
+def load_topic_module(path: str):
+    """Lädt get_questions() aus einer Themenmodul-Datei (z.B. aus bank_generator.py)"""
+    name = "_bank_" + os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Modul kann nicht geladen werden: {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.get_questions()
+
+
 __all__ = [
     'get_signal_questions',
     'get_cg_questions',
+    'TOPICS',
+    'load_topic_module',
 ]
@@ -6,12 +6,18 @@ Quiz-Engine
 Verwaltet die Quiz-Logik, Zufallsauswahl und Auswertung
 """
 
+import hashlib
 import os
 import random
 import re
-from dataclasses import dataclass
-from typing import Dict, Set, List, Tuple, Optional
-from collections import deque
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, Set, List, Sequence, Tuple, Optional
+
+from profiling import traced
+from scheduler import CooldownScheduler, QuestionScheduler
+from session_snapshot import CORRECT_BIT, RoundSnapshot, encode_selection, resolve_keys
 
 
 @dataclass
@@ -23,6 +29,22 @@ class Question:
     explain_correct: str                 # Erklärung, warum die Lösung richtig ist
     explain_wrong: Dict[str, str]        # Erklärung, warum die falschen Antworten falsch sind
     topic: str = ""                      # Optionales Thema der Frage
+    # Angezeigter Schlüssel -> Originalschlüssel (von prepare_question gesetzt)
+    source_keys: Dict[str, str] = field(default_factory=dict, compare=False, repr=False)
+    # Zwischengespeicherte Fragen-ID (siehe question_key), leer = noch nicht berechnet;
+    # Fragen werden nach dem Laden nicht mehr verändert, die ID bleibt also gültig
+    qid: str = field(default="", compare=False, repr=False)
+
+
+@dataclass
+class AnswerEvent:
+    """Eine beantwortete Frage (für Persistenz und Auswertung)"""
+    user: str                            # Lernende Person
+    question_key: str                    # Schlüssel der Frage (siehe question_key)
+    selected: str                        # Gewählte Originalschlüssel, z.B. "A,C"
+    correct: bool                        # Antwort exakt richtig?
+    timestamp: float                     # Unix-Zeit der Antwort
+    latency_ms: float = 0.0              # Zeit von der Anzeige bis zur Antwort (0 = nicht gemessen)
 
 
 _MULTI_CHOICE_HINT_RE = re.compile(
@@ -36,6 +58,56 @@ def sanitize_prompt(prompt: str) -> str:
     return _MULTI_CHOICE_HINT_RE.sub("", prompt).strip()
 
 
+def _canonical_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def question_key(question: Question) -> str:
+    """
+    Stabile Fragen-ID aus dem Inhalt (16 Hex-Zeichen).
+
+    Grundlage ist die kanonische Form: bereinigter Prompt und die sortierten
+    Optionstexte, jeweils mit Markierung, ob sie richtig sind. Buchstaben,
+    Reihenfolge der Optionen, Leerraum, Thema und Erklärungen zählen nicht.
+    Die ID ist daher gleich für Original, umgelabelte Fassung (z.B. nach
+    _rebalance_single_choice_correct_letters) und gemischte Variante, bleibt
+    über Programmläufe gleich und ändert sich nur, wenn sich Frage oder
+    Antworten inhaltlich ändern.
+
+    Die ID wird an der Frage zwischengespeichert (Question.qid).
+    """
+    qid = question.qid
+    if not qid:
+        options = sorted(
+            ("+" if key in question.correct else "-") + _canonical_text(text)
+            for key, text in question.options.items()
+        )
+        raw = "\x1e".join([_canonical_text(sanitize_prompt(question.prompt))] + options)
+        qid = question.qid = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+    return qid
+
+
+def legacy_question_key(question: Question) -> str:
+    """Früherer Schlüssel aus Thema und Prompt (nur noch zum Umstellen alter Daten, siehe migrate_keys.py)"""
+    raw = f"{question.topic}\n{sanitize_prompt(question.prompt)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def make_answer_event(question: Question, user_set: Set[str], is_correct: bool, user: str,
+                      latency_ms: float = 0.0) -> AnswerEvent:
+    """Erstellt ein AnswerEvent, Auswahl wird auf die Originalschlüssel zurückgeführt."""
+    selected = sorted(question.source_keys.get(k, k) for k in user_set)
+    return AnswerEvent(
+        user=user,
+        question_key=question_key(question),
+        selected=",".join(selected),
+        correct=is_correct,
+        timestamp=time.time(),
+        latency_ms=latency_ms,
+    )
+
+
+@lru_cache(maxsize=1024)
 def _index_to_letters(index: int) -> str:
     """0 -> A, 1 -> B, ..., 25 -> Z, 26 -> AA, ..."""
     index += 1
@@ -46,6 +118,7 @@ def _index_to_letters(index: int) -> str:
     return "".join(reversed(letters))
 
 
+@traced()
 def prepare_question(
     question: Question,
     rng: Optional[random.Random] = None,
@@ -64,6 +137,8 @@ def prepare_question(
             explain_correct=question.explain_correct,
             explain_wrong=question.explain_wrong.copy(),
             topic=question.topic,
+            source_keys={k: k for k in question.options},
+            qid=question_key(question),
         )
 
     rng = rng or random
@@ -77,6 +152,7 @@ def prepare_question(
             explain_correct=question.explain_correct,
             explain_wrong={},
             topic=question.topic,
+            qid=question_key(question),
         )
 
     rng.shuffle(option_items)
@@ -99,9 +175,94 @@ def prepare_question(
         explain_correct=question.explain_correct,
         explain_wrong=new_explain_wrong,
         topic=question.topic,
+        source_keys={new: old for old, new in key_map.items()},
+        qid=question_key(question),
     )
 
 
+@traced()
+def select_round_questions(
+    questions: List[Question],
+    question_limit: int,
+    allow_repeats: bool = False,
+    shuffle_questions: bool = True,
+    cooldown: int = 3,
+    rng: Optional[random.Random] = None,
+    scheduler: Optional[QuestionScheduler] = None,
+) -> List[Question]:
+    """
+    Stellt die Fragen einer Runde zusammen (ohne Anzeige-Vorbereitung).
+
+    Args:
+        questions: Alle verfügbaren Fragen
+        question_limit: Anzahl der Fragen in der Runde
+        allow_repeats: Wenn True, können Fragen wiederholt werden (mit Cooldown)
+        shuffle_questions: Wenn True, werden Fragen zufällig gewählt/gemischt
+        cooldown: Abstand, bevor eine Frage wiederholt werden darf
+        rng: Optionaler Zufallsgenerator
+        scheduler: Optionale Auswahlstrategie für Wiederholungen
+                   (Standard: CooldownScheduler)
+
+    Returns:
+        Liste der ausgewählten Original-Fragen
+    """
+    rng = rng or random
+    total_available = len(questions)
+    if total_available == 0 or question_limit <= 0:
+        return []
+
+    if not allow_repeats:
+        selected = questions.copy()
+        if shuffle_questions:
+            rng.shuffle(selected)
+        return selected[:question_limit]
+
+    if not shuffle_questions:
+        return [questions[i % total_available] for i in range(question_limit)]
+
+    scheduler = scheduler or CooldownScheduler(total_available, cooldown, rng=rng)
+    return [questions[scheduler.next_index()] for _ in range(question_limit)]
+
+
+@traced()
+def normalize_answer(raw: str) -> Set[str]:
+    """
+    Eingabe des Users normalisieren
+    (z.B. "b d", "BD", "b,d" → {"B", "D"})
+    """
+    raw = raw.strip().lower()
+
+    # Trennzeichen vereinheitlichen
+    for sep in [',', ';', '|', '/']:
+        raw = raw.replace(sep, ' ')
+
+    parts = raw.split()
+
+    # Falls z.B. "bd" eingegeben wurde
+    if len(parts) == 1:
+        letters = [ch for ch in parts[0] if ch.isalpha()]
+    else:
+        letters = []
+        for p in parts:
+            letters.extend([ch for ch in p if ch.isalpha()])
+
+    return {ch.upper() for ch in letters}
+
+
+@traced()
+def check_answer(q: Question, user_set: Set[str]) -> Tuple[bool, Set[str]]:
+    """
+    Bewertet eine Auswahl wie QuizEngine.evaluate, ohne Ausgabe.
+
+    Returns:
+        (exakt richtig?, ungültige Schlüssel) - bei ungültigen Schlüsseln ist die Antwort falsch
+    """
+    invalid = user_set - q.options.keys()
+    if invalid:
+        return False, invalid
+    return user_set == q.correct, invalid
+
+
 def format_selected_options(q: Question, keys: Set[str]) -> str:
     """Formatiert eine Auswahl als 'A) Text' Zeilen."""
     if not keys:
@@ -118,9 +279,23 @@ def format_selected_options(q: Question, keys: Set[str]) -> str:
 
 
 class QuizEngine:
-    """Verwaltet das Quiz mit zufälliger Fragenauswahl"""
+    """
+    Verwaltet das Quiz mit zufälliger Fragenauswahl.
+
+    Eine Engine ist eine Sitzung: Zähler, Scheduler und Zufallsgenerator gehören
+    nur ihr. Mehrere Engines können daher in verschiedenen Threads laufen und
+    sich dieselbe (unveränderte) Fragenliste teilen. Eine einzelne Engine ist
+    nicht für gleichzeitige Aufrufe aus mehreren Threads gedacht.
+    """
 
-    def __init__(self, questions: List[Question], cooldown: int = 3):
+    def __init__(
+        self,
+        questions: List[Question],
+        cooldown: int = 3,
+        scheduler: Optional[QuestionScheduler] = None,
+        user: str = "default",
+        rng: Optional[random.Random] = None,
+    ):
         """
         Initialisiert die Quiz-Engine.
 
@@ -128,58 +303,79 @@ class QuizEngine:
             questions: Liste aller Fragen
             cooldown: Wie viele andere Fragen gestellt werden müssen,
                       bevor eine Frage wiederholt werden kann
+            scheduler: Wiederholungsstrategie für den Trainingsmodus
+                       (Standard: CooldownScheduler mit `cooldown`)
+            user: Name der lernenden Person (für gespeicherte Antworten)
+            rng: Zufallsgenerator der Sitzung (Standard: eigener random.Random);
+                 ein übergebener Scheduler nutzt weiter seinen eigenen
         """
         self.all_questions = questions.copy()
         self.cooldown = min(cooldown, len(questions) - 1) if len(questions) > 1 else 0
-        self.recently_asked: deque = deque(maxlen=self.cooldown)
+        self.rng = rng or random.Random()
+        self.scheduler = scheduler or CooldownScheduler(len(self.all_questions), self.cooldown, rng=self.rng)
         self.correct_count = 0
         self.total_answered = 0
+        self.user = user
+        self.answer_listeners: List[Callable[[AnswerEvent], None]] = []
+        self.last_snapshot: Optional[RoundSnapshot] = None
+
+    def add_answer_listener(self, listener: Callable[[AnswerEvent], None]) -> None:
+        """Registriert einen Empfänger für beantwortete Fragen (z.B. LearningStore.record)"""
+        self.answer_listeners.append(listener)
+
+    def _emit_answer(self, q: Question, user_set: Set[str], is_correct: bool, latency_ms: float = 0.0) -> None:
+        """Meldet eine Antwort an alle Listener"""
+        if not self.answer_listeners:
+            return
+        event = make_answer_event(q, user_set, is_correct, self.user, latency_ms)
+        for listener in self.answer_listeners:
+            listener(event)
 
     def clear_screen(self):
         """Bildschirm leeren"""
         os.system('cls' if os.name == 'nt' else 'clear')
 
+    @traced()
     def get_available_questions(self) -> List[Question]:
-        """Gibt alle Fragen zurück, die nicht kürzlich gestellt wurden"""
-        if not self.recently_asked:
+        """Gibt alle Fragen zurück, die der Scheduler gerade nicht sperrt"""
+        blocked = self.scheduler.blocked()
+        if not blocked:
             return self.all_questions.copy()
 
-        return [q for q in self.all_questions if q not in self.recently_asked]
+        return [q for idx, q in enumerate(self.all_questions) if idx not in blocked]
 
     def get_next_question(self) -> Question:
-        """Wählt zufällig eine Frage aus (nicht kürzlich gestellt)"""
-        available = self.get_available_questions()
-
-        if not available:
-            # Falls alle Fragen im Cooldown sind, älteste freigeben
-            available = self.all_questions.copy()
+        """Wählt die nächste Frage über den Scheduler aus"""
+        return self.next_question()[1]
 
-        question = random.choice(available)
-        self.recently_asked.append(question)
-        return prepare_question(question)
+    def next_question(self, shuffle_answers: bool = True) -> Tuple[int, Question]:
+        """Nächste Frage über den Scheduler: (Index in all_questions, vorbereitete Frage)"""
+        index = self.scheduler.next_index()
+        prepared = prepare_question(self.all_questions[index], rng=self.rng, shuffle_answers=shuffle_answers)
+        return index, prepared
 
-    def normalize_answer(self, raw: str) -> Set[str]:
-        """
-        Eingabe des Users normalisieren
-        (z.B. "b d", "BD", "b,d" → {"B", "D"})
+    def submit_answer(self, prepared: Question, user_set: Set[str],
+                      index: Optional[int] = None, latency_ms: float = 0.0) -> Tuple[bool, str]:
         """
-        raw = raw.strip().lower()
-
-        # Trennzeichen vereinheitlichen
-        for sep in [',', ';', '|', '/']:
-            raw = raw.replace(sep, ' ')
+        Wertet eine Antwort aus und aktualisiert den Zustand der Sitzung
+        (Zähler, Listener und - falls `index` angegeben - den Scheduler).
+        `latency_ms` ist die Antwortzeit ab Anzeige der Frage (für das Antwort-Log).
 
-        parts = raw.split()
-
-        # Falls z.B. "bd" eingegeben wurde
-        if len(parts) == 1:
-            letters = [ch for ch in parts[0] if ch.isalpha()]
-        else:
-            letters = []
-            for p in parts:
-                letters.extend([ch for ch in p if ch.isalpha()])
+        Returns:
+            Tuple (richtig?, Erklärungstext)
+        """
+        is_correct, explanation = self.evaluate(prepared, user_set)
+        self._emit_answer(prepared, user_set, is_correct, latency_ms)
+        if index is not None:
+            self.scheduler.record(index, is_correct)
+        if is_correct:
+            self.correct_count += 1
+        self.total_answered += 1
+        return is_correct, explanation
 
-        return {ch.upper() for ch in letters}
+    def normalize_answer(self, raw: str) -> Set[str]:
+        """Eingabe des Users normalisieren (siehe normalize_answer)"""
+        return normalize_answer(raw)
 
     def format_set(self, s: Set[str]) -> str:
         """Hilfsfunktion zur Ausgabe von Antwortmengen"""
@@ -212,18 +408,15 @@ class QuizEngine:
         print("  Befehle: 'weiter' = ueberspringen, 'quit' = beenden")
         print()
 
+    @traced()
     def evaluate(self, q: Question, user_set: Set[str]) -> Tuple[bool, str]:
         """Antwort auswerten und erklären"""
         valid = set(q.options.keys())
 
-        # Ungültige Eingaben prüfen
-        invalid = user_set - valid
+        is_correct, invalid = check_answer(q, user_set)
         if invalid:
             return False, f"  Ungültige Auswahl: {self.format_set(invalid)}"
 
-        # Prüfen, ob die Antwort exakt stimmt
-        is_correct = user_set == q.correct
-
         lines: List[str] = []
         lines.append("")
         lines.append("")
@@ -279,6 +472,8 @@ class QuizEngine:
         allow_repeats: bool = False,
         shuffle_questions: bool = True,
         shuffle_answers: bool = True,
+        resume: Optional[RoundSnapshot] = None,
+        topics: Sequence[str] = (),
     ) -> Tuple[int, int]:
         """
         Quiz durchführen.
@@ -288,108 +483,141 @@ class QuizEngine:
             allow_repeats: Wenn True, können Fragen wiederholt werden (mit Cooldown).
             shuffle_questions: Wenn True, werden Fragen zufällig gewählt/gemischt.
             shuffle_answers: Wenn True, werden Antwortoptionen pro Frage gemischt.
+            resume: Gespeicherte Runde, die fortgesetzt wird (Einstellungen kommen dann aus dem Speicherstand;
+                    der Scheduler der Engine sollte zu `resume.scheduler` passen, siehe make_scheduler)
+            topics: Namen der Themenmodule (nur für den Speicherstand)
 
         Returns:
-            Tuple (richtige Antworten, Gesamtzahl beantworteter Fragen)
+            Tuple (richtige Antworten, Gesamtzahl beantworteter Fragen).
+            Wird die Runde mit 'quit' unterbrochen, steht ihr Zustand in `last_snapshot`.
         """
         self.correct_count = 0
         self.total_answered = 0
-        self.recently_asked.clear()
+        self.last_snapshot = None
+        self.scheduler.reset()
 
         total_available = len(self.all_questions)
         if total_available == 0:
             return 0, 0
 
-        if question_limit is None or question_limit <= 0:
-            question_limit = total_available
-
-        if not allow_repeats:
-            # Ohne Wiederholung (jede Frage max. 1x)
-            questions = self.all_questions.copy()
-            if shuffle_questions:
-                random.shuffle(questions)
-
-            questions = questions[: min(question_limit, len(questions))]
-            total = len(questions)
-            current = 0
-
-            for question in questions:
-                current += 1
-                prepared = prepare_question(question, shuffle_answers=shuffle_answers)
-                self.display_question(prepared, current, total)
-
-                user_input = input("  Deine Eingabe: ").strip().lower()
-
-                if user_input == "quit":
-                    print("\n  Quiz wird beendet...")
-                    break
-
-                if user_input == "weiter":
-                    print("\n  Frage übersprungen.")
-                    input("  Drücke ENTER...")
-                    continue
-
-                user_set = self.normalize_answer(user_input)
-
-                if not user_set:
-                    print("\n  Keine gültige Antwort eingegeben.")
-                    input("  Drücke ENTER...")
-                    continue
-
-                is_correct, explanation = self.evaluate(prepared, user_set)
-                print(explanation)
-
-                if is_correct:
-                    self.correct_count += 1
-
-                self.total_answered += 1
-
-                input("\n  Drücke ENTER für die nächste Frage...")
-
-            return self.correct_count, self.total_answered
-
-        # Mit Wiederholung (Training): Fragen können erneut kommen, aber nicht direkt (Cooldown)
-        total = question_limit
-
-        current = 0
-        while current < total:
-            current += 1
-
-            available = self.get_available_questions()
-            if not available:
-                available = self.all_questions.copy()
-
-            question = random.choice(available) if shuffle_questions else self.all_questions[(current - 1) % total_available]
-            self.recently_asked.append(question)
-
-            prepared = prepare_question(question, shuffle_answers=shuffle_answers)
-            self.display_question(prepared, current, total)
-
+        if resume is not None:
+            allow_repeats = resume.allow_repeats
+            shuffle_questions = resume.shuffle_questions
+            shuffle_answers = resume.shuffle_answers
+            topics = resume.topics
+            indices, keys, seeds, answers, total = self._restore_round(resume)
+        else:
+            if question_limit is None or question_limit <= 0:
+                question_limit = total_available
+
+            if allow_repeats:
+                # Training: Fragen werden erst beim Stellen gezogen (Scheduler mit Cooldown)
+                indices = []
+                total = question_limit
+            else:
+                # Ohne Wiederholung (jede Frage max. 1x)
+                indices = list(range(total_available))
+                if shuffle_questions:
+                    self.rng.shuffle(indices)
+                indices = indices[:question_limit]
+                total = len(indices)
+            keys = [question_key(self.all_questions[i]) for i in indices]
+            # Ein Startwert pro Frage: die Mischung ist damit aus dem Speicherstand reproduzierbar
+            seeds = [self.rng.getrandbits(32) for _ in indices]
+            answers = []
+
+        use_scheduler = allow_repeats and shuffle_questions
+
+        while len(answers) < total:
+            if use_scheduler and self.scheduler.finished():
+                break
+            position = len(answers)
+            if position >= len(indices):
+                indices.append(self.scheduler.next_index() if use_scheduler else position % total_available)
+                keys.append(question_key(self.all_questions[indices[-1]]))
+                seeds.append(self.rng.getrandbits(32))
+            index = indices[position]
+
+            prepared = prepare_question(
+                self.all_questions[index], rng=random.Random(seeds[position]), shuffle_answers=shuffle_answers
+            )
+            self.display_question(prepared, position + 1, total)
+
+            shown_at = time.monotonic()
             user_input = input("  Deine Eingabe: ").strip().lower()
+            latency_ms = (time.monotonic() - shown_at) * 1000.0
 
             if user_input == "quit":
+                self.last_snapshot = RoundSnapshot(
+                    topics=list(topics),
+                    keys=list(keys),
+                    seeds=seeds,
+                    answers=answers,
+                    total=total,
+                    allow_repeats=allow_repeats,
+                    shuffle_questions=shuffle_questions,
+                    shuffle_answers=shuffle_answers,
+                    cooldown=self.cooldown,
+                    scheduler=self.scheduler.kind,
+                    pool=[question_key(q) for q in self.all_questions],
+                    user=self.user,
+                )
                 print("\n  Quiz wird beendet...")
                 break
 
-            if user_input == "weiter":
-                print("\n  Frage übersprungen.")
-                input("  Drücke ENTER...")
-                continue
-
-            user_set = self.normalize_answer(user_input)
+            user_set = set() if user_input == "weiter" else self.normalize_answer(user_input)
 
             if not user_set:
-                print("\n  Keine gültige Antwort eingegeben.")
+                if use_scheduler:
+                    self.scheduler.record(index, None)
+                answers.append(0)
+                if user_input == "weiter":
+                    print("\n  Frage übersprungen.")
+                else:
+                    print("\n  Keine gültige Antwort eingegeben.")
                 input("  Drücke ENTER...")
                 continue
 
-            is_correct, explanation = self.evaluate(prepared, user_set)
+            is_correct, explanation = self.submit_answer(
+                prepared, user_set, index if use_scheduler else None, latency_ms
+            )
+            answers.append(encode_selection(prepared.source_keys, user_set, is_correct))
             print(explanation)
-
-            if is_correct:
-                self.correct_count += 1
-
-            self.total_answered += 1
             input("\n  Drücke ENTER für die nächste Frage...")
 
         return self.correct_count, self.total_answered
+
+    def _restore_round(self, snapshot: RoundSnapshot) -> Tuple[List[int], List[str], List[int], List[int], int]:
+        """
+        Stellt Zähler und Scheduler aus einem Speicherstand wieder her.
+        Offene Fragen, die es in der Bank nicht mehr gibt, fallen weg. Beantwortete
+        Plätze ohne Frage in der Bank behalten ihren Schlüssel (Index -1).
+
+        Returns:
+            (Indizes, Schlüssel, Startwerte, Antworten, geplante Fragenzahl)
+        """
+        positions = resolve_keys(snapshot.keys, [question_key(q) for q in self.all_questions])
+        answers = list(snapshot.answers)
+        replay_scheduler = snapshot.allow_repeats and snapshot.shuffle_questions
+
+        # Beantwortete Plätze: Zähler übernehmen, Scheduler-Verlauf nachspielen
+        for index, code in zip(positions, answers):
+            if code:
+                self.total_answered += 1
+                self.correct_count += bool(code & CORRECT_BIT)
+            if replay_scheduler and index is not None:
+                self.scheduler.replay(index, bool(code & CORRECT_BIT) if code else None)
+
+        indices = [index if index is not None else -1 for index in positions[:len(answers)]]
+        keys = list(snapshot.keys[:len(answers)])
+        seeds = list(snapshot.seeds[:len(answers)])
+        dropped = 0
+        open_slots = zip(positions[len(answers):], snapshot.keys[len(answers):], snapshot.seeds[len(answers):])
+        for index, key, seed in open_slots:
+            if index is None:
+                dropped += 1
+            else:
+                indices.append(index)
+                keys.append(key)
+                seeds.append(seed)
+        return indices, keys, seeds, answers, snapshot.total - dropped
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Quiz-Server
+Spielt das Quiz mit vielen Personen gleichzeitig (z.B. im Hörsaal) über TCP.
+
+Protokoll: eine JSON-Nachricht pro Zeile (UTF-8).
+
+    -> {"op": "topics"}
+    <- {"op": "topics", "topics": {"Signalverarbeitung": 148, ...}}
+    -> {"op": "start", "topic": "Signalverarbeitung", "count": 10, "user": "anna"}
+    <- {"op": "question", "number": 1, "total": 10, "prompt": "...", "options": {...}, "multi": false}
+    -> {"op": "answer", "answer": "b d"}
+    <- {"op": "result", "correct": true, "correct_keys": ["B"], "explain": "...", "explain_wrong": {...}}
+    <- {"op": "question", ...}  bzw. am Ende  {"op": "done", "score": 7, "total": 10}
+    -> {"op": "stats"}
+    <- {"op": "stats", "active_sessions": ..., "rss_mb": ...}
+
+Live-Modus (siehe classroom.py, nur mit einem Worker, da Räume im Prozess liegen):
+
+    Lehrperson  -> {"op": "host", "topic": "..."}     <- {"op": "hosted", "room": "KQZTA"}
+    Teilnehmer  -> {"op": "join", "room": "KQZTA", "user": "anna"}
+    Lehrperson  -> {"op": "push"}                     alle <- {"op": "question", "round": 1, ...}
+    Teilnehmer  -> {"op": "answer", "answer": "b"}    <- {"op": "accepted", "round": 1}
+    Lehrperson  <- {"op": "tally", "answers": ..., "option_counts": {...}, ...}   (laufend)
+    Lehrperson  -> {"op": "reveal"}                   alle <- {"op": "reveal", "correct_keys": [...], ...}
+    Lehrperson  -> {"op": "close"}
+
+Alle Sitzungen teilen sich die unveränderliche Fragenbank. Eine Sitzung speichert
+nur Reihenfolge (array), Position, Punktestand und einen Startwert: die gemischte
+Anzeige-Variante der aktuellen Frage wird bei Bedarf aus dem Startwert neu erzeugt.
+
+Mit --workers laufen mehrere Worker-Prozesse auf demselben Port (SO_REUSEPORT).
+Sie binden die Fragenbank als geteilte Bankdatei ein (siehe shared_bank.py),
+der Speicher für die Bank wächst daher nicht mit der Zahl der Worker.
+
+Aufruf:
+    python quiz_server.py --port 8765
+    python quiz_server.py --port 0 --synthetic 10000     (künstliche Bank, freier Port)
+    python quiz_server.py --workers 4 --bank-file ~/.lern_quiz/bank.qbk
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import signal
+import socket
+import sys
+import time
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from quiz_engine import (
+    AnswerEvent, Question, check_answer, make_answer_event, normalize_answer, prepare_question,
+)
+from classroom import Classroom, ClassroomHub
+from profiling import add_trace_argument, enable_from_args, traced
+from shared_bank import SharedBank, open_bank_file, write_bank_file
+
+
+MAX_LINE = 64 * 1024
+
+
+def current_rss_mb() -> float:
+    """Aktueller Speicher des Prozesses (Linux: /proc, sonst Spitzenwert)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_pss_mb(pid: str = "self") -> Optional[float]:
+    """
+    Proportionaler Speicher (geteilte Seiten anteilig), nur unter Linux.
+    Anders als RSS zählt die eingebundene Bankdatei nur einmal über alle Worker.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def raise_open_file_limit() -> int:
+    """Hebt das Limit offener Dateien (Sockets) auf das Maximum an"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+            return hard
+        except (ValueError, OSError):
+            pass
+    return soft
+
+
+class Session:
+    """Zustand einer Quiz-Sitzung (bewusst klein gehalten)"""
+
+    __slots__ = ("user", "bank", "order", "position", "score", "seed", "shown_at")
+
+    def __init__(self, user: str, bank: Sequence[Question], order: array, seed: int):
+        self.user = user
+        self.bank = bank                 # geteilte Fragenbank (nicht kopiert)
+        self.order = order               # Indizes der Fragen dieser Runde
+        self.position = 0
+        self.score = 0
+        self.seed = seed
+        self.shown_at = 0.0              # monotone Zeit, zu der die aktuelle Frage gesendet wurde
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.order)
+
+    def current(self) -> Question:
+        """Anzeige-Variante der aktuellen Frage (deterministisch aus dem Startwert)"""
+        rng = random.Random(self.seed * 1_000_003 + self.position)
+        return prepare_question(self.bank[self.order[self.position]], rng=rng)
+
+
+class QuizServer:
+    """Asyncio-Server für viele gleichzeitige Quiz-Sitzungen"""
+
+    def __init__(self, banks: Dict[str, Sequence[Question]],
+                 listeners: Iterable[Callable[[AnswerEvent], None]] = ()):
+        # Geteilte Bankdateien nicht in Listen kopieren
+        self.banks: Dict[str, Sequence[Question]] = {
+            name: questions if isinstance(questions, (tuple, SharedBank)) else tuple(questions)
+            for name, questions in banks.items()
+        }
+        self.listeners: List[Callable[[AnswerEvent], None]] = list(listeners)
+        self.active_sessions = 0
+        self.total_sessions = 0
+        self.total_answers = 0
+        self.classrooms = ClassroomHub(self.listeners)
+        self._seeds = random.Random()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765,
+                    reuse_port: bool = False) -> asyncio.AbstractServer:
+        """Startet den Server (Port 0 = freier Port)"""
+        return await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE, backlog=4096,
+                                          reuse_port=reuse_port or None)
+
+    def start_session(self, message: dict) -> Session:
+        topic = message.get("topic") or next(iter(self.banks))
+        bank = self.banks.get(topic)
+        if bank is None:
+            raise ValueError(f"Unbekanntes Thema: {topic}")
+        count = max(1, min(int(message.get("count", 10)), len(bank)))
+        seed = int(message["seed"]) if "seed" in message else self._seeds.getrandbits(32)
+        order = array("I", random.Random(seed).sample(range(len(bank)), count))
+        return Session(str(message.get("user", "anonym")), bank, order, seed)
+
+    def question_message(self, session: Session) -> dict:
+        q = session.current()
+        session.shown_at = time.monotonic()
+        return {
+            "op": "question",
+            "number": session.position + 1,
+            "total": len(session.order),
+            "topic": q.topic,
+            "prompt": q.prompt,
+            "options": q.options,
+            "multi": len(q.correct) > 1,
+        }
+
+    def answer(self, session: Session, raw: str) -> dict:
+        """Wertet eine Antwort aus und rückt zur nächsten Frage vor"""
+        q = session.current()
+        user_set = normalize_answer(raw)
+        if not user_set:
+            return {"op": "error", "message": "Keine gültige Antwort eingegeben"}
+        is_correct, invalid = check_answer(q, user_set)
+        if invalid:
+            return {"op": "error", "message": f"Ungültige Auswahl: {' '.join(sorted(invalid))}"}
+
+        session.score += is_correct
+        session.position += 1
+        self.total_answers += 1
+
+        if self.listeners:
+            # Antwortzeit aus Server-Sicht (inklusive Netzwerk-Laufzeit)
+            latency_ms = (time.monotonic() - session.shown_at) * 1000.0
+            event = make_answer_event(q, user_set, is_correct, session.user, latency_ms)
+            for listener in self.listeners:
+                listener(event)
+
+        return {
+            "op": "result",
+            "correct": is_correct,
+            "correct_keys": sorted(q.correct),
+            "explain": q.explain_correct,
+            "explain_wrong": {k: q.explain_wrong.get(k, "") for k in sorted(user_set - q.correct)},
+        }
+
+    def stats(self) -> dict:
+        return {
+            "op": "stats",
+            "active_sessions": self.active_sessions,
+            "rooms": len(self.classrooms.rooms),
+            "total_sessions": self.total_sessions,
+            "total_answers": self.total_answers,
+            "pid": os.getpid(),
+            "rss_mb": current_rss_mb(),
+            "pss_mb": current_pss_mb(),
+        }
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Eine Verbindung = höchstens eine laufende Sitzung bzw. ein Raum"""
+        session: Optional[Session] = None
+        hosting: Optional[Classroom] = None      # Raum, den diese Verbindung leitet
+        room: Optional[Classroom] = None         # Raum, in dem diese Verbindung antwortet
+
+        async def send(message: dict) -> None:
+            writer.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    await send({"op": "error", "message": "Nachricht zu lang"})
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    op = message.get("op")
+                except (ValueError, AttributeError):
+                    await send({"op": "error", "message": "Ungültiges JSON"})
+                    continue
+
+                if op == "topics":
+                    await send({"op": "topics", "topics": {name: len(bank) for name, bank in self.banks.items()}})
+                elif op == "start":
+                    try:
+                        new_session = self.start_session(message)
+                    except (ValueError, TypeError) as exc:
+                        await send({"op": "error", "message": str(exc)})
+                        continue
+                    if session is None:
+                        self.active_sessions += 1
+                    session = new_session
+                    self.total_sessions += 1
+                    await send(self.question_message(session))
+                elif op == "answer" and room is not None:
+                    error = room.submit(writer, normalize_answer(str(message.get("answer", ""))))
+                    if error:
+                        await send({"op": "error", "message": error})
+                    else:
+                        await send({"op": "accepted", "round": room.round})
+                elif op == "answer":
+                    if session is None or session.finished:
+                        await send({"op": "error", "message": "Keine laufende Frage"})
+                        continue
+                    await send(self.answer(session, str(message.get("answer", ""))))
+                    if session.finished:
+                        await send({"op": "done", "score": session.score, "total": len(session.order)})
+                    else:
+                        await send(self.question_message(session))
+                elif op in ("host", "join", "push", "reveal", "close"):
+                    try:
+                        if op == "host":
+                            if hosting is not None:
+                                self.classrooms.close(hosting)
+                            topic = message.get("topic") or next(iter(self.banks))
+                            if topic not in self.banks:
+                                raise ValueError(f"Unbekanntes Thema: {topic}")
+                            hosting = self.classrooms.create(self.banks[topic], writer)
+                            await send({"op": "hosted", "room": hosting.code, "topic": topic})
+                        elif op == "join":
+                            # Erst den neuen Raum suchen: bei unbekanntem Code bleibt
+                            # die Verbindung im bisherigen Raum
+                            target = self.classrooms.get(message.get("room", ""))
+                            if room is not None:
+                                room.leave(writer)
+                            room = target
+                            await send(room.join(writer, str(message.get("user", "anonym"))))
+                        elif hosting is None:
+                            raise ValueError("Kein eigener Raum")
+                        elif op == "push":
+                            index = message.get("index")
+                            await send(hosting.push(None if index is None else int(index)))
+                        elif op == "reveal":
+                            await send(hosting.reveal())
+                        else:
+                            self.classrooms.close(hosting)
+                            hosting = None
+                            await send({"op": "closed"})
+                    except (ValueError, TypeError) as exc:
+                        await send({"op": "error", "message": str(exc)})
+                elif op == "stats":
+                    await send(self.stats())
+                elif op == "quit":
+                    break
+                else:
+                    await send({"op": "error", "message": f"Unbekannte Operation: {op}"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if session is not None:
+                self.active_sessions -= 1
+            if room is not None:
+                room.leave(writer)
+            if hosting is not None:
+                self.classrooms.close(hosting)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+@traced("bank.load_banks", "bank")
+def load_banks(synthetic: int = 0) -> Dict[str, List[Question]]:
+    """Echte Themenmodule oder eine künstliche Bank"""
+    if synthetic > 0:
+        from bank_generator import generate_bank
+        return {"Synthetisch": generate_bank(synthetic)}
+    from questions import TOPICS
+    return {name: loader() for name, loader in TOPICS.items()}
+
+
+async def serve(host: str, port: int, banks: Dict[str, Sequence[Question]], listeners=(),
+                reuse_port: bool = False, ready=None) -> None:
+    server = QuizServer(banks, listeners)
+    tcp_server = await server.start(host, port, reuse_port)
+    bound = tcp_server.sockets[0].getsockname()
+    if ready is None:
+        # Zeile wird vom Lasttest ausgewertet (Port bei --port 0)
+        print(f"Quiz-Server läuft auf {bound[0]}:{bound[1]}", flush=True)
+    else:
+        ready.put(os.getpid())
+    # SIGTERM beendet den Server regulär, damit finally-Blöcke (Antwort-Log) laufen
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    async with tcp_server:
+        try:
+            await tcp_server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+
+def _run_worker(host: str, port: int, bank_path: str, ready) -> None:
+    """Worker-Prozess: bindet die Bankdatei ein und bedient Verbindungen auf dem geteilten Port"""
+    raise_open_file_limit()
+    try:
+        asyncio.run(serve(host, port, open_bank_file(bank_path), reuse_port=True, ready=ready))
+    except KeyboardInterrupt:
+        pass
+
+
+def _free_port(host: str) -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def _build_bank_file(path: str, synthetic: int) -> None:
+    write_bank_file(load_banks(synthetic), path)
+
+
+def _exit_on_sigterm(signum, frame) -> None:
+    """SIGTERM außerhalb der Ereignisschleife: finally-Blöcke (Worker, Bankdatei) laufen lassen"""
+    raise SystemExit(128 + signum)
+
+
+def run_workers(host: str, port: int, workers: int, bank_path: str) -> None:
+    """Startet mehrere Worker-Prozesse auf demselben Port und wartet auf sie"""
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise OSError("SO_REUSEPORT wird auf diesem System nicht unterstützt")
+    port = port or _free_port(host)
+    # spawn statt fork: Worker erben keine Kopie des Heaps, nur die Bankdatei wird geteilt
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    processes = [
+        context.Process(target=_run_worker, args=(host, port, bank_path, ready), daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.get()
+    print(f"Quiz-Server läuft auf {host}:{port}", flush=True)
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Quiz-Server für viele gleichzeitige Sitzungen")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse")
+    parser.add_argument("--port", type=int, default=8765, help="Port (0 = frei wählen)")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N",
+                        help="Künstliche Bank mit N Fragen statt der Themenmodule")
+    parser.add_argument("--workers", type=int, default=1, help="Anzahl Worker-Prozesse")
+    parser.add_argument("--bank-file", metavar="DATEI",
+                        help="Geteilte Bankdatei (wird angelegt, falls sie fehlt)")
+    parser.add_argument("--rebuild", action="store_true", help="Bankdatei neu schreiben")
+    parser.add_argument("--log", action="store_true", help="Antworten ins Antwort-Log schreiben")
+    add_trace_argument(parser)
+    args = parser.parse_args()
+    trace_path = enable_from_args(args)
+    if trace_path:
+        print(f"Trace: {trace_path} (Worker schreiben eigene Dateien)")
+
+    if args.workers > 1 and args.log:
+        parser.error("--log ist nur mit einem Worker möglich (ein Schreiber pro Log-Datei)")
+
+    raise_open_file_limit()
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+
+    bank_path = args.bank_file
+    temporary_bank = args.workers > 1 and bank_path is None
+    if temporary_bank:
+        bank_path = os.path.join(os.path.expanduser("~"), ".lern_quiz", f"server-{os.getpid()}.qbk")
+        args.rebuild = True
+    try:
+        if bank_path is not None and (args.rebuild or not os.path.exists(bank_path)):
+            # In eigenem Prozess bauen, damit der Hauptprozess die Fragen nicht im Speicher behält
+            builder = multiprocessing.get_context("spawn").Process(
+                target=_build_bank_file, args=(bank_path, args.synthetic)
+            )
+            builder.start()
+            builder.join()
+            if builder.exitcode != 0:
+                parser.error(f"Bankdatei konnte nicht geschrieben werden: {bank_path}")
+
+        if args.workers > 1:
+            run_workers(args.host, args.port, args.workers, bank_path)
+            return
+    finally:
+        if temporary_bank and os.path.exists(bank_path):
+            os.remove(bank_path)
+
+    banks = open_bank_file(bank_path) if bank_path is not None else load_banks(args.synthetic)
+
+    event_log = None
+    if args.log:
+        from column_log import ColumnarEventLog
+        event_log = ColumnarEventLog()
+
+    try:
+        asyncio.run(serve(args.host, args.port, banks, [event_log.record] if event_log else []))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if event_log is not None:
+            event_log.close()
+
+
+if __name__ == "__main__":
+    main()
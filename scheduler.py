@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Scheduler
+Wiederholungsstrategien für die Fragenauswahl im Trainingsmodus.
+
+Die Scheduler arbeiten nur mit Indizes in die Fragenliste der Engine,
+damit sie unabhängig von der Question-Struktur bleiben.
+"""
+
+import heapq
+import random
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Sequence, Set, Tuple
+
+from weighted_sampling import DynamicAliasSampler
+
+
+class QuestionScheduler:
+    """Basisklasse für Wiederholungsstrategien"""
+
+    kind = ""  # Name im Runden-Speicherstand (siehe make_scheduler)
+
+    def __init__(self, size: int, rng: Optional[random.Random] = None):
+        """
+        Args:
+            size: Anzahl der Fragen
+            rng: Optionaler Zufallsgenerator
+        """
+        self.size = size
+        self.rng = rng or random.Random()
+
+    def reset(self) -> None:
+        """Setzt den Zustand für eine neue Runde zurück"""
+
+    def next_index(self) -> int:
+        """Gibt den Index der nächsten Frage zurück"""
+        raise NotImplementedError
+
+    def record(self, index: int, correct: Optional[bool]) -> None:
+        """
+        Meldet das Ergebnis einer gestellten Frage.
+
+        Args:
+            index: Index der Frage
+            correct: True/False, oder None wenn übersprungen
+        """
+
+    def replay(self, index: int, correct: Optional[bool]) -> None:
+        """Spielt eine bereits gestellte Frage nach (Fortsetzen einer gespeicherten Runde)"""
+        self.record(index, correct)
+
+    def blocked(self) -> Set[int]:
+        """Indizes, die gerade nicht gestellt werden sollen"""
+        return set()
+
+    def finished(self) -> bool:
+        """True, wenn die Runde vorzeitig enden kann (z.B. adaptiver Test genau genug)"""
+        return False
+
+
+class CooldownScheduler(QuestionScheduler):
+    """Zufällige Auswahl, eine Frage darf erst nach `cooldown` anderen wiederkommen"""
+
+    kind = "cooldown"
+
+    def __init__(self, size: int, cooldown: int = 3, rng: Optional[random.Random] = None):
+        super().__init__(size, rng)
+        self.cooldown = min(cooldown, size - 1) if size > 1 else 0
+        self.recent: Deque[int] = deque(maxlen=self.cooldown)
+        self._recent_set: Set[int] = set()
+
+    def reset(self) -> None:
+        self.recent.clear()
+        self._recent_set.clear()
+
+    def next_index(self) -> int:
+        if self.size == 0:
+            raise IndexError("Keine Fragen vorhanden")
+
+        # Ziehen mit Zurückweisung: cooldown < size, also gibt es immer einen Treffer
+        index = self.rng.randrange(self.size)
+        while index in self._recent_set:
+            index = self.rng.randrange(self.size)
+
+        self._remember(index)
+        return index
+
+    def replay(self, index: int, correct: Optional[bool]) -> None:
+        self._remember(index)
+        self.record(index, correct)
+
+    def _remember(self, index: int) -> None:
+        """Sperrt eine gestellte Frage für die nächsten `cooldown` Fragen"""
+        if self.cooldown == 0 or index in self._recent_set:
+            return
+        if len(self.recent) == self.cooldown:
+            self._recent_set.discard(self.recent[0])
+        self.recent.append(index)
+        self._recent_set.add(index)
+
+    def blocked(self) -> Set[int]:
+        return set(self._recent_set)
+
+
+class WeightedScheduler(CooldownScheduler):
+    """
+    Gewichtete Auswahl nach Fehlerquote (Alias-Methode, O(1) pro Ziehung).
+
+    Gewicht = Themengewicht * (falsch + 1) / (Versuche + 2), d.h. unbekannte Fragen
+    starten bei 0.5 und falsch beantwortete werden häufiger gezogen. Der Cooldown
+    wird per Zurückweisung eingehalten.
+    """
+
+    kind = "weighted"
+    MAX_REJECTIONS = 32
+
+    def __init__(
+        self,
+        size: int,
+        cooldown: int = 3,
+        rng: Optional[random.Random] = None,
+        attempts: Optional[Sequence[int]] = None,
+        wrong: Optional[Sequence[int]] = None,
+        topic_weights: Optional[Sequence[float]] = None,
+    ):
+        """
+        Args:
+            size: Anzahl der Fragen
+            cooldown: Abstand, bevor eine Frage wiederholt werden darf
+            rng: Optionaler Zufallsgenerator
+            attempts: Bisherige Versuche pro Frage (z.B. aus dem LearningStore)
+            wrong: Bisherige falsche Antworten pro Frage
+            topic_weights: Zusätzlicher Faktor pro Frage (Standard 1.0)
+        """
+        super().__init__(size, cooldown, rng)
+        self._initial_attempts = list(attempts) if attempts is not None else [0] * size
+        self._initial_wrong = list(wrong) if wrong is not None else [0] * size
+        self.topic_weights = list(topic_weights) if topic_weights is not None else [1.0] * size
+        self.reset()
+
+    def _weight(self, index: int) -> float:
+        return self.topic_weights[index] * (self.wrong[index] + 1) / (self.attempts[index] + 2)
+
+    def reset(self) -> None:
+        super().reset()
+        self.attempts = list(self._initial_attempts)
+        self.wrong = list(self._initial_wrong)
+        self.sampler = DynamicAliasSampler([self._weight(i) for i in range(self.size)], rng=self.rng)
+
+    def next_index(self) -> int:
+        if self.size == 0:
+            raise IndexError("Keine Fragen vorhanden")
+
+        index = self.sampler.sample()
+        # Bei stark gewichteten Fragen im Cooldown nicht endlos zurückweisen
+        for _ in range(self.MAX_REJECTIONS):
+            if index not in self._recent_set:
+                break
+            index = self.sampler.sample()
+
+        self._remember(index)
+        return index
+
+    def record(self, index: int, correct: Optional[bool]) -> None:
+        if correct is None:
+            return
+        self.attempts[index] += 1
+        if not correct:
+            self.wrong[index] += 1
+        self.sampler.update(index, self._weight(index))
+
+
+@dataclass
+class ReviewState:
+    """Lernzustand einer Frage (SM-2)"""
+    ease: float = 2.5
+    interval: int = 0
+    repetitions: int = 0
+    due: int = 0
+    version: int = 0
+
+
+class SpacedRepetitionScheduler(QuestionScheduler):
+    """
+    Spaced Repetition nach SM-2.
+
+    Die Zeit wird in gestellten Fragen gemessen (ein Schritt pro Frage), weil eine
+    Trainingsrunde in einer Sitzung läuft. Fälligkeiten liegen in einem Heap mit
+    verzögertem Löschen, die Auswahl kostet daher O(log N).
+
+    Neue Fragen kommen nur dran, wenn keine Wiederholung fällig ist. Sonst würde
+    eine falsch beantwortete Frage erst nach allen ungesehenen wiederkommen.
+    """
+
+    kind = "spaced"
+
+    def __init__(
+        self,
+        size: int,
+        rng: Optional[random.Random] = None,
+        first_interval: int = 5,
+        second_interval: int = 15,
+        relearn_gap: int = 3,
+    ):
+        """
+        Args:
+            size: Anzahl der Fragen
+            rng: Zufallsgenerator (Reihenfolge neuer Fragen)
+            first_interval: Abstand nach der ersten richtigen Antwort
+            second_interval: Abstand nach der zweiten richtigen Antwort
+            relearn_gap: Abstand nach einer falschen oder übersprungenen Antwort
+        """
+        super().__init__(size, rng)
+        self.first_interval = first_interval
+        self.second_interval = second_interval
+        self.relearn_gap = relearn_gap
+        self.states: List[ReviewState] = []
+        self._heap: List[Tuple[int, int, int, int]] = []
+        self._new: List[int] = []
+        self._in_flight: Set[int] = set()
+        self._now = 0
+        self._seq = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self.states = [ReviewState() for _ in range(self.size)]
+        self._in_flight.clear()
+        self._now = 0
+        self._heap = []
+        self._seq = 0
+
+        # Neue Fragen in zufälliger Reihenfolge (vom Ende entnommen)
+        self._new = list(range(self.size))
+        self.rng.shuffle(self._new)
+
+    def _push(self, index: int) -> None:
+        state = self.states[index]
+        state.version += 1
+        self._seq += 1
+        heapq.heappush(self._heap, (state.due, self._seq, index, state.version))
+
+    def _next_due(self) -> Optional[int]:
+        """Fälligkeit der frühesten Wiederholung (veraltete Einträge werden verworfen)"""
+        while self._heap:
+            due, _, index, version = self._heap[0]
+            if version == self.states[index].version:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def next_index(self) -> int:
+        step = self._now + 1
+        due = self._next_due()
+        if self._new and (due is None or due > step):
+            index = self._new.pop()
+        elif due is not None:
+            index = heapq.heappop(self._heap)[2]
+        elif self._in_flight:
+            # Alle Fragen sind unterwegs (ohne record) -> irgendeine wieder freigeben
+            self._now = step
+            return min(self._in_flight)
+        else:
+            raise IndexError("Keine Fragen vorhanden")
+
+        self._now = step
+        self._in_flight.add(index)
+        return index
+
+    def replay(self, index: int, correct: Optional[bool]) -> None:
+        if index in self._new:
+            self._new.remove(index)
+        self._now += 1
+        self.record(index, correct)
+
+    def record(self, index: int, correct: Optional[bool]) -> None:
+        state = self.states[index]
+        self._in_flight.discard(index)
+
+        if not correct:
+            if correct is not None:
+                # SM-2 mit Qualität 1: Wiederholungen zurücksetzen, Ease sinkt
+                state.ease = max(1.3, state.ease - 0.54)
+            state.repetitions = 0
+            state.interval = self.relearn_gap
+        else:
+            # SM-2 mit Qualität 4: Ease bleibt gleich
+            state.repetitions += 1
+            if state.repetitions == 1:
+                state.interval = self.first_interval
+            elif state.repetitions == 2:
+                state.interval = self.second_interval
+            else:
+                state.interval = max(state.interval + 1, round(state.interval * state.ease))
+
+        state.due = self._now + state.interval
+        self._push(index)
+
+    def blocked(self) -> Set[int]:
+        return set(self._in_flight)
+
+
+def make_scheduler(
+    kind: str,
+    size: int,
+    cooldown: int = 3,
+    rng: Optional[random.Random] = None,
+    attempts: Optional[Sequence[int]] = None,
+    wrong: Optional[Sequence[int]] = None,
+) -> QuestionScheduler:
+    """
+    Erstellt einen Scheduler nach seinem `kind` (z.B. beim Fortsetzen einer
+    gespeicherten Runde). Unbekannte Arten ergeben einen CooldownScheduler.
+    """
+    if kind == SpacedRepetitionScheduler.kind:
+        return SpacedRepetitionScheduler(size, rng=rng)
+    if kind == WeightedScheduler.kind:
+        return WeightedScheduler(size, cooldown, rng=rng, attempts=attempts, wrong=wrong)
+    return CooldownScheduler(size, cooldown, rng=rng)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Volltextsuche
+Invertierter Index über Prompt, Antwortoptionen und Erklärungen.
+
+Die Tokenisierung ist auf die deutschen Fragen abgestimmt: Umlaute werden wie
+in den Banken transliteriert (ä -> ae, ö -> oe, ü -> ue, ß -> ss), damit
+'Übertragung' und 'Uebertragung' dasselbe Token ergeben. Suchbegriffe passen
+als Präfix ('nyquist' findet auch 'nyquistfrequenz').
+"""
+
+import bisect
+import heapq
+import re
+import threading
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple
+
+from quiz_engine import Question
+
+
+_TRANSLITERATION = (("ä", "ae"), ("ö", "oe"), ("ü", "ue"), ("ß", "ss"))
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def normalize_text(text: str) -> str:
+    """Kleinschreibung und Umlaut-Transliteration"""
+    # str.replace ist hier deutlich schneller als str.translate mit mehrzeichigen Ersetzungen
+    text = text.lower()
+    for umlaut, replacement in _TRANSLITERATION:
+        text = text.replace(umlaut, replacement)
+    return text
+
+
+def tokenize(text: str) -> List[str]:
+    """Zerlegt Text in normalisierte Tokens (Bindestriche trennen Wörter)"""
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+def question_text(question: Question) -> str:
+    """Durchsuchbarer Text einer Frage"""
+    parts = [question.prompt, question.explain_correct]
+    parts.extend(question.options.values())
+    parts.extend(question.explain_wrong.values())
+    return "\n".join(parts)
+
+
+def _dedupe(sorted_ids: Iterable[int]) -> Iterator[int]:
+    """Entfernt Duplikate aus einer sortierten Folge"""
+    previous = -1
+    for doc_id in sorted_ids:
+        if doc_id != previous:
+            yield doc_id
+            previous = doc_id
+
+
+def _contains(postings: array, doc_id: int) -> bool:
+    """Binäre Suche in einer sortierten Posting-Liste"""
+    pos = bisect.bisect_left(postings, doc_id)
+    return pos < len(postings) and postings[pos] == doc_id
+
+
+class SearchIndex:
+    """Invertierter Index einer Fragenbank"""
+
+    MAX_BISECT_LISTS = 8
+
+    def __init__(self, questions: Iterable[Question] = ()):
+        self.questions: List[Question] = []
+        self._postings: Dict[str, array] = {}
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._deleted: Set[int] = set()
+        for question in questions:
+            self.add(question)
+
+    def __len__(self) -> int:
+        return len(self.questions) - len(self._deleted)
+
+    def add(self, question: Question) -> int:
+        """Fügt eine Frage hinzu und gibt ihre Dokument-ID zurück"""
+        doc_id = len(self.questions)
+        self.questions.append(question)
+        for token in set(tokenize(question_text(question))):
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = array("I")
+                self._vocabulary_dirty = True
+            # IDs wachsen monoton -> Listen bleiben sortiert
+            postings.append(doc_id)
+        return doc_id
+
+    def remove(self, doc_id: int) -> None:
+        """Entfernt eine Frage (wird beim Suchen ausgeblendet)"""
+        self._deleted.add(doc_id)
+
+    def _terms_with_prefix(self, prefix: str) -> List[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\uffff")
+        return self._vocabulary[start:end]
+
+    def _posting_lists(self, token: str) -> List[array]:
+        """Posting-Listen aller Terme mit dem Token als Präfix"""
+        return [self._postings[term] for term in self._terms_with_prefix(token)]
+
+    def search(self, query: str, limit: int = 0) -> List[int]:
+        """
+        Sucht Fragen, die alle Begriffe der Anfrage enthalten.
+
+        Args:
+            query: Suchbegriffe (z.B. 'Nyquist Abtastung')
+            limit: Maximale Trefferzahl (0 = alle)
+
+        Returns:
+            Sortierte Dokument-IDs
+        """
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+
+        groups = [self._posting_lists(token) for token in tokens]
+        # Mit dem seltensten Begriff anfangen, die Kandidatenmenge ist dann am kleinsten
+        groups.sort(key=lambda lists: sum(len(p) for p in lists))
+
+        if limit <= 0:
+            return self._search_all(groups)
+
+        first = groups[0]
+        if not first:
+            return []
+        # Kandidaten sortiert und lazy erzeugen, damit nach `limit` Treffern Schluss ist
+        candidates: Iterable[int] = first[0] if len(first) == 1 else _dedupe(heapq.merge(*first))
+
+        # Weitere Begriffe per binärer Suche prüfen; bei sehr vielen Präfix-Termen als Menge
+        checks: List[Callable[[int], bool]] = []
+        for lists in groups[1:]:
+            if len(lists) > self.MAX_BISECT_LISTS:
+                matches: Set[int] = set()
+                for postings in lists:
+                    matches.update(postings)
+                checks.append(matches.__contains__)
+            else:
+                checks.append(lambda doc_id, lists=lists: any(_contains(p, doc_id) for p in lists))
+
+        deleted = self._deleted
+        ids: List[int] = []
+        for doc_id in candidates:
+            if doc_id in deleted:
+                continue
+            if all(check(doc_id) for check in checks):
+                ids.append(doc_id)
+                if len(ids) == limit:
+                    break
+        return ids
+
+    def _search_all(self, groups: List[List[array]]) -> List[int]:
+        """Alle Treffer über Mengen-Schnitte (schneller als Einzelprüfungen)"""
+        result: Set[int] = set()
+        for postings in groups[0]:
+            result.update(postings)
+
+        for lists in groups[1:]:
+            if not result:
+                break
+            matches: Set[int] = set()
+            for postings in lists:
+                matches.update(postings)
+            result &= matches
+
+        if self._deleted:
+            result -= self._deleted
+        return sorted(result)
+
+    def search_questions(self, query: str, limit: int = 0) -> List[Question]:
+        """Wie search(), gibt aber die Fragen zurück"""
+        return [self.questions[doc_id] for doc_id in self.search(query, limit)]
+
+
+_INDEX_CACHE: Dict[str, SearchIndex] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def get_topic_index(topic_name: str, loader: Callable[[], List[Question]]) -> SearchIndex:
+    """Gibt den (gecachten) Index eines Themenmoduls zurück und baut ihn beim ersten Aufruf"""
+    with _CACHE_LOCK:
+        index = _INDEX_CACHE.get(topic_name)
+        if index is None:
+            index = SearchIndex(loader())
+            _INDEX_CACHE[topic_name] = index
+        return index
+
+
+def search_topics(query: str, topics: Iterable[Tuple[str, Callable[[], List[Question]]]]) -> List[Question]:
+    """Sucht über mehrere Themenmodule (Name, Loader) hinweg"""
+    results: List[Question] = []
+    for topic_name, loader in topics:
+        results.extend(get_topic_index(topic_name, loader).search_questions(query))
+    return results
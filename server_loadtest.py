@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lasttest für den Quiz-Server
+Öffnet viele gleichzeitige Sitzungen und misst Sitzungen/s, Antworten/s,
+Antwortlatenz und Speicher pro Sitzung auf dem Server.
+
+Mit --classroom wird stattdessen der Live-Modus gemessen: eine Lehrperson
+stellt Fragen an alle Sitzungen, gemessen werden Broadcast-Latenz und die Zeit,
+bis alle Antworten im Zwischenstand angekommen sind.
+
+Ohne --port wird ein Server als eigener Prozess gestartet (freier Port).
+
+Aufruf:
+    python server_loadtest.py --sessions 2000 --questions 10
+    python server_loadtest.py --port 8765 --sessions 500
+    python server_loadtest.py --classroom --sessions 1000 --questions 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from quiz_server import MAX_LINE, current_pss_mb, raise_open_file_limit
+
+
+class Client:
+    """Eine simulierte Person (eine Verbindung)"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> "Client":
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+        return cls(reader, writer)
+
+    async def request(self, message: dict) -> dict:
+        self.writer.write(json.dumps(message).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        return await self.receive()
+
+    async def receive_op(self, op: str) -> dict:
+        """Liest, bis eine Nachricht der gewünschten Art ankommt"""
+        while True:
+            message = await self.receive()
+            if message.get("op") == op:
+                return message
+            if message.get("op") == "error":
+                raise RuntimeError(message["message"])
+
+    async def receive(self) -> dict:
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Server hat die Verbindung geschlossen")
+        return json.loads(line)
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def play(client: Client, question: dict, rng: random.Random, accuracy: float,
+               latencies: List[float]) -> int:
+    """Beantwortet alle Fragen einer Sitzung, gibt die Punktzahl zurück"""
+    while True:
+        keys = sorted(question["options"])
+        # Ohne Kenntnis der Lösung: mit `accuracy` eine, sonst zwei Optionen wählen
+        count = 1 if rng.random() < accuracy or len(keys) < 2 else 2
+        answer = " ".join(rng.sample(keys, count))
+
+        started = time.perf_counter()
+        result = await client.request({"op": "answer", "answer": answer})
+        following = await client.receive()
+        latencies.append(time.perf_counter() - started)
+
+        if result.get("op") != "result":
+            raise RuntimeError(f"Unerwartete Antwort: {result}")
+        if following["op"] == "done":
+            return following["score"]
+        question = following
+
+
+def server_tree_pss_mb(pid: int) -> Optional[float]:
+    """PSS des Serverprozesses und aller Worker zusammen (nur Linux)"""
+    pids = [pid]
+    total = 0.0
+    while pids:
+        current = pids.pop()
+        pss = current_pss_mb(str(current))
+        if pss is None:
+            return None
+        total += pss
+        try:
+            with open(f"/proc/{current}/task/{current}/children") as f:
+                pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            return None
+    return total
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+async def run_load_test(host: str, port: int, sessions: int, questions: int, topic: Optional[str],
+                        accuracy: float, connect_batch: int = 200, server_pid: Optional[int] = None) -> dict:
+    """
+    Phase 1: alle Sitzungen öffnen und die erste Frage abholen (Speicher messen).
+    Phase 2: alle Sitzungen gleichzeitig zu Ende spielen (Durchsatz messen).
+    """
+    control = await Client.connect(host, port)
+    idle = await control.request({"op": "stats"})
+
+    start_message = {"op": "start", "count": questions}
+    if topic:
+        start_message["topic"] = topic
+
+    async def open_session(seed: int) -> Tuple[Client, dict]:
+        client = await Client.connect(host, port)
+        first = await client.request(dict(start_message, user=f"last{seed}", seed=seed))
+        if first.get("op") != "question":
+            raise RuntimeError(f"Sitzung konnte nicht gestartet werden: {first}")
+        return client, first
+
+    opened: List[Tuple[Client, dict]] = []
+    started = time.perf_counter()
+    # In Paketen verbinden, damit der Listen-Backlog nicht überläuft
+    for offset in range(0, sessions, connect_batch):
+        batch = range(offset, min(sessions, offset + connect_batch))
+        opened.extend(await asyncio.gather(*(open_session(seed) for seed in batch)))
+    open_seconds = time.perf_counter() - started
+
+    loaded = await control.request({"op": "stats"})
+    tree_pss = server_tree_pss_mb(server_pid) if server_pid else None
+
+    latencies: List[float] = []
+    started = time.perf_counter()
+    scores = await asyncio.gather(*(
+        play(client, first, random.Random(i), accuracy, latencies)
+        for i, (client, first) in enumerate(opened)
+    ))
+    play_seconds = time.perf_counter() - started
+
+    for client, _ in opened:
+        await client.close()
+    finished = await control.request({"op": "stats"})
+    await control.close()
+
+    latencies.sort()
+    total_answers = len(latencies)
+    return {
+        "sessions": sessions,
+        "questions_per_session": questions,
+        "open_seconds": open_seconds,
+        "play_seconds": play_seconds,
+        "sessions_per_second": sessions / (open_seconds + play_seconds),
+        "answers_per_second": total_answers / play_seconds if play_seconds > 0 else 0.0,
+        "latency_p50_ms": _percentile(latencies, 0.50) * 1000,
+        "latency_p99_ms": _percentile(latencies, 0.99) * 1000,
+        "server_rss_idle_mb": idle["rss_mb"],
+        "server_rss_loaded_mb": loaded["rss_mb"],
+        # Inklusive Socket-Puffer und Stream-Objekte des Servers
+        "server_kb_per_session": (loaded["rss_mb"] - idle["rss_mb"]) * 1024 / sessions,
+        "mean_score": sum(scores) / len(scores) if scores else 0.0,
+        # Alle Worker zusammen, geteilte Seiten (Bankdatei) nur einmal gezählt
+        "server_pss_total_mb": tree_pss,
+        "server_total_answers": finished["total_answers"],
+    }
+
+
+async def run_classroom_test(host: str, port: int, students: int, rounds: int, topic: Optional[str],
+                             connect_batch: int = 200) -> dict:
+    """Live-Modus: alle Teilnehmenden antworten sofort auf jede gestellte Frage"""
+    teacher = await Client.connect(host, port)
+    hosted = await teacher.request({"op": "host", "topic": topic} if topic else {"op": "host"})
+    code = hosted["room"]
+
+    async def join(number: int) -> Client:
+        client = await Client.connect(host, port)
+        await client.request({"op": "join", "room": code, "user": f"last{number}"})
+        return client
+
+    members: List[Client] = []
+    for offset in range(0, students, connect_batch):
+        batch = range(offset, min(students, offset + connect_batch))
+        members.extend(await asyncio.gather(*(join(number) for number in batch)))
+
+    async def answer_round(client: Client, rng: random.Random, pushed_at: List[float],
+                           arrivals: List[float]) -> None:
+        question = await client.receive_op("question")
+        arrivals.append(time.perf_counter() - pushed_at[0])
+        answer = rng.choice(sorted(question["options"]))
+        await client.request({"op": "answer", "answer": answer})
+        await client.receive_op("reveal")
+
+    async def wait_for_all_answers() -> dict:
+        while True:
+            tally = await teacher.receive_op("tally")
+            if tally["answers"] >= students:
+                return tally
+
+    broadcast_latencies: List[float] = []
+    collect_seconds: List[float] = []
+    rng = random.Random(0)
+    for _ in range(rounds):
+        pushed_at = [0.0]
+        arrivals: List[float] = []
+        tasks = [asyncio.ensure_future(answer_round(client, rng, pushed_at, arrivals)) for client in members]
+        pushed_at[0] = time.perf_counter()
+        teacher.writer.write(b'{"op": "push"}\n')
+        await teacher.receive_op("pushed")
+        await wait_for_all_answers()
+        collect_seconds.append(time.perf_counter() - pushed_at[0])
+        teacher.writer.write(b'{"op": "reveal"}\n')
+        await teacher.receive_op("reveal")
+        await asyncio.gather(*tasks)
+        broadcast_latencies.extend(arrivals)
+
+    for client in members:
+        await client.close()
+    await teacher.close()
+
+    broadcast_latencies.sort()
+    collect_seconds.sort()
+    return {
+        "students": students,
+        "rounds": rounds,
+        "broadcast_p50_ms": _percentile(broadcast_latencies, 0.50) * 1000,
+        "broadcast_p99_ms": _percentile(broadcast_latencies, 0.99) * 1000,
+        # Frage stellen -> Zwischenstand enthält alle Antworten (inkl. Broadcast und Tally-Intervall)
+        "all_answers_p50_ms": _percentile(collect_seconds, 0.50) * 1000,
+        "all_answers_max_ms": collect_seconds[-1] * 1000 if collect_seconds else 0.0,
+        "answers_per_second": students / _percentile(collect_seconds, 0.50) if collect_seconds else 0.0,
+    }
+
+
+def print_classroom_report(report: dict) -> None:
+    print("=" * 70)
+    print(f"  Live-Modus: {report['students']} Teilnehmende, {report['rounds']} Fragen")
+    print("-" * 70)
+    print(f"  Broadcast p50 / p99:       {report['broadcast_p50_ms']:.1f} / {report['broadcast_p99_ms']:.1f} ms")
+    print(f"  Alle Antworten p50 / max:  {report['all_answers_p50_ms']:.1f} / {report['all_answers_max_ms']:.1f} ms")
+    print(f"  Antworten/s (Auszählung):  {report['answers_per_second']:.0f}")
+    print()
+
+
+def start_server_process(synthetic: int, workers: int = 1,
+                         bank_file: Optional[str] = None) -> Tuple[subprocess.Popen, int]:
+    """Startet quiz_server.py auf einem freien Port und liest den Port aus der Startmeldung"""
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz_server.py"),
+               "--port", "0", "--workers", str(workers)]
+    if synthetic:
+        command += ["--synthetic", str(synthetic)]
+    if bank_file:
+        command += ["--bank-file", bank_file]
+    # Eigene Prozessgruppe, damit sich notfalls auch die Worker beenden lassen
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True, start_new_session=True)
+    line = process.stdout.readline()
+    if not line:
+        stop_server_process(process)
+        raise RuntimeError("Server konnte nicht gestartet werden")
+    return process, int(line.rsplit(":", 1)[1])
+
+
+def stop_server_process(process: subprocess.Popen, timeout: float = 10.0) -> None:
+    """
+    Beendet den Server über SIGTERM (Worker und temporäre Bankdatei werden
+    aufgeräumt); hängt er, wird die ganze Prozessgruppe abgeschossen.
+    """
+    process.terminate()
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        pass
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.wait()
+    process.stdout.close()
+
+
+def print_report(report: dict) -> None:
+    print("=" * 70)
+    print(f"  {report['sessions']} Sitzungen à {report['questions_per_session']} Fragen")
+    print("-" * 70)
+    print(f"  Sitzungen öffnen:       {report['open_seconds']:.2f} s")
+    print(f"  Sitzungen spielen:      {report['play_seconds']:.2f} s")
+    print(f"  Sitzungen/s:            {report['sessions_per_second']:.0f}")
+    print(f"  Antworten/s:            {report['answers_per_second']:.0f}")
+    print(f"  Latenz p50 / p99:       {report['latency_p50_ms']:.1f} / {report['latency_p99_ms']:.1f} ms")
+    print(f"  Server-RSS leer/voll:   {report['server_rss_idle_mb']:.1f} / {report['server_rss_loaded_mb']:.1f} MB")
+    print(f"  Speicher pro Sitzung:   {report['server_kb_per_session']:.1f} KB")
+    if report["server_pss_total_mb"] is not None:
+        print(f"  Server-PSS gesamt:      {report['server_pss_total_mb']:.1f} MB (alle Worker)")
+    print()
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Lasttest für quiz_server.py")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse des Servers")
+    parser.add_argument("--port", type=int, default=0, help="Port eines laufenden Servers (0 = selbst starten)")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N",
+                        help="Selbst gestarteter Server nutzt eine künstliche Bank mit N Fragen")
+    parser.add_argument("--workers", type=int, default=1, help="Worker des selbst gestarteten Servers")
+    parser.add_argument("--bank-file", metavar="DATEI", help="Bankdatei des selbst gestarteten Servers")
+    parser.add_argument("--sessions", type=int, default=1000, help="Gleichzeitige Sitzungen")
+    parser.add_argument("--questions", type=int, default=10, help="Fragen pro Sitzung")
+    parser.add_argument("--topic", default=None, help="Thema (Standard: erstes Thema des Servers)")
+    parser.add_argument("--accuracy", type=float, default=0.7, help="Anteil Einzelauswahl-Antworten")
+    parser.add_argument("--classroom", action="store_true", help="Live-Modus statt Einzelsitzungen messen")
+    parser.add_argument("--json", metavar="DATEI", help="Ergebnis zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    if args.classroom and args.workers > 1:
+        parser.error("--classroom braucht einen Worker (Räume liegen im Serverprozess)")
+
+    limit = raise_open_file_limit()
+    if args.sessions + 16 > limit:
+        parser.error(f"Zu viele Sitzungen für das Dateilimit ({limit})")
+
+    process = None
+    port = args.port
+    if not port:
+        process, port = start_server_process(args.synthetic, args.workers, args.bank_file)
+
+    try:
+        if args.classroom:
+            report = asyncio.run(run_classroom_test(args.host, port, args.sessions, args.questions, args.topic))
+        else:
+            report = asyncio.run(run_load_test(args.host, port, args.sessions, args.questions,
+                                               args.topic, args.accuracy,
+                                               server_pid=process.pid if process else None))
+    finally:
+        if process is not None:
+            stop_server_process(process)
+
+    if args.classroom:
+        print_classroom_report(report)
+    else:
+        print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
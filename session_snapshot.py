@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Runden-Speicherstand
+Speichert eine unterbrochene Runde kompakt, damit sie später (Konsole oder GUI)
+genau dort weitergeht.
+
+Gespeichert werden nur Fragenschlüssel, ein Mischungs-Startwert pro Frage und
+die bisherigen Antworten. Die angezeigte Variante einer Frage entsteht beim
+Fortsetzen wieder aus ihrem Startwert (gleiche Reihenfolge der Optionen), die
+Runde wird also nicht neu zusammengestellt.
+
+Binärformat (little endian):
+
+    Kopf      MAGIC, Version (u16), Flags (u16), geplante Fragen (u32), Cooldown (u32), Zeit (f64)
+    Meta      Länge (u16) + JSON {"topics": [...], "user": ..., "key_bytes": 8, "scheduler": "spaced"}
+    Anzahl    Plätze (u32), beantwortete Plätze (u32)
+    Schlüssel Plätze * key_bytes (Fragenschlüssel als Bytes)
+    Seeds     Plätze * u32
+    Antworten beantwortete Plätze * u32: Bitmaske der gewählten Originaloptionen
+              (A = Bit 0), Bit 31 = richtig; 0 = übersprungen
+    Pool      Anzahl (u32) + Anzahl * key_bytes: Fragenpool der Runde (nach Suche
+              oder Unterthemen gefiltert); fehlt in älteren Dateien
+"""
+
+import json
+import os
+import struct
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set
+
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.expanduser("~"), ".lern_quiz", "round.snap")
+
+MAGIC = b"QSNP"
+VERSION = 1
+CORRECT_BIT = 1 << 31
+MAX_OPTIONS = 31
+
+_HEADER = struct.Struct("<4sHHIId")
+_COUNTS = struct.Struct("<II")
+_META_LENGTH = struct.Struct("<H")
+_POOL_COUNT = struct.Struct("<I")
+
+_FLAG_ALLOW_REPEATS = 1
+_FLAG_SHUFFLE_QUESTIONS = 2
+_FLAG_SHUFFLE_ANSWERS = 4
+
+
+@dataclass
+class RoundSnapshot:
+    """Zustand einer unterbrochenen Runde"""
+    topics: List[str]                    # Themenmodule (Namen wie in questions.TOPICS)
+    keys: List[str]                      # Fragenschlüssel pro Platz der Runde
+    seeds: List[int]                     # Mischungs-Startwert pro Platz
+    answers: List[int]                   # Kodierte Antwort pro beantwortetem Platz (siehe encode_selection)
+    total: int                           # Geplante Anzahl Fragen
+    allow_repeats: bool = False
+    shuffle_questions: bool = True
+    shuffle_answers: bool = True
+    cooldown: int = 3
+    scheduler: str = "cooldown"          # Wiederholungsstrategie (QuestionScheduler.kind)
+    pool: List[str] = field(default_factory=list)  # Schlüssel aller Fragen der Runde (leer = ganze Themen)
+    user: str = ""
+    created: float = field(default_factory=time.time)
+
+    @property
+    def position(self) -> int:
+        """Index der nächsten offenen Frage"""
+        return len(self.answers)
+
+    @property
+    def correct_count(self) -> int:
+        return sum(1 for code in self.answers if code & CORRECT_BIT)
+
+    @property
+    def answered_count(self) -> int:
+        return sum(1 for code in self.answers if code)
+
+
+def _letters_to_index(letters: str) -> int:
+    """A -> 0, B -> 1, ..., Z -> 25, AA -> 26 (Umkehrung von _index_to_letters)"""
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - ord("A") + 1)
+    return index - 1
+
+
+def encode_selection(source_keys: Mapping[str, str], user_set: Set[str], is_correct: bool) -> int:
+    """
+    Kodiert eine Antwort als Bitmaske der Originalschlüssel.
+
+    Args:
+        source_keys: Angezeigter -> Originalschlüssel (Question.source_keys)
+        user_set: Gewählte angezeigte Schlüssel
+        is_correct: Antwort richtig?
+    """
+    mask = 0
+    for key in user_set:
+        original = source_keys.get(key, key)
+        bit = _letters_to_index(original) if original.isalpha() and original.isupper() else -1
+        if not 0 <= bit < MAX_OPTIONS:
+            raise ValueError(f"Option kann nicht gespeichert werden: {original}")
+        mask |= 1 << bit
+    return mask | (CORRECT_BIT if is_correct else 0)
+
+
+def encode_snapshot(snapshot: RoundSnapshot) -> bytes:
+    """Serialisiert einen Speicherstand"""
+    sample = snapshot.keys or snapshot.pool
+    key_bytes = len(sample[0]) // 2 if sample else 8
+    flags = (
+        (_FLAG_ALLOW_REPEATS if snapshot.allow_repeats else 0)
+        | (_FLAG_SHUFFLE_QUESTIONS if snapshot.shuffle_questions else 0)
+        | (_FLAG_SHUFFLE_ANSWERS if snapshot.shuffle_answers else 0)
+    )
+    meta = json.dumps(
+        {"topics": snapshot.topics, "user": snapshot.user, "key_bytes": key_bytes, "scheduler": snapshot.scheduler},
+        separators=(",", ":"), ensure_ascii=False,
+    ).encode("utf-8")
+
+    return b"".join((
+        _HEADER.pack(MAGIC, VERSION, flags, snapshot.total, snapshot.cooldown, snapshot.created),
+        _META_LENGTH.pack(len(meta)),
+        meta,
+        _COUNTS.pack(len(snapshot.keys), len(snapshot.answers)),
+        bytes.fromhex("".join(snapshot.keys)),
+        array("I", snapshot.seeds).tobytes(),
+        array("I", snapshot.answers).tobytes(),
+        _POOL_COUNT.pack(len(snapshot.pool)),
+        bytes.fromhex("".join(snapshot.pool)),
+    ))
+
+
+def decode_snapshot(data: bytes) -> RoundSnapshot:
+    """Liest einen Speicherstand (ValueError bei fremden oder beschädigten Daten)"""
+    try:
+        magic, version, flags, total, cooldown, created = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Kein Runden-Speicherstand dieser Version")
+        offset = _HEADER.size
+        (meta_length,) = _META_LENGTH.unpack_from(data, offset)
+        offset += _META_LENGTH.size
+        meta = json.loads(data[offset:offset + meta_length])
+        offset += meta_length
+        slots, answered = _COUNTS.unpack_from(data, offset)
+        offset += _COUNTS.size
+
+        key_bytes = meta["key_bytes"]
+        raw_keys = data[offset:offset + slots * key_bytes]
+        offset += slots * key_bytes
+        seeds = array("I")
+        seeds.frombytes(data[offset:offset + slots * seeds.itemsize])
+        offset += slots * seeds.itemsize
+        answers = array("I")
+        answers.frombytes(data[offset:offset + answered * answers.itemsize])
+        offset += answered * answers.itemsize
+        raw_pool = b""
+        if len(data) > offset:
+            (pool_size,) = _POOL_COUNT.unpack_from(data, offset)
+            offset += _POOL_COUNT.size
+            raw_pool = data[offset:offset + pool_size * key_bytes]
+            if len(raw_pool) != pool_size * key_bytes:
+                raise ValueError("Speicherstand unvollständig")
+    except (struct.error, KeyError, TypeError) as exc:
+        raise ValueError(f"Speicherstand beschädigt: {exc}") from exc
+
+    if len(raw_keys) != slots * key_bytes or len(seeds) != slots or len(answers) != answered:
+        raise ValueError("Speicherstand unvollständig")
+
+    hex_keys = raw_keys.hex()
+    hex_pool = raw_pool.hex()
+    width = key_bytes * 2
+    return RoundSnapshot(
+        topics=list(meta["topics"]),
+        keys=[hex_keys[i:i + width] for i in range(0, len(hex_keys), width)],
+        seeds=seeds.tolist(),
+        answers=answers.tolist(),
+        total=total,
+        allow_repeats=bool(flags & _FLAG_ALLOW_REPEATS),
+        shuffle_questions=bool(flags & _FLAG_SHUFFLE_QUESTIONS),
+        shuffle_answers=bool(flags & _FLAG_SHUFFLE_ANSWERS),
+        cooldown=cooldown,
+        scheduler=meta.get("scheduler", "cooldown"),
+        pool=[hex_pool[i:i + width] for i in range(0, len(hex_pool), width)],
+        user=meta.get("user", ""),
+        created=created,
+    )
+
+
+def save_snapshot(snapshot: RoundSnapshot, path: str = DEFAULT_SNAPSHOT_PATH) -> None:
+    """Schreibt den Speicherstand atomar (alte Datei bleibt bis zum Umbenennen gültig)"""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode_snapshot(snapshot))
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str = DEFAULT_SNAPSHOT_PATH) -> Optional[RoundSnapshot]:
+    """Liest den Speicherstand (None, falls keiner da oder unlesbar)"""
+    try:
+        with open(path, "rb") as f:
+            return decode_snapshot(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def clear_snapshot(path: str = DEFAULT_SNAPSHOT_PATH) -> None:
+    """Löscht den Speicherstand (z.B. nach dem Fortsetzen)"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def resolve_keys(keys: Iterable[str], bank_keys: Sequence[str]) -> List[Optional[int]]:
+    """
+    Gespeicherte Fragenschlüssel -> Index in der Bank.
+
+    Args:
+        keys: Schlüssel aus dem Speicherstand
+        bank_keys: question_key() jeder Frage der aktuellen Bank
+
+    Returns:
+        Index pro Schlüssel, None falls die Frage nicht mehr existiert
+    """
+    index_of: Dict[str, int] = {}
+    for index, key in enumerate(bank_keys):
+        index_of.setdefault(key, index)
+    return [index_of.get(key) for key in keys]
+
+
+def discount_answers(snapshot: RoundSnapshot, bank_keys: Sequence[str],
+                     attempts: List[int], wrong: List[int]) -> None:
+    """
+    Zieht die beantworteten Plätze der Runde vom Lernverlauf ab (in place).
+    Sie stehen schon im Lernstand und werden beim Fortsetzen im Scheduler
+    nachgespielt, sonst zählten sie doppelt.
+    """
+    for index, code in zip(resolve_keys(snapshot.keys, bank_keys), snapshot.answers):
+        if code and index is not None and attempts[index] > 0:
+            attempts[index] -= 1
+            if not code & CORRECT_BIT:
+                wrong[index] = max(0, wrong[index] - 1)
+
+
+def restrict_to_pool(questions: Sequence, snapshot: RoundSnapshot, bank_keys: Sequence[str]) -> list:
+    """
+    Stellt den Fragenpool einer gespeicherten Runde wieder her (gleiche
+    Reihenfolge wie beim Speichern). Ohne gespeicherten Pool bleibt die Liste.
+    """
+    if not snapshot.pool:
+        return list(questions)
+    return [questions[index] for index in resolve_keys(snapshot.pool, bank_keys) if index is not None]
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Geteilte Fragenbank
+Speichert Fragenbanken in einer Binärdatei, die mehrere Prozesse per mmap
+nur lesend einbinden. Die Seiten liegen einmal im Page-Cache des
+Betriebssystems, statt dass jeder Worker eigene Question-Objekte aufbaut.
+
+Dateiformat (Byte-Reihenfolge des Rechners, die Datei ist ein lokaler Cache):
+
+    Kopf        MAGIC (8 Bytes), Anzahl Fragen (u64), Länge Verzeichnis (u64)
+    Verzeichnis JSON {Bankname: [Start, Ende]}, auf 8 Bytes aufgefüllt
+    Offsets     Anzahl + 1 Werte (u64), relativ zum Datenbereich
+    Daten       Eine kompakte JSON-Liste pro Frage (mit Fragen-ID, Worker rechnen sie nicht neu)
+
+Fragen werden erst beim Zugriff dekodiert und nicht zwischengespeichert.
+
+Aufruf:
+    python shared_bank.py --output ~/.lern_quiz/bank.qbk
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from profiling import traced
+from quiz_engine import Question, question_key
+
+
+DEFAULT_BANK_PATH = os.path.join(os.path.expanduser("~"), ".lern_quiz", "bank.qbk")
+
+MAGIC = b"QBANK01\0"
+_HEADER = struct.Struct("=8sQQ")
+
+
+def _encode_question(q: Question) -> bytes:
+    record = [
+        q.prompt,
+        sorted(q.options.items()),
+        sorted(q.correct),
+        q.explain_correct,
+        sorted(q.explain_wrong.items()),
+        q.topic,
+        question_key(q),
+    ]
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _decode_question(data: bytes) -> Question:
+    # Ältere Bankdateien ohne Fragen-ID: die ID wird dann bei Bedarf berechnet
+    prompt, options, correct, explain_correct, explain_wrong, topic, *qid = json.loads(data)
+    return Question(
+        prompt=prompt,
+        options=dict(options),
+        correct=set(correct),
+        explain_correct=explain_correct,
+        explain_wrong=dict(explain_wrong),
+        topic=topic,
+        qid=qid[0] if qid else "",
+    )
+
+
+def write_bank_file(banks: Dict[str, Iterable[Question]], path: str = DEFAULT_BANK_PATH) -> int:
+    """
+    Schreibt Fragenbanken in eine Bankdatei.
+
+    Die Datei wird erst vollständig geschrieben und dann atomar umbenannt,
+    laufende Prozesse sehen daher nie eine halbe Datei.
+
+    Args:
+        banks: Bankname -> Fragen
+        path: Zieldatei
+
+    Returns:
+        Anzahl geschriebener Fragen
+    """
+    directory: Dict[str, List[int]] = {}
+    offsets = array("Q", [0])
+    chunks: List[bytes] = []
+    for name, questions in banks.items():
+        start = len(offsets) - 1
+        for q in questions:
+            chunk = _encode_question(q)
+            chunks.append(chunk)
+            offsets.append(offsets[-1] + len(chunk))
+        directory[name] = [start, len(offsets) - 1]
+
+    directory_bytes = json.dumps(directory, ensure_ascii=False).encode("utf-8")
+    directory_bytes += b" " * (-len(directory_bytes) % 8)
+    count = len(offsets) - 1
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, count, len(directory_bytes)))
+        f.write(directory_bytes)
+        offsets.tofile(f)
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+class SharedBank(Sequence[Question]):
+    """
+    Nur lesende Sicht auf (einen Ausschnitt) einer Bankdatei.
+    Verhält sich wie eine Liste von Fragen.
+    """
+
+    def __init__(self, path: str, _mapping: mmap.mmap = None, _range: Tuple[int, int] = None):
+        self.path = path
+        if _mapping is None:
+            with open(path, "rb") as f:
+                _mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mmap = _mapping
+
+        magic, count, directory_length = _HEADER.unpack_from(_mapping, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Keine Bankdatei: {path}")
+        directory_start = _HEADER.size
+        offsets_start = directory_start + directory_length
+        self._data_start = offsets_start + (count + 1) * 8
+        self._directory: Dict[str, List[int]] = json.loads(
+            bytes(_mapping[directory_start:offsets_start])
+        )
+        self._offsets = memoryview(_mapping)[offsets_start:self._data_start].cast("Q")
+        self._start, self._stop = _range if _range is not None else (0, count)
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return SharedBank(self.path, self._mmap, (self._start + start, self._start + stop))
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Fragenindex außerhalb der Bank")
+        index += self._start
+        begin = self._data_start + self._offsets[index]
+        end = self._data_start + self._offsets[index + 1]
+        return _decode_question(self._mmap[begin:end])
+
+    def __iter__(self) -> Iterator[Question]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __reduce__(self):
+        # Für andere Prozesse: dort wird die Datei erneut eingebunden statt kopiert
+        return (_reopen, (self.path, (self._start, self._stop)))
+
+    def banks(self) -> Dict[str, "SharedBank"]:
+        """Bankname -> Sicht auf die Fragen dieser Bank"""
+        return {
+            name: SharedBank(self.path, self._mmap, (start, stop))
+            for name, (start, stop) in self._directory.items()
+        }
+
+
+def _reopen(path: str, bank_range: Tuple[int, int]) -> SharedBank:
+    return SharedBank(path, _range=bank_range)
+
+
+@traced("bank.open_bank_file", "bank")
+def open_bank_file(path: str = DEFAULT_BANK_PATH) -> Dict[str, SharedBank]:
+    """Öffnet eine Bankdatei und gibt die enthaltenen Banken zurück"""
+    return SharedBank(path).banks()
+
+
+def main():
+    """Hauptfunktion"""
+    from quiz_server import load_banks
+
+    parser = argparse.ArgumentParser(description="Schreibt die Fragenbanken als geteilte Bankdatei")
+    parser.add_argument("--output", default=DEFAULT_BANK_PATH, help="Zieldatei")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N",
+                        help="Künstliche Bank mit N Fragen statt der Themenmodule")
+    args = parser.parse_args()
+
+    count = write_bank_file(load_banks(args.synthetic), args.output)
+    print(f"{count} Fragen nach {args.output} geschrieben ({os.path.getsize(args.output) / 1024:.0f} KB).")
+
+
+if __name__ == "__main__":
+    main()
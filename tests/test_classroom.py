@@ -0,0 +1,39 @@
+import asyncio
+
+from classroom import Classroom
+from quiz_engine import Question
+
+
+class _Writer:
+    class transport:
+        @staticmethod
+        def get_write_buffer_size():
+            return 0
+
+    def __init__(self):
+        self.sent = []
+
+    def is_closing(self):
+        return False
+
+    def write(self, data):
+        self.sent.append(data)
+
+
+def _bank():
+    return [Question("Was ist Aliasing?", {"A": "a", "B": "b"}, {"B"}, "", {}, topic="T")]
+
+
+def test_empty_selection_is_rejected_and_student_can_still_answer():
+    async def scenario():
+        room = Classroom("ABCDE", _bank(), _Writer())
+        student = _Writer()
+        room.join(student, "anna")
+        room.push(0)
+        assert room.submit(student, set()) == "Keine gültige Antwort eingegeben"
+        assert len(room.answered) == 0
+        assert room.submit(student, {"A"}) is None
+        assert len(room.answered) == 1
+        room.open = False
+
+    asyncio.run(scenario())
@@ -0,0 +1,43 @@
+import pytest
+
+from column_log import ColumnarEventLog, read_column_events
+from quiz_engine import AnswerEvent
+
+
+def _event(i):
+    return AnswerEvent(user="u", question_key=f"q{i}", selected="A", correct=True, timestamp=1000.0 + i)
+
+
+class _FailingFile:
+    """Leitet an die echte Datei weiter, schreibt aber nicht (Platte voll)"""
+
+    def __init__(self, real):
+        self.real = real
+
+    def write(self, data):
+        raise OSError("Datenträger voll")
+
+    def __getattr__(self, name):
+        return getattr(self.real, name)
+
+
+def test_write_error_is_reported_and_chunk_retried(tmp_path):
+    path = str(tmp_path / "answers.qcol")
+    log = ColumnarEventLog(path, flush_interval=10.0)
+    real_file = log._file
+    log._file = _FailingFile(real_file)
+    try:
+        log.record(_event(0))
+        with pytest.raises(OSError):
+            log.flush()
+        assert log.error is not None
+        assert log._writer.is_alive()
+
+        # Platz wieder frei: der zurückgehaltene Chunk wird nachgeholt
+        log._file = real_file
+        log.record(_event(1))
+        log.flush()
+        assert log.error is None
+    finally:
+        log.close()
+    assert [e.question_key for e in read_column_events(path)] == ["q0", "q1"]
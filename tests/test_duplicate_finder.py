@@ -0,0 +1,47 @@
+from duplicate_finder import find_duplicates, shingles
+from questions import TOPICS
+from quiz_engine import Question
+
+
+def _question(prompt, options):
+    return Question(prompt, dict(zip("ABCD", options)), {"B"}, "", {}, topic="T")
+
+
+def _groups_of(questions, threshold=None):
+    groups = find_duplicates(questions) if threshold is None else find_duplicates(questions, threshold)
+    return [set(group["members"]) for group in groups]
+
+
+def test_paraphrased_options_are_found_at_default_threshold():
+    original = _question("Was versteht man unter Quantisierung?", [
+        "Die zeitliche Abtastung eines Signals",
+        "Die Umwandlung kontinuierlicher Amplitudenwerte in diskrete Stufen",
+        "Die Verstärkung eines Signals",
+        "Die Filterung von Rauschen",
+    ])
+    paraphrase = _question("Was versteht man unter Quantisierung?", [
+        "Zeitliche Abtastung",
+        "Umwandlung kontinuierlicher Amplituden in diskrete Stufen",
+        "Signalverstärkung",
+        "Rauschfilterung",
+    ])
+    other = _question("Was ist ein digitales Signal?", [
+        "Ein zeit- und wertkontinuierliches Signal",
+        "Ein zeit- und wertdiskretes Signal",
+        "Ein Signal das nur Nullen enthält",
+        "Ein periodisches Signal",
+    ])
+    assert _groups_of([original, other, paraphrase]) == [{0, 2}]
+
+
+def test_shipped_banks_report_known_pair_only():
+    questions = [q for loader in TOPICS.values() for q in loader()]
+    groups = _groups_of(questions)
+    assert len(groups) == 1
+    prompts = {questions[i].prompt for i in groups[0]}
+    assert any("Quantisierung" in prompt for prompt in prompts)
+
+
+def test_identical_questions_have_equal_shingles():
+    q = _question("Was ist Aliasing?", ["a", "b", "c", "d"])
+    assert shingles(q) == shingles(_question("Was ist  Aliasing?", ["d", "c", "b", "a"]))
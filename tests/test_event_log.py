@@ -0,0 +1,19 @@
+from event_log import _encode, read_events, rewrite_events
+from quiz_engine import AnswerEvent
+
+
+def _event(i):
+    return AnswerEvent(user="u", question_key=f"q{i}", selected="A", correct=i % 2 == 0, timestamp=1000.0 + i)
+
+
+def test_read_events_skips_damaged_lines(tmp_path):
+    path = tmp_path / "answers.log"
+    path.write_bytes(_encode(_event(0)) + b"00000000 kaputt\n" + _encode(_event(1)) + _encode(_event(2))[:-5])
+    assert [e.question_key for e in read_events(str(path))] == ["q0", "q1"]
+
+
+def test_rewrite_events_round_trip(tmp_path):
+    path = str(tmp_path / "answers.log")
+    events = [_event(i) for i in range(5)]
+    assert rewrite_events(events, path) == 5
+    assert list(read_events(path)) == events
@@ -0,0 +1,36 @@
+import sqlite3
+import time
+
+import pytest
+
+from learning_store import LearningStore
+from quiz_engine import AnswerEvent
+
+
+def _event(key, correct=True):
+    return AnswerEvent(user="u", question_key=key, selected="A", correct=correct, timestamp=time.time())
+
+
+def test_failed_batch_is_reported_and_retried(tmp_path):
+    store = LearningStore(str(tmp_path / "learning.db"), flush_interval=0.05)
+    original = store._write_batch
+    locked = [True]
+
+    def write_batch(conn, batch):
+        if locked[0]:
+            raise sqlite3.OperationalError("database is locked")
+        original(conn, batch)
+
+    store._write_batch = write_batch
+    try:
+        store.record(_event("a", False))
+        with pytest.raises(sqlite3.Error):
+            store.flush()
+        assert store._writer.is_alive()
+
+        locked[0] = False
+        store.record(_event("b"))
+        store.flush()
+        assert store.history("u", ["a", "b"]) == ([1, 1], [1, 0])
+    finally:
+        store.close()
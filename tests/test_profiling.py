@@ -0,0 +1,34 @@
+import pickle
+
+import profiling
+from questions import computergrafik
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def add(self, amount):
+        self.value += amount
+        return self.value
+
+
+def test_wrapped_loader_pickles_by_name():
+    wrapper = profiling._wrap(computergrafik.get_questions, "bank.Computergrafik", "bank")
+    restored = pickle.loads(pickle.dumps(wrapper))
+    assert restored is computergrafik.get_questions or restored.__wrapped__ is computergrafik.get_questions
+
+
+def test_wrapped_method_binds_to_instance():
+    wrapper = profiling._wrap(Counter.add, "Counter.add", "engine")
+    counter = Counter()
+    assert wrapper.__get__(counter, Counter)(2) == 2
+    assert wrapper(counter, 3) == 5
+
+
+def test_rebind_skips_modules_outside_the_project():
+    import json
+
+    modules = profiling._project_modules()
+    assert profiling in modules
+    assert json not in modules
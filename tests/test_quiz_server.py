@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+from quiz_engine import Question
+from quiz_server import QuizServer
+
+
+def _bank():
+    return [Question("Was ist Aliasing?", {"A": "a", "B": "b"}, {"B"}, "", {}, topic="T")]
+
+
+async def _client(port):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def call(**message):
+        writer.write(json.dumps(message).encode("utf-8") + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    return call, reader, writer
+
+
+def test_unknown_room_on_join_keeps_the_current_room():
+    async def scenario():
+        quiz = QuizServer({"T": _bank()})
+        server = await quiz.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        host, _, host_writer = await _client(port)
+        student, student_reader, student_writer = await _client(port)
+        try:
+            code = (await host(op="host", topic="T"))["room"]
+            assert (await student(op="join", room=code, user="anna"))["op"] == "joined"
+            assert (await student(op="join", room="XXXXX", user="anna"))["op"] == "error"
+            room = quiz.classrooms.get(code)
+            assert len(room.members) == 1
+
+            await host(op="push", index=0)
+            assert json.loads(await student_reader.readline())["op"] == "question"
+            assert (await student(op="answer", answer="B"))["op"] == "accepted"
+            assert len(room.answered) == 1
+        finally:
+            host_writer.close()
+            student_writer.close()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(scenario())
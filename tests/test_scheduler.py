@@ -0,0 +1,36 @@
+import random
+
+from scheduler import SpacedRepetitionScheduler
+
+
+def test_missed_question_returns_after_relearn_gap():
+    scheduler = SpacedRepetitionScheduler(100, rng=random.Random(1), relearn_gap=3)
+    seen_at = {}
+    repeats = 0
+    for step in range(30):
+        index = scheduler.next_index()
+        if index in seen_at:
+            repeats += 1
+            assert step - seen_at[index] <= scheduler.relearn_gap
+        seen_at[index] = step
+        scheduler.record(index, False)
+    assert repeats > 0
+
+
+def test_all_questions_asked_when_answered_correctly():
+    scheduler = SpacedRepetitionScheduler(50, rng=random.Random(2))
+    asked = set()
+    for _ in range(400):
+        index = scheduler.next_index()
+        asked.add(index)
+        scheduler.record(index, True)
+    assert asked == set(range(50))
+
+
+def test_missed_question_comes_before_new_ones():
+    scheduler = SpacedRepetitionScheduler(20, rng=random.Random(3), relearn_gap=2)
+    first = scheduler.next_index()
+    scheduler.record(first, False)
+    second = scheduler.next_index()
+    scheduler.record(second, True)
+    assert scheduler.next_index() == first
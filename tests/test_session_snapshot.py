@@ -0,0 +1,63 @@
+import json
+import random
+
+from scheduler import SpacedRepetitionScheduler, make_scheduler
+from session_snapshot import (
+    CORRECT_BIT, RoundSnapshot, _HEADER, _META_LENGTH, _POOL_COUNT, decode_snapshot, discount_answers,
+    encode_snapshot, restrict_to_pool,
+)
+
+
+def _snapshot(**kwargs):
+    return RoundSnapshot(topics=["T"], keys=["00" * 8, "11" * 8], seeds=[1, 2], answers=[CORRECT_BIT | 1],
+                         total=5, allow_repeats=True, **kwargs)
+
+
+def test_scheduler_kind_round_trip():
+    assert decode_snapshot(encode_snapshot(_snapshot(scheduler="spaced"))).scheduler == "spaced"
+
+
+def test_old_snapshot_defaults_to_cooldown():
+    data = encode_snapshot(_snapshot(scheduler="weighted"))
+    (length,) = _META_LENGTH.unpack_from(data, _HEADER.size)
+    start = _HEADER.size + _META_LENGTH.size
+    meta = json.loads(data[start:start + length])
+    del meta["scheduler"]
+    old_meta = json.dumps(meta).encode("utf-8")
+    old = data[:_HEADER.size] + _META_LENGTH.pack(len(old_meta)) + old_meta + data[start + length:]
+    assert decode_snapshot(old).scheduler == "cooldown"
+
+
+def test_make_scheduler_uses_kind():
+    scheduler = make_scheduler("spaced", 10, rng=random.Random(0))
+    assert isinstance(scheduler, SpacedRepetitionScheduler)
+    assert make_scheduler(scheduler.kind, 10).kind == "spaced"
+
+
+def test_spaced_replay_continues_where_round_stopped():
+    scheduler = SpacedRepetitionScheduler(10, rng=random.Random(0), relearn_gap=2)
+    scheduler.replay(4, False)
+    scheduler.replay(7, True)
+    assert scheduler.next_index() == 4
+    assert 7 not in scheduler._new
+
+
+def test_discount_answers_removes_replayed_history():
+    attempts, wrong = [3, 2], [1, 2]
+    snapshot = _snapshot()
+    snapshot.answers = [CORRECT_BIT | 1, 2]
+    discount_answers(snapshot, ["00" * 8, "11" * 8], attempts, wrong)
+    assert (attempts, wrong) == ([2, 1], [1, 1])
+
+
+def test_pool_round_trip_and_old_files_without_pool():
+    snapshot = _snapshot(pool=["22" * 8, "00" * 8])
+    assert decode_snapshot(encode_snapshot(snapshot)).pool == ["22" * 8, "00" * 8]
+    without_pool = encode_snapshot(_snapshot())[:-_POOL_COUNT.size]
+    assert decode_snapshot(without_pool).pool == []
+
+
+def test_restrict_to_pool_keeps_saved_order():
+    snapshot = _snapshot(pool=["cc", "aa"])
+    assert restrict_to_pool(["A", "B", "C"], snapshot, ["aa", "bb", "cc"]) == ["C", "A"]
+    assert restrict_to_pool(["A", "B"], _snapshot(), ["aa", "bb"]) == ["A", "B"]
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Themen-Index
+Hierarchischer Index über die Themen-Strings der Fragen
+('Signalverarbeitung - Fourier' -> Signalverarbeitung > Fourier).
+
+Jeder Knoten kennt die IDs aller Fragen in seinem Teilbaum, Filter werden
+daher über vorberechnete Mengen ausgewertet statt über die ganze Bank.
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from quiz_engine import Question
+from search_index import normalize_text
+
+
+TOPIC_SEPARATOR = " - "
+
+TopicPath = Tuple[str, ...]
+
+
+def split_topic(topic: str) -> TopicPath:
+    """'Signalverarbeitung - Fourier' -> ('Signalverarbeitung', 'Fourier')"""
+    return tuple(part.strip() for part in topic.split(TOPIC_SEPARATOR) if part.strip())
+
+
+class TopicNode:
+    """Knoten im Themenbaum"""
+
+    __slots__ = ("name", "path", "children", "ids")
+
+    def __init__(self, name: str, path: TopicPath):
+        self.name = name
+        self.path = path
+        self.children: Dict[str, "TopicNode"] = {}
+        self.ids: Set[int] = set()          # Fragen in diesem Knoten und allen Unterknoten
+
+
+class TopicIndex:
+    """Themenbaum einer Fragenbank (IDs = Positionen in der Fragenliste)"""
+
+    def __init__(self, questions: Iterable[Question] = ()):
+        self.root = TopicNode("", ())
+        self._doc_paths: List[Optional[TopicPath]] = []
+        for question in questions:
+            self.add(question)
+
+    def __len__(self) -> int:
+        return len(self.root.ids)
+
+    def add(self, question: Question) -> int:
+        """Nimmt eine Frage auf und gibt ihre ID zurück"""
+        doc_id = len(self._doc_paths)
+        path = split_topic(question.topic)
+        self._doc_paths.append(path)
+
+        node = self.root
+        node.ids.add(doc_id)
+        for depth, name in enumerate(path):
+            child = node.children.get(name)
+            if child is None:
+                child = node.children[name] = TopicNode(name, path[:depth + 1])
+            child.ids.add(doc_id)
+            node = child
+        return doc_id
+
+    def remove(self, doc_id: int) -> None:
+        """Entfernt eine Frage aus allen Knoten ihres Pfades"""
+        path = self._doc_paths[doc_id]
+        if path is None:
+            return
+        self._doc_paths[doc_id] = None
+
+        node = self.root
+        node.ids.discard(doc_id)
+        for name in path:
+            child = node.children[name]
+            child.ids.discard(doc_id)
+            if not child.ids:
+                del node.children[name]
+                break
+            node = child
+
+    def node(self, path: TopicPath) -> Optional[TopicNode]:
+        """Knoten zu einem Pfad (None, falls unbekannt)"""
+        node = self.root
+        for name in path:
+            node = node.children.get(name)
+            if node is None:
+                return None
+        return node
+
+    def subtopics(self, path: TopicPath = ()) -> List[Tuple[TopicPath, int]]:
+        """Direkte Unterthemen eines Pfades mit Fragenanzahl (alphabetisch)"""
+        node = self.node(path)
+        if node is None:
+            return []
+        return [(child.path, len(child.ids)) for _, child in sorted(node.children.items())]
+
+    def all_subtopics(self) -> List[Tuple[TopicPath, int]]:
+        """Unterthemen aller Hauptthemen (zweite Ebene) mit Fragenanzahl"""
+        result: List[Tuple[TopicPath, int]] = []
+        for root_path, _ in self.subtopics():
+            result.extend(self.subtopics(root_path))
+        return result
+
+    def find(self, query: str) -> List[TopicPath]:
+        """
+        Sucht Themen, deren Name mit dem Suchbegriff beginnt
+        (ohne Groß-/Kleinschreibung, Umlaute transliteriert).
+        'fourier' findet z.B. 'Fourier', 'Fourier-Analyse' und 'Fourier-Synthese'.
+        """
+        needle = normalize_text(query.strip())
+        if not needle:
+            return []
+
+        matches: List[TopicPath] = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            for child in node.children.values():
+                if normalize_text(child.name).startswith(needle):
+                    matches.append(child.path)
+                else:
+                    stack.append(child)
+        matches.sort()
+        return matches
+
+    def ids_for(self, paths: Iterable[TopicPath]) -> Set[int]:
+        """Vereinigung der IDs mehrerer Themen"""
+        result: Set[int] = set()
+        for path in paths:
+            node = self.node(path)
+            if node is not None:
+                result |= node.ids
+        return result
+
+    def ids_matching(self, queries: Iterable[str]) -> Set[int]:
+        """IDs aller Fragen, deren Thema zu einem der Suchbegriffe passt"""
+        paths: List[TopicPath] = []
+        for query in queries:
+            paths.extend(self.find(query))
+        return self.ids_for(paths)
+
+
+def filter_by_subtopics(questions: List[Question], queries: Iterable[str], index: TopicIndex) -> List[Question]:
+    """
+    Filtert eine Fragenliste nach Unterthemen (z.B. ['Fourier', 'Filter']).
+    `index` ist der beim Laden gebaute Index genau dieser Liste (siehe get_topic_bank).
+    """
+    return [questions[doc_id] for doc_id in sorted(index.ids_matching(queries))]
+
+
+_BANK_CACHE: Dict[str, Tuple[List[Question], TopicIndex]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def get_topic_bank(topic_name: str, loader: Callable[[], List[Question]]) -> Tuple[List[Question], TopicIndex]:
+    """Lädt ein Themenmodul beim ersten Aufruf und baut dabei einmal seinen Themen-Index (gecacht)"""
+    with _CACHE_LOCK:
+        bank = _BANK_CACHE.get(topic_name)
+        if bank is None:
+            questions = loader()
+            bank = _BANK_CACHE[topic_name] = (questions, TopicIndex(questions))
+        return bank
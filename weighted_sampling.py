@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Gewichtetes Ziehen
+Walkers Alias-Methode mit blockweisem Neuaufbau.
+
+Die Gewichte werden in Blöcke der Größe ~sqrt(N) aufgeteilt. Jeder Block hat
+eine eigene Alias-Tabelle, eine weitere Tabelle wählt den Block nach seinem
+Gesamtgewicht. Ziehen kostet O(1), das Ändern eines Gewichts baut nur den
+betroffenen Block neu auf (O(sqrt N)); die Block-Tabelle wird erst beim
+nächsten Ziehen einmal neu berechnet.
+"""
+
+import math
+import random
+from typing import List, Optional, Sequence
+
+
+class AliasTable:
+    """Statische Alias-Tabelle (Vose-Variante)"""
+
+    __slots__ = ("prob", "alias", "total")
+
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        self.total = float(sum(weights))
+        self.prob: List[float] = [0.0] * n
+        self.alias: List[int] = [0] * n
+
+        if n == 0 or self.total <= 0:
+            return
+
+        scaled = [w * n / self.total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+
+        # Rundungsreste: verbleibende Einträge sind (fast) genau 1
+        for i in large:
+            self.prob[i] = 1.0
+        for i in small:
+            self.prob[i] = 1.0
+
+    def sample(self, rng) -> int:
+        """Zieht einen Index proportional zu den Gewichten"""
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+class DynamicAliasSampler:
+    """Alias-Sampler mit änderbaren Gewichten"""
+
+    def __init__(self, weights: Sequence[float], rng: Optional[random.Random] = None, block_size: int = 0):
+        """
+        Args:
+            weights: Nicht-negative Gewichte
+            rng: Optionaler Zufallsgenerator
+            block_size: Blockgröße (0 = automatisch ~sqrt(N))
+        """
+        if any(w < 0 for w in weights):
+            raise ValueError("Gewichte dürfen nicht negativ sein")
+
+        self.rng = rng or random.Random()
+        self.weights: List[float] = [float(w) for w in weights]
+        n = len(self.weights)
+        self.block_size = block_size or max(16, math.isqrt(n))
+
+        self._blocks: List[AliasTable] = [
+            AliasTable(self.weights[start:start + self.block_size])
+            for start in range(0, n, self.block_size)
+        ]
+        self._top: Optional[AliasTable] = None
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    @property
+    def total(self) -> float:
+        return sum(block.total for block in self._blocks)
+
+    def update(self, index: int, weight: float) -> None:
+        """Ändert ein Gewicht und baut den betroffenen Block neu auf"""
+        if weight < 0:
+            raise ValueError("Gewichte dürfen nicht negativ sein")
+        if self.weights[index] == weight:
+            return
+
+        self.weights[index] = float(weight)
+        block = index // self.block_size
+        start = block * self.block_size
+        self._blocks[block] = AliasTable(self.weights[start:start + self.block_size])
+        self._top = None
+
+    def sample(self) -> int:
+        """Zieht einen Index proportional zu den aktuellen Gewichten"""
+        if self._top is None:
+            self._top = AliasTable([block.total for block in self._blocks])
+            if self._top.total <= 0:
+                self._top = None
+                raise ValueError("Alle Gewichte sind 0")
+
+        block = self._top.sample(self.rng)
+        return block * self.block_size + self._blocks[block].sample(self.rng)